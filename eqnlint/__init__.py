@@ -1,14 +1,43 @@
 # eqnlint/__init__.py
-__all__ = ["__version__"]
+__all__ = ["__version__", "audit", "audit_sync", "close_sync", "AIClient", "Report", "AuditResult", "Finding",
+           "Verdict"]
 
-try:
-    # Preferred: version file generated by setuptools-scm during build
-    from ._version import version as __version__
-except Exception:
-    # Fallback: ask the installed metadata (works after pip install)
+# Public API, imported on first access so `import eqnlint` stays cheap.
+_LAZY = {
+    "audit": "eqnlint.lib._api",
+    "audit_sync": "eqnlint.lib._api",
+    "close_sync": "eqnlint.lib._api",
+    "Report": "eqnlint.lib._api",
+    "AuditResult": "eqnlint.lib._api",
+    "Finding": "eqnlint.lib._api",
+    "AIClient": "eqnlint.lib._ai",
+    "Verdict": "eqnlint.lib._verdict",
+}
+
+
+def _resolve_version():
     try:
-        from importlib.metadata import version as _pkg_version  # Py3.8+
-        __version__ = _pkg_version("eqnlint")
+        # Preferred: version file generated by setuptools-scm during build
+        from ._version import version
+        return version
     except Exception:
-        # Last resort (e.g., bare source tree without tags)
-        __version__ = "0.0.0"
+        # Fallback: ask the installed metadata (works after pip install)
+        try:
+            from importlib.metadata import version as _pkg_version  # Py3.8+
+            return _pkg_version("eqnlint")
+        except Exception:
+            # Last resort (e.g., bare source tree without tags)
+            return "0.0.0"
+
+
+def __getattr__(name):
+    # Resolved on first access: importlib.metadata is slow to import and most
+    # commands never print the version.
+    if name == "__version__":
+        globals()["__version__"] = _resolve_version()
+        return globals()["__version__"]
+    if name in _LAZY:
+        import importlib
+        globals()[name] = getattr(importlib.import_module(_LAZY[name]), name)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -27,7 +27,9 @@ EXAMPLE: To create a new audit for detecting rotational symmetry in physics equa
 
 NOTES:
 - This template uses a state machine for clean separation of stages
-- It supports `--dry-run`, output logging, JSON saving, and future pipeline chaining
+- It supports `--dry-run`, output logging, JSON saving, and streaming pipeline chaining
+  (`eqnlint --pipeline symbolic,dimensional,units`): each stage hands every finished
+  target to the next one in memory, and the next stage starts on it at once
 - All audit stages are modular, so new types (e.g., symbol, citation, or diagram audits) can be implemented cleanly
 
 """
@@ -43,10 +45,23 @@ sys.path.append(str(Path(__file__).resolve().parents[1] / "lib"))
 
 from eqnlint.lib._cli import base_parser, info_block
 from eqnlint.lib._textio import read_text, emit_human, emit_json
-from eqnlint.lib._extract import extract_equations_with_context
-from eqnlint.lib._ai import AIClient
-from eqnlint.lib import _cli, _textio
+from eqnlint.lib._extract import Document, extract_equations_with_context
+from eqnlint.lib._ai import AIClient, ollama_options, warm_up
+from eqnlint.lib import _cli, _registry, _textio
 from eqnlint.lib._textio import write_outputs
+from eqnlint.lib._symbols import SymbolTable, symbol_table_path, target_key
+from eqnlint.lib._checkpoint import Checkpoint, checkpoint_path, run_config_key
+from eqnlint.lib._budget import Budget, BudgetExhausted
+from eqnlint.lib._schedule import scores, prioritize
+from eqnlint.lib._verdict import Verdict, parse_verdict
+from eqnlint.lib import _metrics, _trace
+from eqnlint.lib._fewshot_index import FewShotIndex, pool_examples
+from eqnlint.lib._stream import VerdictStop
+from eqnlint.lib._sample import Sample, format_rates
+from eqnlint.lib._schema import (parse_structured, render_verdict, schema_instructions,
+                                 structured_fewshots, triage_fewshots, triage_schema, verdict_schema)
+
+TRIAGE_TOKENS = 40  # a verdict and a confidence
 
 class State(Enum):
     READ_COMMAND_LINE = auto()
@@ -62,22 +77,73 @@ class State(Enum):
 
 class AuditStateMachine:
     State = State  # Expose it as a class attribute
-    def __init__(self):
-        self.state = State.READ_COMMAND_LINE
-        self.args = None
+    audit_name = "template"
+    description = "Template audit for equations."
+    extra_args = None  # audit-specific (flags, kwargs) pairs for base_parser
+    target_kind = "equations"  # audits with the same kind share one extraction
+    uses_symbols = False  # True if prompts read the shared symbol table
+    verdict_labels = None  # {"pass": "CONSISTENT", ...}: ask for structured replies (lib/_schema.py)
+    response_fields = None  # extra optional fields of a structured reply, name -> JSON schema
+    max_output_tokens = 200  # reply budget when structured; --max-tokens overrides
+    stop_fields = ("verdict", "reason")  # reply fields to wait for before cutting a stream (None: all)
+    fused_task = None  # one-paragraph task for a fused request (--fuse, lib/_fusion.py); None opts out
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Built-in audits are described once, in the registry that --list reads.
+        if "description" not in vars(cls):
+            cls.description = _registry.description(cls.audit_name, cls.description)
+
+    def __init__(self, args=None, ai_client=None, document=None, progress=None):
+        """
+        Standalone audits take no arguments and read sys.argv. An orchestrator
+        running several audits in one event loop passes the parsed `args`, a
+        shared `ai_client` (which it owns and closes), a shared `document`
+        (one read + one extraction per target kind) and an optional
+        `progress(audit_name, done, total)` callback; results are then kept in
+        `self.report` instead of being written.
+        """
+        self.state = State.READ_COMMAND_LINE if args is None else State.VERIFY_FILE
+        self.args = args
         self.equations = []
+        self.prefiltered = []  # targets a local prefilter dropped before any request
         self.results = []
-        self.ai_client = None
+        self.ai_client = ai_client
+        self._owns_client = ai_client is None
+        self.document = document
+        self.progress = progress
+        self.collect_only = args is not None
+        self.report = None  # {"human": str, "json": dict} once produced
         self.system_prompt = ""
         self.few_shots = []
+        self.response_schema = None  # set by _structure_prompts() when replies are structured
+        self.triage_schema = None  # set by _structure_prompts() for a --triage-model cascade
+        self.triage_system = ""
+        self.triage_few_shots = []
+        self.few_shot_index = None  # FewShotIndex over few_shots, set by _prepare_prompts()
+        self.triage_index = None
         self.log = None
         self.error = None
+        self.symbols = None  # shared SymbolTable, loaded on first use
+        self.checkpoint = None  # shared result journal, opened on first use
+        self.pending = 0  # targets left unsent (call budget, deadline or --fail-fast)
+        self.budget = None  # the run's Budget (--max-calls, --deadline, --fail-fast), shared by its audits
+        self.coverage = None  # {"targets", "done", "pending", "weight"} after the AI stage
+        self.upstream = None  # pipeline Stream this stage consumes (lib/_pipeline.py)
+        self.downstream = None  # pipeline Stream this stage feeds
+        self.fusion = None  # shared Fusion that asks for this audit under --fuse (lib/_fusion.py)
+        self.sample = None  # Sample the targets were drawn from under --sample (lib/_sample.py)
+        if args is not None:
+            from eqnlint.lib import _debug
+            self.log = _debug.logger
 
     async def run(self) -> None:
+        _trace.set_audit(self.audit_name)  # labels this audit's requests in traces
         try:
             while self.state != State.SHUTDOWN:
                 try:
-                    await self.transition()
+                    with _trace.tracer.span(self.state.name, self.audit_name, cat="state"):
+                        await self.transition()
                 except KeyboardInterrupt:
                     if self.log:
                         self.log.info("Interrupted by user. Shutting down.")
@@ -89,7 +155,17 @@ class AuditStateMachine:
                     self.state = State.HANDLE_ERROR
                     self.error = e
         finally:
-            if getattr(self, "ai_client", None):
+            if self.downstream is not None:
+                self.downstream.close()  # never leave the next stage waiting
+            if self.fusion is not None:
+                self.fusion.leave(self)  # nor the audits sharing requests with this one
+            if not self.collect_only and self.args is not None:
+                if self.args.dry_run and self.report is not None:
+                    from eqnlint.lib._estimate import plan, dry_run_estimate, format_estimate
+                    print(format_estimate(dry_run_estimate([plan(self)], self.args), self.args))
+                _trace.finish(self.args)
+                _metrics.finish(self.args)
+            if self._owns_client and getattr(self, "ai_client", None):
                 try:
                     # Close before loop ends
                     await self.ai_client.aclose()
@@ -103,6 +179,65 @@ class AuditStateMachine:
         """
         return f"Equation:\n{eq['equation']}\n\nContext:\n{eq['context']}\n\nTask: Echo equation."
 
+    def _symbol_table(self) -> SymbolTable:
+        """
+        Load the document-level symbol table once per run and drop entries for
+        targets that are no longer in the source.
+        """
+        if self.symbols is None:
+            self.symbols = SymbolTable.load(symbol_table_path(self.args))
+            population = self.sample.population if self.sample is not None else self.equations
+            dropped = self.symbols.prune(target_key(eq) for eq in population)
+            self.log.debug(f"Symbol table: {len(self.symbols)} cached targets, {dropped} invalidated")
+        return self.symbols
+
+    def _symbol_hint(self, eq: dict, label: str = "Known symbols") -> str:
+        """Prompt line with known symbol meanings for this target ('' if none)."""
+        compact = self._symbol_table().compact(eq["equation"])
+        return f"{label}: {compact}\n" if compact else ""
+
+    def _checkpoint(self) -> Checkpoint:
+        if self.checkpoint is None:
+            self.checkpoint = Checkpoint(checkpoint_path(self.args), resume=self.args.resume)
+        return self.checkpoint
+
+    def _resumed(self, eq: dict, result: dict) -> None:
+        """Hook for a result served from the checkpoint instead of dispatched."""
+
+    def _handoff(self, result: dict) -> str:
+        """
+        What this audit tells later pipeline stages about one target: by
+        default the verdict line of the reply ('' for unsent or failed calls).
+        """
+        if result.get("pending") or parse_verdict(result.get("notes", "")) is Verdict.ERROR:
+            return ""
+        lines = [l.strip() for l in result.get("notes", "").splitlines() if l.strip()]
+        return lines[0][:200] if lines else ""
+
+    def _upstream_hint(self, eq: dict) -> str:
+        findings = {name: text for name, text in (eq.get("upstream") or {}).items() if text}
+        if not findings:
+            return ""
+        return "Findings from earlier checks on this target:\n" + "\n".join(
+            f"- {name}: {text}" for name, text in findings.items())
+
+    def _find_targets(self, text: str) -> list:
+        """
+        Target extractor for this audit's `target_kind` — override together
+        with `target_kind` when an audit looks at something other than equations.
+        """
+        return extract_equations_with_context(text)
+
+    def _emit(self, human: str, json_obj: dict) -> None:
+        """Write a report, or keep it for the orchestrator in collect-only mode."""
+        self.report = {"human": human, "json": json_obj}
+        if not self.collect_only:
+            write_outputs(human, json_obj, self.args.output, self.args.json)
+
+    def _report_progress(self, done: int, total: int) -> None:
+        if self.progress:
+            self.progress(self.audit_name, done, total)
+
 
     async def transition(self) -> None:
         if self.state == State.READ_COMMAND_LINE:
@@ -119,6 +254,7 @@ class AuditStateMachine:
 
         elif self.state == State.GET_FEW_SHOTS:
             self._get_few_shots()
+            self._prepare_prompts()
 
         elif self.state == State.CALL_AI_WITH_FEW_SHOTS_AND_TARGETS:
             await self._call_ai()
@@ -130,18 +266,20 @@ class AuditStateMachine:
             self._call_next()
 
         elif self.state == State.HANDLE_ERROR:
-            print(f"Error: {self.error}")
+            print(f"Error ({self.audit_name}): {self.error}")
             self.state = State.SHUTDOWN
 
     def _read_command_line(self):
-        parser = base_parser("Audit Template", "template")
+        parser = base_parser(self.description, self.audit_name, self.extra_args)
         self.args = parser.parse_args()
         from eqnlint.lib import _debug
         _debug.set_level(self.args.verbose)
+        _trace.configure(self.args)
+        _metrics.configure(self.args)
         self.log = _debug.logger
 
         if self.args.help_info:
-            print(info_block("template", "Template audit for equations.", "Input: -f FILE", "Output: -o OUTPUT", "Steps TBD"))
+            print(info_block(self.audit_name, self.description, "Input: -f FILE", "Output: -o OUTPUT", "Steps TBD"))
             self.state = State.SHUTDOWN
         else:
             self.state = State.VERIFY_FILE
@@ -149,7 +287,9 @@ class AuditStateMachine:
 
     def _verify_file(self):
         try:
-            self.text = read_text(self.args.file)
+            if self.document is None:
+                self.document = Document(read_text(self.args.file), self.args.file)
+            self.text = self.document.text
             self.log.debug(f"Loaded file: {self.args.file}")
             self.state = State.VERIFY_AI
             self.log.debug(f"[STATE] Transitioning to {self.state.name}")
@@ -158,7 +298,14 @@ class AuditStateMachine:
 
     def _verify_ai(self):
         try:
-            self.ai_client = AIClient(self.args.model, rate=self.args.rate, max_tokens=self.args.max_tokens)
+            if self.ai_client is None:
+                self.ai_client = AIClient(
+                    self.args.model, rate=self.args.rate, max_tokens=self.args.max_tokens,
+                    concurrency=self.args.concurrency, ollama=ollama_options(self.args),
+                )
+                warm_up(self.ai_client, self.args)
+            if self.budget is None:
+                self.budget = Budget(self.args.max_calls, self.args.deadline)
             self.state = State.EXTRACT_TARGETS
             self.log.debug(f"[STATE] Transitioning to {self.state.name}")
         except Exception as e:
@@ -171,8 +318,15 @@ class AuditStateMachine:
         # --- BEGIN EXTRACTION ---
         # This is where the target extractor is called. It could easily be replaced with
         # another function like `extract_diagrams_with_context()` if diagrams are the new focus.
-        self.equations = extract_equations_with_context(self.text)
+        self.equations = self.document.targets(self.target_kind, self._find_targets)
         self.log.debug(f"Found {len(self.equations)} equations.")
+        if getattr(self.args, "sample", None) is not None:
+            # --sample: audit a stratified random subset and estimate the rest.
+            self.sample = Sample(self.equations, self.document.text, self.args.sample,
+                                 getattr(self.args, "sample_seed", 0))
+            self.equations = self.sample.targets()
+            self.log.info(f"[{self.audit_name}] sampled {len(self.equations)} of "
+                          f"{len(self.sample.population)} targets (seed {self.sample.seed})")
         # --- END EXTRACTION ---
 
         # If the `--dry-run` flag is set, we skip AI processing and just dump the extracted targets.
@@ -180,12 +334,7 @@ class AuditStateMachine:
             self.log.info("Dry run mode: extraction only.")
             lines = [f"\n--- Equation {i+1} ---\n{e['equation']}\n\n{e['context']}" for i, e in enumerate(self.equations)]
             human = emit_human("=== DRY RUN: Equations ===", lines)
-            write_outputs(
-                human,
-                {"equations": [e["equation"] for e in self.equations]},
-                self.args.output,
-                self.args.json
-            )
+            self._emit(human, {"equations": [e["equation"] for e in self.equations]})
             self.state = State.SHUTDOWN
             self.log.debug(f"[STATE] Transitioning to {self.state.name}")
         else:
@@ -210,39 +359,347 @@ class AuditStateMachine:
         self.state = State.CALL_AI_WITH_FEW_SHOTS_AND_TARGETS
         self.log.debug(f"[STATE] Transitioning to {self.state.name}")
 
+    def _response_schema(self):
+        """JSON schema replies must follow, or None for free text."""
+        if not self.verdict_labels:
+            return None
+        return verdict_schema(self.verdict_labels, self.response_fields)
+
+    def _render(self, obj: dict) -> str:
+        """Notes for a validated structured reply ('❌ INCONSISTENT: reason')."""
+        return render_verdict(obj, self.verdict_labels)
+
+    def _structured_fewshots(self, schema: dict) -> list:
+        """Few-shot examples with the answers written as `schema` objects."""
+        return structured_fewshots(self.few_shots, schema)
+
+    def _structure_prompts(self) -> None:
+        # Unless --free-text is given, audits with a schema get it sent with
+        # every request, few-shot answers rewritten to match it, and replies
+        # held to max_output_tokens: short JSON instead of open-ended prose.
+        schema = self._response_schema()
+        if schema is not None and self.verdict_labels and getattr(self.args, "triage_model", None):
+            # Triage is verdict-only and always structured: it must report a confidence.
+            self.triage_schema = triage_schema(self.verdict_labels)
+            self.triage_few_shots = triage_fewshots(self._structured_fewshots(schema))
+            self.triage_system = (f"{self.system_prompt}\n\nGive only the verdict and your confidence in it.\n"
+                                  f"{schema_instructions(self.triage_schema)}")
+        if schema is None or getattr(self.args, "free_text", False):
+            return
+        self.response_schema = schema
+        self.few_shots = self._structured_fewshots(schema)
+        self.system_prompt = f"{self.system_prompt}\n\n{schema_instructions(schema)}"
+
+    def _prepare_prompts(self) -> None:
+        # After _get_few_shots(): add --few-shot-pool examples, structure the
+        # prompts, and index the examples so each request carries only the
+        # --few-shots most similar to its target (--all-few-shots: the pool).
+        pool = getattr(self.args, "few_shot_pool", None)
+        if pool:
+            self.few_shots = self.few_shots + pool_examples(pool, self.audit_name)
+        self._structure_prompts()
+        if getattr(self.args, "all_few_shots", False):
+            return
+        k, budget = getattr(self.args, "few_shots", 3), getattr(self.args, "few_shot_tokens", None)
+        pure = bool(getattr(self.args, "dry_run", False))  # estimates must not import NumPy
+        self.few_shot_index = FewShotIndex(self.few_shots, k, budget, pure)
+        if self.triage_schema is not None:
+            self.triage_index = FewShotIndex(self.triage_few_shots, k, budget, pure)
+
+    def _few_shots_for(self, prompt: str, triage: bool = False) -> list:
+        """The examples sent with `prompt`: the most similar ones, or the whole set without an index."""
+        index = self.triage_index if triage else self.few_shot_index
+        if index is None:
+            return self.triage_few_shots if triage else self.few_shots
+        return index.select(prompt)
+
+    def _reply_budget(self):
+        """Token cap per request: --max-tokens, else the audit's budget for structured replies."""
+        if self.args.max_tokens:
+            return self.args.max_tokens
+        return self.max_output_tokens if self.response_schema is not None else None
+
+    def _stop_rule(self):
+        """
+        When a streamed reply may be cut off (lib/_stream.py): once the
+        verdict and stop_fields have arrived, or, with --reason-on-fail,
+        at the verdict of a pass. None for audits without verdicts.
+        """
+        if not self.verdict_labels or getattr(self.args, "no_early_stop", False):
+            return None
+        return VerdictStop(self.verdict_labels, self.response_schema, self.stop_fields,
+                           getattr(self.args, "reason_on_fail", False))
+
+    def _escalation_client(self) -> AIClient:
+        """Client for the full prompt: --escalate-model if set, else --model."""
+        model = getattr(self.args, "escalate_model", None)
+        return self.ai_client.sibling(model) if model else self.ai_client
+
+    def _triage_client(self) -> AIClient:
+        return self.ai_client.sibling(self.args.triage_model, rate=getattr(self.args, "triage_rate", None))
+
+    def _model_key(self) -> str:
+        """Which model(s) answer, for the checkpoint: a cascade is its own configuration."""
+        model = getattr(self.args, "escalate_model", None) or self.args.model
+        if getattr(self.args, "reason_on_fail", False):
+            model += "+reason-on-fail"  # passes were stored without a reason
+        if self.fusion is not None:
+            model += "+fused"  # answered alongside other audits, from a different prompt
+        if self.triage_schema is None:
+            return model
+        return f"{self.args.triage_model}>{model}@{self.args.triage_confidence}"
+
+    async def _complete(self, client, system, few_shots, prompt, schema, max_tokens, stop=None):
+        """One request -> (reply, validated object or None, schema errors, meta)."""
+        self.log.debug(f"[{self.audit_name}] -> {client.model}: {len(prompt)} chars, {len(few_shots)} few-shot messages")
+        meta = {}
+        try:
+            reply = await client.complete(system, prompt, fewshot=few_shots, meta=meta,
+                                          schema=schema, max_tokens=max_tokens, stop=stop, budget=self.budget)
+        except BudgetExhausted:
+            raise
+        except Exception as ex:
+            reply = f"ERROR: {ex}"
+        self.log.debug(f"[{self.audit_name}] <- {client.model}: {reply[:120]!r}")
+        obj, errors = None, []
+        if schema is not None and parse_verdict(reply) is not Verdict.ERROR:
+            obj, errors = parse_structured(reply, schema)
+        return reply, obj, errors, meta
+
+    async def _triage(self, prompt: str):
+        """
+        Ask the triage model for a verdict only. Returns (result, record):
+        a finished result if the triage answer settles the target (a pass
+        at or above --triage-confidence), else None; and what triage said.
+        """
+        reply, obj, errors, meta = await self._complete(
+            self._triage_client(), self.triage_system, self._few_shots_for(prompt, triage=True), prompt,
+            self.triage_schema, TRIAGE_TOKENS)
+        record = {"model": self.args.triage_model, "verdict": obj["verdict"] if obj else "error",
+                  "confidence": obj["confidence"] if obj else 0.0}
+        record.update({k: meta[k] for k in ("latency_ms", "tokens_in", "tokens_out") if k in meta})
+        settled = (obj is not None and obj["verdict"] == "pass"
+                   and obj["confidence"] >= self.args.triage_confidence
+                   and not getattr(self.args, "calibrate", False))
+        if not settled:
+            return None, record
+        reason = f"confirmed by triage model {self.args.triage_model} (confidence {obj['confidence']:.2f})"
+        result = {"notes": self._render({"verdict": "pass", "reason": reason}), "tier": "triage",
+                  "triage": record, "meta": meta}
+        return result, record
+
+    async def _ask(self, prompt: str) -> dict:
+        """
+        Send one prompt. Returns the result fields that come from the model:
+        notes, plus meta (latency, tokens, model), and for structured replies
+        the validated object or, if the reply did not match, schema_errors.
+        In a cascade the triage model answers first, and only targets it
+        does not pass confidently reach the escalation model.
+        """
+        record = None
+        if self.triage_schema is not None:
+            result, record = await self._triage(prompt)
+            if result is not None:
+                return result
+        reply, obj, errors, meta = await self._complete(
+            self._escalation_client(), self.system_prompt, self._few_shots_for(prompt), prompt,
+            self.response_schema, self._reply_budget(), self._stop_rule())
+        out = {"notes": reply}
+        if errors:
+            # An error verdict, so --resume asks again instead of keeping it.
+            out["notes"] = f"[ERROR] reply does not match the {self.audit_name} schema: {errors[0]}"
+            out["schema_errors"] = errors
+            out["raw"] = reply
+        elif obj is not None:
+            out["notes"] = self._render(obj)
+            out["structured"] = obj
+        if record is not None:
+            out["tier"] = "escalated"
+            out["triage"] = record
+        if meta:
+            out["meta"] = meta  # latency, token counts and model, for the results store
+        return out
+
+    async def _dispatch(self, eq: dict) -> dict:
+        # One target -> one result. Subclasses override this (not the loop)
+        # to customize caching, display or error handling per target.
+        # Under --fuse the shared request goes out once every fused audit
+        # has handed this target over (the symbolic section included).
+        result = {"equation": eq['equation']}
+        if "line" in eq:
+            result["line"] = eq["line"]
+        if self.fusion is not None:
+            result.update(await self.fusion.ask(self, eq))
+            return result
+        if self.uses_symbols:
+            await self._symbol_table().ready(target_key(eq))
+        prompt = self._build_prompt(eq)
+        hint = self._upstream_hint(eq)
+        if hint:
+            prompt = f"{prompt}\n\n{hint}"
+        result.update(await self._ask(prompt))
+        return result
+
     async def _call_ai(self):
         # === AI TASK LOOP ===
-        # This loop sends each equation and its context to the AI model.
-        # Subclasses can customize prompt formatting or error handling if needed.
-
-        self.results = []
-        for eq in self.equations:
-            # prompt = f"Equation:\n{eq['equation']}\n\nContext:\n{eq['context']}\n\nTask: Echo equation."
-            prompt = self._build_prompt(eq)
-            self.log.debug(f"[DEBUG] Calling AI with prompt: {prompt}")
+        # Sends every target to the AI model concurrently; the AIClient's
+        # concurrency cap and rate limiter decide how many are in flight.
+        # Targets queue highest priority first (lib/_schedule.py), so a
+        # deadline or budget cuts off the least valuable ones; results keep
+        # document order. Each finished result is journaled to the
+        # checkpoint at once; with --resume, journaled ones are reused.
+        # As a pipeline stage, targets arrive from the upstream stream
+        # instead, and each finished one is passed downstream immediately.
+        total = len(self.equations)
+        weights = scores(self.equations, self.document.text)
+        done = 0
+        ckpt = self._checkpoint()
+        config = run_config_key(self.audit_name, self._model_key(), self._reply_budget(),
+                                self.system_prompt, self.few_shots)
+        before = ckpt.begin(config)
+        if self.args.resume:
+            self.log.info(f"[{self.audit_name}] resuming: {before['done']} of {total} targets done, "
+                          f"{before['failed']} failed will be retried")
+
+        self.results = [None] * total
+        _metrics.targets_queued.inc(self.audit_name, amount=total)
+
+        async def one(i, upstream=None):
+            nonlocal done
+            target = self.equations[i]
+            eq = dict(target, upstream=upstream) if upstream else target
+            result = ckpt.get(config, target)
+            if result is not None:
+                self._resumed(target, result)
+                if self.fusion is not None:
+                    self.fusion.skip(self, target)
+            else:
+                try:
+                    result = await self._dispatch(eq)
+                    ckpt.record(config, target, result)
+                except BudgetExhausted as ex:
+                    self.pending += 1
+                    result = {"equation": eq.get("equation", ""), "pending": True,
+                              "notes": f"[SKIPPED] {ex}; finish with --resume"}
+            verdict = parse_verdict(result["notes"])
+            if self.args.fail_fast and verdict is Verdict.FAIL and self.budget is not None:
+                self.budget.halt(f"stopped after first failure ({self.audit_name})")
+            _metrics.observe_target(self.audit_name, None if result.get("pending") else verdict.value)
+            self.results[i] = result
+            if self.downstream is not None:
+                self.downstream.put(i, {**(upstream or {}), self.audit_name: self._handoff(result)})
+            done += 1
+            self._report_progress(done, len(self.equations))
+
+        order = prioritize(weights)
+        if self.upstream is None:
+            await asyncio.gather(*(one(i) for i in order))
+            if self.sample is not None and self.downstream is None:
+                weights = await self._expand_sample(one)
+        else:
+            tasks, seen = [], set()
             try:
-                reply = await self.ai_client.complete(self.system_prompt, prompt, fewshot=self.few_shots)
-            except Exception as ex:
-                reply = f"ERROR: {ex}"
-            self.results.append({"equation": eq['equation'], "notes": reply})
-            self.log.debug(f"[DEBUG] AI reply: {reply}")
+                async for i, upstream in self.upstream:
+                    seen.add(i)
+                    tasks.append(asyncio.ensure_future(one(i, upstream)))
+                # Targets the upstream stage never handed over (it failed or
+                # stopped early) still get audited, just without its findings.
+                tasks += [asyncio.ensure_future(one(i)) for i in order if i not in seen]
+                await asyncio.gather(*tasks)
+            except asyncio.CancelledError:
+                for t in tasks:
+                    t.cancel()
+                raise
+        if self.downstream is not None:
+            self.downstream.close()
+        covered = sum(w for w, r in zip(weights, self.results) if not r.get("pending"))
+        total = len(self.results)  # grows when --sample-expand adds sections
+        self.coverage = {
+            "targets": total,
+            "done": total - self.pending,
+            "pending": self.pending,
+            "weight": round(covered / sum(weights), 3) if sum(weights) else 1.0,
+        }
+        if self.pending:
+            self.log.info(f"[{self.audit_name}] {self.pending} target(s) not sent; covered "
+                          f"{self.coverage['weight']:.1%} of priority weight. Rerun with --resume to finish")
         self.state = State.OUTPUT_RESULTS
         self.log.debug(f"[STATE] Transitioning to {self.state.name}")
-    
+
+    async def _expand_sample(self, one) -> list:
+        """
+        --sample-expand: audit every remaining target of the sections whose
+        estimated failure rate reaches the threshold, then put targets and
+        results back in document order. Returns the new priority weights.
+        """
+        threshold = getattr(self.args, "sample_expand", None)
+        extra = []
+        if threshold is not None:
+            extra = self.sample.expand(self.sample.answered(self.equations, self.results), threshold)
+        if extra:
+            self.log.info(f"[{self.audit_name}] failure estimate >= {threshold:.0%} in "
+                          f"{', '.join(self.sample.expanded)}: auditing {len(extra)} more target(s)")
+            if self.fusion is not None:
+                # Audits expand different sections, so these go out unfused.
+                self.fusion.leave(self)
+                self.fusion = None
+            first = len(self.equations)
+            self.equations = self.equations + [self.sample.population[i] for i in extra]
+            self.results = self.results + [None] * len(extra)
+            _metrics.targets_queued.inc(self.audit_name, amount=len(extra))
+            await asyncio.gather(*(one(i) for i in range(first, len(self.equations))))
+            pairs = sorted(zip(self.equations, self.results), key=lambda p: self.sample.index[id(p[0])])
+            self.equations, self.results = [p[0] for p in pairs], [p[1] for p in pairs]
+        return scores(self.equations, self.document.text)
+
+    def _cascade_summary(self):
+        """How many targets each tier decided, or None outside a cascade."""
+        if self.triage_schema is None:
+            return None
+        tiers = [r.get("tier") for r in self.results]
+        return {"triage_model": self.args.triage_model,
+                "escalate_model": self._escalation_client().model,
+                "triage": tiers.count("triage"), "escalated": tiers.count("escalated")}
+
     def _output_results(self):
-        lines = [f"\n--- Target {i+1} ---\n{r['equation']}\n{r['notes']}" for i, r in enumerate(self.results)]
-        human = emit_human(f"=== {self.args._audit_name.title()} Audit ===", lines)
-        json_obj = emit_json(audit=self.args._audit_name, results=self.results)
-        write_outputs(human, json_obj, self.args.output, self.args.json)
-        print("debugging _output_results")
-        # print(human)
-        # print(json.dumps(json_obj, indent=2))
-        
-        self.state = State.SHUTDOWN
+        def tier(r):
+            if not r.get("tier") or not r.get("meta"):
+                return ""
+            verb = "decided by triage model" if r["tier"] == "triage" else "escalated to"
+            return f"\n[{verb} {r['meta']['model']}]"
+        lines = [f"\n--- Target {i+1} ---\n{r['equation']}\n{r['notes']}{tier(r)}" for i, r in enumerate(self.results)]
+        title = f"=== {self.audit_name.title()} Audit ==="
+        extra = {}
+        if self.pending:
+            c = self.coverage
+            title += (f"\nCoverage: {c['done']}/{c['targets']} targets "
+                      f"({c['weight']:.1%} of priority weight); {c['pending']} not sent")
+            extra["coverage"] = c
+        if self.sample is not None:
+            est = self.sample.estimate(self.sample.answered(self.equations, self.results))
+            title += (f"\nSample: {est['sampled']} of {est['population']} targets in {est['strata']} strata "
+                      f"(seed {est['seed']}); estimated rates, 95% CI: {format_rates(est['rates']) or 'none'}")
+            if est["expanded"]:
+                title += f"\nAudited in full after a high failure estimate: {', '.join(est['expanded'])}"
+            extra["sample"] = est
+        cascade = self._cascade_summary()
+        if cascade:
+            title += (f"\nCascade: {cascade['triage']} target(s) decided by {cascade['triage_model']}, "
+                      f"{cascade['escalated']} escalated to {cascade['escalate_model']}")
+            extra["cascade"] = cascade
+        human = emit_human(title, lines)
+        json_obj = emit_json(audit=self.audit_name, results=self.results, **extra)
+        self._emit(human, json_obj)
+        self.log.debug("Results written.")
+
+        self.state = State.CALL_NEXT_IN_CHAIN if self.downstream is not None else State.SHUTDOWN
         self.log.debug(f"[STATE] Transitioning to {self.state.name}")
 
     def _call_next(self):
-        # Optional: define in chained pipeline mode
+        # Pipeline mode: every result has already been streamed to the next
+        # stage as it finished; only the end of the stream is left to signal.
+        self.downstream.close()
+        self.log.debug(f"[{self.audit_name}] handed {len(self.results)} result(s) downstream")
         self.state = State.SHUTDOWN
         self.log.debug(f"[STATE] Transitioning to {self.state.name}")
 
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+calibrate.py — How far can the triage model be trusted?
+`eqnlint calibrate -f paper.tex --triage-model ollama:phi --escalate-model gpt-4o`
+
+Runs both tiers of the cascade on every target (nothing is settled by
+triage) and reports, per audit:
+
+    agree       targets where both tiers give the same verdict
+    threshold   a --triage-confidence value
+    escalated   share of targets the cascade would send to the strong model
+    missed      targets triage would pass at that threshold that the strong
+                model flags (what the cascade would let through)
+
+Pick the lowest threshold whose `missed` you can live with. Accepts the
+usual eqnlint flags (--audits, --rate, --max-calls, ...); --json writes the
+numbers to a file.
+"""
+
+import sys
+import json
+import argparse
+
+from eqnlint.lib._cli import base_parser
+
+THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99)
+
+def build_parser(audits):
+    from eqnlint.bin.eqnlint import audit_extra_args
+
+    return base_parser("Measure agreement between the triage and escalation models of a cascade.",
+                       "calibrate", audit_extra_args(audits))
+
+def pairs(machine):
+    """(triage verdict, triage confidence, escalation verdict) per target both tiers answered."""
+    from eqnlint.lib._verdict import Verdict, parse_verdict
+
+    out = []
+    for r in machine.results or []:
+        if not r or r.get("pending") or "triage" not in r:
+            continue
+        final = parse_verdict(r.get("notes", ""))
+        if r["triage"]["verdict"] == "error" or final in (Verdict.ERROR, Verdict.UNKNOWN):
+            continue
+        out.append((r["triage"]["verdict"], r["triage"]["confidence"], final.value))
+    return out
+
+def calibration(rows, thresholds=THRESHOLDS):
+    """Agreement and per-threshold escalation/miss rates for one audit's pairs."""
+    n = len(rows)
+    agree = sum(t == f for t, _, f in rows)
+    flagged = sum(f != "pass" for _, _, f in rows)
+    table = []
+    for th in thresholds:
+        settled = [(t, c, f) for t, c, f in rows if t == "pass" and c >= th]
+        missed = sum(f != "pass" for _, _, f in settled)
+        table.append({"threshold": th,
+                      "escalated": round(1 - len(settled) / n, 3) if n else 0.0,
+                      "missed": missed,
+                      "missed_share": round(missed / flagged, 3) if flagged else 0.0})
+    safe = [row["threshold"] for row in table if row["missed"] == 0]
+    return {"targets": n, "agree": round(agree / n, 3) if n else 0.0, "flagged": flagged,
+            "thresholds": table, "suggested": min(safe) if safe else None}
+
+def main(argv=None):
+    import asyncio
+    from eqnlint.bin.eqnlint import audit_names, discover_audits, run_audits, Progress
+    from eqnlint.bin.query import print_table
+    from eqnlint.lib._checkpoint import Checkpoint
+    from eqnlint.lib._textio import write_text
+    from eqnlint.lib import _debug, _metrics, _trace
+
+    argv = sys.argv[1:] if argv is None else argv
+    pre = argparse.ArgumentParser(add_help=False)
+    pre.add_argument("--audits")
+    selected = discover_audits(audit_names(pre.parse_known_args(argv)[0].audits))
+    selected = {name: cls for name, cls in selected.items() if cls.verdict_labels or name == "symbolic"}
+    args = build_parser(selected).parse_args(argv)
+    if not args.triage_model:
+        raise SystemExit("calibrate needs --triage-model (and usually --escalate-model)")
+    args.calibrate = True
+    args.free_text = False  # triage verdicts are compared with structured ones
+    _debug.set_level(args.verbose)
+    _trace.configure(args)
+    _metrics.configure(args)
+    log = _debug.logger
+
+    machines = asyncio.run(run_audits(args, selected, progress=Progress(log), checkpoint=Checkpoint(None)))
+    report, rows = {}, []
+    for name, m in machines.items():
+        if m.triage_schema is None:
+            continue  # symbolic: feeds the symbol table, has no verdict
+        report[name] = calibration(pairs(m))
+        for row in report[name]["thresholds"]:
+            rows.append({"audit": name, "agree": report[name]["agree"], **row})
+    escalate = args.escalate_model or args.model
+    print(f"Triage {args.triage_model} vs {escalate}")
+    print_table(rows)
+    for name, r in report.items():
+        hint = f"{r['suggested']}" if r["suggested"] is not None else "none (triage misses flagged targets at every threshold)"
+        print(f"{name}: {r['targets']} targets, {r['flagged']} flagged by {escalate}; "
+              f"lowest threshold with no misses: {hint}")
+    _trace.finish(args)
+    _metrics.finish(args)
+    if args.json:
+        write_text(args.json, json.dumps({"triage_model": args.triage_model, "escalate_model": escalate,
+                                          "audits": report}, indent=2))
+
+if __name__ == "__main__":
+    main()
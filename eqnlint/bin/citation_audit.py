@@ -13,17 +13,20 @@ from eqnlint.lib._fewshots import FewShotLibrary
 from .audit_template import AuditStateMachine, State
 
 class CitationAuditStateMachine(AuditStateMachine):
-    def __init__(self):
-        super().__init__()
+    audit_name = "citation"
+    target_kind = "citations"
+    verdict_labels = {"pass": "DEFINED", "fail": "UNDEFINED", "warn": "POSSIBLY FABRICATED"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         # Parent expects 'equation' + 'context' in each target
         self.required_keys = ["equation", "context"]
 
-    def _extract_targets(self):
+    def _find_targets(self, tex: str) -> list:
         """
         Find \cite{...} instances and grab ±1 paragraph of surrounding context.
         Store the full cite string in 'equation' to satisfy parent flow.
         """
-        tex = self.text
         pat = re.compile(r"(\\cite\{(.*?)\})")
         targets = []
 
@@ -40,26 +43,25 @@ class CitationAuditStateMachine(AuditStateMachine):
             targets.append({
                 "equation": full_cite,  # << satisfy parent loop
                 "context": context,
+                "start": start,
+                "end": end,
             })
+        return targets
 
+    def _extract_targets(self):
+        targets = self.document.targets(self.target_kind, self._find_targets)
         self.equations = targets
         self.log.debug(f"Audit Citations: Found {len(targets)} citation targets")
 
         # Advance state (or exit on dry-run)
         if getattr(self, "args", None) and getattr(self.args, "dry_run", False):
             from eqnlint.lib._textio import emit_human, emit_json
-            from eqnlint.lib._cli import write_outputs
             lines = [
-                f"\\n--- Citation {i+1} ---\\n{t['equation']}\\n\\n{t['context']}"
+                f"\n--- Citation {i+1} ---\n{t['equation']}\n\n{t['context']}"
                 for i, t in enumerate(self.equations)
             ]
             human = emit_human("=== DRY RUN: Citations ===", lines)
-            write_outputs(
-                human,
-                emit_json(citations=[t["equation"] for t in self.equations]),
-                self.args.output,
-                self.args.json
-            )
+            self._emit(human, emit_json(citations=[t["equation"] for t in self.equations]))
             self.state = State.SHUTDOWN
         else:
             self.state = State.GET_FEW_SHOTS
@@ -71,7 +73,7 @@ class CitationAuditStateMachine(AuditStateMachine):
         )
         self.few_shots = FewShotLibrary.citations()
         self.state = State.CALL_AI_WITH_FEW_SHOTS_AND_TARGETS
-        self.log.debug(f"Audit Citations: few shots returns {self.few_shots}")
+        self.log.debug(f"Audit Citations: {len(self.few_shots)} few-shot messages")
         self.log.debug(f"Audit Citations: After State call {self.state}")
 
     def _build_prompt(self, item: dict) -> str:
@@ -12,24 +12,26 @@ import sys
 sys.path.append(str(Path(__file__).resolve().parents[1] / "lib"))
 
 from eqnlint.lib._fewshots import FewShotLibrary
-from eqnlint.lib._textio import emit_human, emit_json, write_outputs
+from eqnlint.lib._textio import emit_human, emit_json
 from .audit_template import AuditStateMachine, State
 
 class ContextAuditStateMachine(AuditStateMachine):
-    def __init__(self):
-        super().__init__()
+    audit_name = "context"
+    target_kind = "cite_keys"
+    verdict_labels = {"pass": "ACCURATE", "fail": "FABRICATION"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         self.required_keys = ["cite", "context"]
 
     def _get_few_shots(self):
         self.system_prompt = "You are an expert scientific reviewer. Audit citations for accuracy."
         self.few_shots = FewShotLibrary.context()
         self.state = State.CALL_AI_WITH_FEW_SHOTS_AND_TARGETS
-        self.log.debug(f"Audit Context: few shots returns {self.few_shots}")
+        self.log.debug(f"Audit Context: {len(self.few_shots)} few-shot messages")
         self.log.debug(f"Audit Context: After State call {self.state}")
 
-    def _extract_targets(self):
-        tex_data = self.text
-
+    def _find_targets(self, tex_data: str) -> list:
         # catches \cite, \citep, \citet, etc.  (optional improvement)
         cite_pattern = r"(\\cite[a-zA-Z]*\{(.*?)\})"
         matches = re.finditer(cite_pattern, tex_data)
@@ -45,7 +47,12 @@ class ContextAuditStateMachine(AuditStateMachine):
                 context_end = len(tex_data)
             context = tex_data[context_start:context_end].strip()
             for key in cite_keys:
-                targets.append({"cite": key, "full_cite": full_cite, "context": context})
+                targets.append({"cite": key, "full_cite": full_cite, "context": context,
+                                "start": start, "end": end})
+        return targets
+
+    def _extract_targets(self):
+        targets = self.document.targets(self.target_kind, self._find_targets)
 
         # back-compat with parent _call_ai()
         self.equations = targets
@@ -57,12 +64,7 @@ class ContextAuditStateMachine(AuditStateMachine):
                 for i, t in enumerate(self.equations)
             ]
             human = emit_human("=== DRY RUN: Citations ===", lines)
-            write_outputs(
-                human,
-                emit_json(citations=[t["full_cite"] for t in self.equations]),
-                self.args.output,
-                self.args.json
-            )
+            self._emit(human, emit_json(citations=[t["full_cite"] for t in self.equations]))
             self.state = State.SHUTDOWN
             self.log.debug(f"[STATE] Transitioning to {self.state.name}")
         else:
@@ -75,21 +77,13 @@ class ContextAuditStateMachine(AuditStateMachine):
             f"Audit:\nDoes \\cite{{{item['cite']}}} support this claim?"
         )
     
-    async def _call_ai(self):
-        self.results = []
-        for item in self.equations:  # these are citation targets
-            prompt = self._build_prompt(item)
-            self.log.debug(f"[DEBUG] Calling AI with prompt: {prompt}")
-            try:
-                reply = await self.ai_client.complete(self.system_prompt, prompt, fewshot=self.few_shots)
-            except Exception as ex:
-                reply = f"ERROR: {ex}"
-            display = item.get("full_cite") or f"\\cite{{{item.get('cite','')}}}"
-            # keep the 'equation' key so the base _output_results works
-            self.results.append({"equation": display, "notes": reply})
-            self.log.debug(f"[DEBUG] AI reply: {reply}")
-        self.state = State.OUTPUT_RESULTS
-        self.log.debug(f"[STATE] Transitioning to {self.state.name}")
+    async def _dispatch(self, item: dict) -> dict:
+        # these are citation targets
+        display = item.get("full_cite") or f"\\cite{{{item.get('cite','')}}}"
+        # keep the 'equation' key so the base _output_results works
+        result = {"equation": display}
+        result.update(await self._ask(self._build_prompt(item)))
+        return result
 
 
 def main():
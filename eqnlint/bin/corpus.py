@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+corpus.py — Audit a whole corpus of papers: `eqnlint corpus <dir|glob|list-file> ...`
+
+- Local work (reading files and extracting targets for every audit) runs in a
+  process pool, so it scales with cores.
+- Network work runs in one event loop through one shared AIClient, so every
+  paper and every audit draws on the same --rate / --concurrency budget.
+- Each paper gets its own report directory; the corpus gets summary.json and
+  summary.md. A manifest records finished papers so `--resume` skips them,
+  and each paper's checkpoint lets `--resume` finish a paper that was cut
+  short (Ctrl-C, outage, or the global --max-calls budget).
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from eqnlint.lib._cli import base_parser
+from eqnlint.lib._textio import read_text, write_text
+
+MANIFEST = "corpus.json"
+
+def collect_sources(specs):
+    """
+    Expand directories (recursive *.tex and source archives), globs, and
+    list files (one path per line).
+    """
+    from eqnlint.lib._archive import is_archive
+
+    paths = []
+    for spec in specs:
+        p = Path(spec)
+        if p.is_dir():
+            paths += sorted(f for f in p.rglob("*") if f.is_file() and (f.suffix == ".tex" or is_archive(f)))
+        elif p.is_file() and (p.suffix == ".tex" or is_archive(p)):
+            paths.append(p)
+        elif p.is_file():
+            for line in p.read_text(encoding="utf-8").splitlines():
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    paths.append(Path(line))
+        else:
+            paths += sorted(Path(m) for m in glob.glob(spec, recursive=True))
+    seen, out = set(), []
+    for path in paths:
+        key = path.resolve()
+        if key not in seen:
+            seen.add(key)
+            out.append(path)
+    return out
+
+def paper_slug(path):
+    """Stable, collision-free report directory name for a paper."""
+    digest = hashlib.sha1(str(Path(path).resolve()).encode("utf-8")).hexdigest()[:8]
+    stem = Path(path).stem.removesuffix(".tar")  # paper.tar.gz -> paper
+    return f"{stem}-{digest}"
+
+def config_key(args, audit_names):
+    """Settings that change results; a finished paper is reused only if these match."""
+    cfg = {"model": args.model, "max_tokens": args.max_tokens, "free_text": args.free_text,
+           "audits": sorted(audit_names)}
+    if args.few_shot_pool:
+        cfg["few_shot_pool"] = args.few_shot_pool
+    if args.triage_model:
+        cfg.update(triage=args.triage_model, escalate=args.escalate_model, confidence=args.triage_confidence)
+    if args.sample is not None:
+        cfg.update(sample=args.sample, seed=args.sample_seed, expand=args.sample_expand)
+    if args.fuse is not None:
+        cfg["fuse"] = args.fuse
+    if args.pipeline:
+        cfg["pipeline"] = args.pipeline
+    if args.all_few_shots:
+        cfg["few_shots"] = "all"
+    else:
+        cfg.update(few_shots=args.few_shots, few_shot_tokens=args.few_shot_tokens)
+    if args.reason_on_fail or args.no_early_stop:
+        cfg.update(reason_on_fail=args.reason_on_fail, early_stop=not args.no_early_stop)
+    return hashlib.sha1(json.dumps(cfg, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+def text_sha(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def paper_sha(path):
+    """The manifest's content hash of a paper, without extracting anything (None if unreadable)."""
+    try:
+        return text_sha(read_text(path))
+    except (OSError, ValueError):
+        return None
+
+def prepare(path, audit_names, args):
+    """
+    Worker-process entry point: read one paper and run every extraction the
+    selected audits need. Returns plain data so it pickles cheaply.
+    """
+    from eqnlint.bin.eqnlint import discover_audits
+
+    audits = discover_audits(audit_names)
+    text = read_text(path)
+    targets = {}
+    for name in audit_names:
+        cls = audits[name]
+        if cls.target_kind not in targets:
+            targets[cls.target_kind] = cls(args=args)._find_targets(text)
+    return {
+        "path": str(path),
+        "sha": text_sha(text),
+        "text": text,
+        "targets": targets,
+    }
+
+def verdict_counts(machines):
+    """{audit: {verdict: n}} for one paper."""
+    from eqnlint.lib._verdict import parse_verdict
+
+    counts = {}
+    for name, m in machines.items():
+        c = {}
+        if m.error is not None:
+            c["error"] = 1
+        for r in m.results:
+            v = parse_verdict(r.get("notes", "")).value
+            c[v] = c.get(v, 0) + 1
+        counts[name] = c
+    return counts
+
+def sample_estimates(machines):
+    """{audit: {population, sampled, rates}} for one paper under --sample."""
+    out = {}
+    for name, m in machines.items():
+        est = (m.report or {}).get("json", {}).get("sample")
+        if est:
+            out[name] = {k: est[k] for k in ("population", "sampled", "rates")}
+    return out
+
+class Manifest:
+    """
+    Resumable record of finished papers, rewritten atomically after each one.
+    With persist=False (--dry-run) entries only feed the summary: nothing was
+    audited, so --resume must not skip those papers.
+    """
+    def __init__(self, out_dir, persist=True):
+        self.path = Path(out_dir) / MANIFEST
+        self.persist = persist
+        self.papers = {}
+        if self.path.is_file():
+            try:
+                self.papers = json.loads(self.path.read_text(encoding="utf-8")).get("papers", {})
+            except ValueError:
+                self.papers = {}
+
+    def done(self, path, sha, key):
+        entry = self.papers.get(str(path))
+        return bool(entry) and entry.get("status") == "done" and entry.get("sha") == sha and entry.get("config") == key
+
+    def record(self, path, entry):
+        self.papers[str(path)] = entry
+        if not self.persist:
+            return
+        tmp = self.path.with_suffix(".tmp")
+        write_text(tmp, json.dumps({"papers": self.papers}, indent=2))
+        os.replace(tmp, self.path)
+
+def write_summary(out_dir, manifest, paths):
+    from eqnlint.lib._sample import format_rates, pool
+
+    rows = [manifest.papers[str(p)] for p in paths if str(p) in manifest.papers]
+    totals = {}
+    for row in rows:
+        for audit, counts in row.get("verdicts", {}).items():
+            t = totals.setdefault(audit, {})
+            for v, n in counts.items():
+                t[v] = t.get(v, 0) + n
+    sampled = {}
+    for row in rows:
+        for audit, est in row.get("sample", {}).items():
+            sampled.setdefault(audit, []).append(est)
+    summary = {
+        "papers": len(paths),
+        "done": sum(1 for r in rows if r.get("status") == "done"),
+        "failed": sum(1 for r in rows if r.get("status") == "failed"),
+        "partial": sum(1 for r in rows if r.get("status") == "partial"),
+        "verdicts": totals,
+        "per_paper": rows,
+    }
+    if sampled:
+        # Each paper is a stratum of the corpus: pooled rates with 95 % intervals.
+        summary["estimated_rates"] = {
+            audit: {"population": sum(e["population"] for e in ests), "sampled": sum(e["sampled"] for e in ests),
+                    "rates": pool(ests)}
+            for audit, ests in sampled.items()}
+    write_text(Path(out_dir) / "summary.json", json.dumps(summary, indent=2))
+
+    lines = ["# eqnlint corpus summary", "",
+             f"Papers: {summary['papers']}  done: {summary['done']}  failed: {summary['failed']}  "
+             f"partial: {summary['partial']}", "",
+             "| Paper | Status | Fail | Warn | Pass | Report |", "|---|---|---|---|---|---|"]
+    for row in rows:
+        agg = {}
+        for counts in row.get("verdicts", {}).values():
+            for v, n in counts.items():
+                agg[v] = agg.get(v, 0) + n
+        lines.append(f"| {row['path']} | {row['status']} | {agg.get('fail', 0)} | {agg.get('warn', 0)} "
+                     f"| {agg.get('pass', 0)} | {row.get('report', '')} |")
+    if sampled:
+        lines += ["", "## Estimated rates (--sample, 95% CI)", "",
+                  "| Audit | Equations | Sampled | Rates |", "|---|---|---|---|"]
+        for audit, est in summary["estimated_rates"].items():
+            lines.append(f"| {audit} | {est['population']} | {est['sampled']} | {format_rates(est['rates'])} |")
+    write_text(Path(out_dir) / "summary.md", "\n".join(lines) + "\n")
+    return summary
+
+async def run_corpus(args, audits, paths, workers, store=None, run_id=None, plans=None):
+    from eqnlint.lib._ai import AIClient, ollama_options
+    from eqnlint.lib._budget import Budget
+    from eqnlint.lib._extract import Document
+    from eqnlint.bin.eqnlint import run_audits, write_suite_outputs
+    from eqnlint.lib._estimate import plan
+    from eqnlint.lib import _debug, _metrics
+
+    log = _debug.logger
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = Manifest(out_dir, persist=not args.dry_run)
+    key = config_key(args, audits)
+    client = AIClient(args.model, rate=args.rate, max_tokens=args.max_tokens, concurrency=args.concurrency,
+                      ollama=ollama_options(args))
+    budget = Budget(args.max_calls, args.deadline)  # one for the whole corpus
+    papers_sem = asyncio.Semaphore(max(1, args.papers_in_flight))
+    # Papers extracted but not finished yet, text and targets in memory: enough
+    # to keep the workers ahead of the network, never the whole corpus.
+    ahead = asyncio.Semaphore(max(1, args.papers_in_flight) + max(1, workers))
+    loop = asyncio.get_running_loop()
+    finished = 0
+
+    async def one(pool, path):
+        nonlocal finished
+        if args.resume and manifest.done(path, await loop.run_in_executor(None, paper_sha, str(path)), key):
+            finished += 1
+            _metrics.papers.inc("skipped")
+            log.info(f"[corpus] {finished}/{len(paths)} {path} (unchanged, skipped)")
+            return
+        async with ahead:
+            try:
+                doc = await loop.run_in_executor(pool, prepare, str(path), list(audits), args)
+            except Exception as e:
+                manifest.record(path, {"path": str(path), "status": "failed", "error": f"read/extract: {e}"})
+                _metrics.papers.inc("failed")
+                return
+            await audit(path, doc)
+        finished += 1
+        log.info(f"[corpus] {finished}/{len(paths)} {path}")
+
+    async def audit(path, doc):
+        async with papers_sem:
+            paper_dir = out_dir / paper_slug(path)
+            paper_dir.mkdir(exist_ok=True)
+            paper_args = argparse.Namespace(**vars(args))
+            paper_args.file = str(path)
+            paper_args.output = str(paper_dir / "report.log")
+            paper_args.json = str(paper_dir / "report.json")
+            paper_args.symbols = str(paper_dir / "symbols.json")
+            paper_args.checkpoint = str(paper_dir / "checkpoint.jsonl")
+            document = Document(doc["text"], str(path), targets=doc["targets"])
+            t0 = time.monotonic()
+            machines = await run_audits(paper_args, audits, document=document, client=client, budget=budget)
+            if plans is not None:
+                plans.extend(plan(m) for m in machines.values() if m.error is None)
+            write_suite_outputs(paper_args, machines)
+            if store is not None:
+                store.add_results(run_id, str(path), doc["text"], machines)
+            errors = {n: str(m.error) for n, m in machines.items() if m.error is not None}
+            pending = sum(m.pending for m in machines.values())
+            status = "failed" if errors else "partial" if pending else "done"
+            _metrics.papers.inc(status)
+            manifest.record(path, {
+                "path": str(path), "sha": doc["sha"], "config": key,
+                "status": status,
+                "pending": pending,
+                "errors": errors,
+                "report": str(paper_dir),
+                "seconds": round(time.monotonic() - t0, 2),
+                "verdicts": verdict_counts(machines),
+                **({"sample": sample_estimates(machines)} if args.sample is not None else {}),
+            })
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            await asyncio.gather(*(one(pool, p) for p in paths))
+    finally:
+        await client.aclose()
+    return write_summary(out_dir, manifest, paths)
+
+def build_parser(audits):
+    from eqnlint.bin.eqnlint import audit_extra_args
+
+    extra = audit_extra_args(audits) + [
+        (["sources"], {"nargs": "+", "help": "Directories (recursive *.tex), globs, or list files"}),
+        (["--out-dir"], {"default": "eqnlint-corpus", "help": "Where per-paper reports and the summary go"}),
+        (["--workers"], {"type": int, "default": os.cpu_count() or 1,
+                         "help": "Processes for local parsing/extraction"}),
+        (["--papers-in-flight"], {"type": int, "default": 8,
+                                  "help": "Papers whose audits may run at once (network budget is global)"}),
+    ]
+    return base_parser("Audit a corpus of LaTeX papers.", "corpus", extra, require_file=False)
+
+def main(argv=None):
+    from eqnlint.bin.eqnlint import discover_audits, select_audits
+    from eqnlint.lib import _debug, _metrics, _trace
+
+    audits = discover_audits()
+    args = build_parser(audits).parse_args(argv)
+    _debug.set_level(args.verbose)
+    _trace.configure(args)  # main process only: requests and audit states, not worker parsing
+    _metrics.configure(args)
+    log = _debug.logger
+    selected = select_audits(audits, args.pipeline or args.audits)
+
+    paths = collect_sources(args.sources)
+    if not paths:
+        print("❌ No LaTeX files found.")
+        sys.exit(1)
+    log.info(f"[corpus] {len(paths)} paper(s), audits: {', '.join(selected)}, workers: {args.workers}")
+    store = run_id = None
+    if args.db and not args.dry_run:
+        from eqnlint.lib._store import ResultStore
+        store = ResultStore(args.db)
+        run_id = store.start_run(args, selected, argv if argv is not None else sys.argv[1:])
+    t0 = time.monotonic()
+    plans = [] if args.dry_run else None
+    try:
+        summary = asyncio.run(run_corpus(args, selected, paths, args.workers, store, run_id, plans))
+    except KeyboardInterrupt:
+        log.info("Interrupted by user. Finished papers are recorded; rerun with --resume.")
+        sys.exit(130)
+    finally:
+        if store is not None:
+            store.finish_run(run_id)
+            store.close()
+    log.info(f"[corpus] done={summary['done']} failed={summary['failed']} partial={summary['partial']} "
+             f"in {time.monotonic() - t0:.1f}s -> {Path(args.out_dir) / 'summary.md'}")
+    if plans is not None:
+        from eqnlint.lib._estimate import dry_run_estimate, format_estimate
+        estimate = dry_run_estimate(plans, args)
+        write_text(Path(args.out_dir) / "estimate.json", json.dumps(estimate, indent=2))
+        print(format_estimate(estimate, args))
+    _trace.finish(args)
+    _metrics.finish(args)
+    sys.exit(1 if summary["failed"] or summary["partial"] else 0)
+
+if __name__ == "__main__":
+    main()
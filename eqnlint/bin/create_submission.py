@@ -2,107 +2,246 @@
 
 """
 create_submission.py - Helper script to prepare LaTeX submissions for journals.
+`create-submission -p my_project --run-audits`
 
 Features:
-✅ Runs dimensional & symbolic audits on LaTeX equations.
-✅ Generates a summary report (Markdown + text).
-✅ Packages sources and figures into a tarball.
-✅ Optional PRL-style checklist.
+✅ Runs the selected audits (default: dimensional & symbolic) on every .tex
+   file of the project, in-process and concurrently: one shared AIClient
+   (one --rate / --concurrency budget), extraction in a process pool.
+✅ Generates a per-file summary report (Markdown), plus the corpus summary
+   and a report directory per file under <out-dir>/audits.
+✅ Packages sources and figures into a tarball while the audits run.
+✅ Skips unchanged work by content hash: audited files whose text and
+   settings are unchanged are reused (`--force` redoes them), and tarball
+   members are compressed once and reused until their content changes.
 
 MIT License © 2025 John Ryan
 """
 
 import os
 import sys
-import argparse
-import subprocess
+import gzip
+import json
+import time
+import asyncio
+import hashlib
 import tarfile
+import argparse
+from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from eqnlint.lib._cli import base_parser
+
+DEFAULT_AUDITS = "dimensional,symbolic"
+PACKAGE_CACHE = ".package-cache"
+PACKAGE_MANIFEST = "package.json"
+
+def _skipped(rel: Path, skip_figures: bool) -> bool:
+    # Hidden entries (.git, .DS_Store, editor state) never belong in a submission.
+    return any(part.startswith(".") for part in rel.parts) or (skip_figures and rel.parts[0] == "figures")
+
+def project_files(project, out_dir, skip_figures=False):
+    """Files of the project, relative and sorted, without the output directory."""
+    project, out_dir = Path(project).resolve(), Path(out_dir).resolve()
+    files = []
+    for root, dirs, names in os.walk(project):
+        root = Path(root)
+        dirs[:] = sorted(d for d in dirs if (root / d).resolve() != out_dir)
+        for name in sorted(names):
+            rel = (root / name).relative_to(project)
+            if not _skipped(rel, skip_figures):
+                files.append(rel)
+    return files
+
+def _sha(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+def _member(path: Path, arcname: str) -> bytes:
+    """
+    One gzip-compressed tar member (header, data, padding). A .tar.gz may be
+    a concatenation of gzip streams, so members compressed on an earlier run
+    are reused byte for byte.
+    """
+    data = path.read_bytes()
+    st = path.stat()
+    info = tarfile.TarInfo(arcname)
+    info.size = len(data)
+    info.mtime = int(st.st_mtime)
+    info.mode = st.st_mode & 0o777
+    block = info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+    block += data + b"\0" * (-len(data) % tarfile.BLOCKSIZE)
+    return gzip.compress(block, mtime=0)
+
+def package_submission(source_dir, output_tar, skip_figures, out_dir, workers=None):
+    """
+    Package LaTeX sources and optionally figures into a tar.gz.
+
+    Each member is keyed by the hash of its name and content; only new or
+    changed files are read into the tarball's cache (<out-dir>/.package-cache)
+    and compressed, in a thread pool. If nothing changed and the tarball
+    exists, it is left alone. Returns (members, recompressed).
+    """
+    source_dir, out_dir = Path(source_dir), Path(out_dir)
+    cache = out_dir / PACKAGE_CACHE
+    cache.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / PACKAGE_MANIFEST
+    try:
+        previous = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        previous = {}
+
+    files = project_files(source_dir, out_dir, skip_figures)
+    keys = {}
+    for rel in files:
+        arcname = rel.as_posix()
+        keys[arcname] = _sha(arcname.encode("utf-8") + b"\0" + (source_dir / rel).read_bytes())
+
+    if previous.get("members") == keys and Path(output_tar).is_file():
+        print(f"📦 {output_tar} is up to date ({len(keys)} files unchanged).")
+        return len(keys), 0
+
+    missing = [a for a, k in keys.items() if not (cache / k).is_file()]
+
+    def build(arcname):
+        blob = _member(source_dir / arcname, arcname)
+        tmp = cache / f"{keys[arcname]}.{os.getpid()}.tmp"
+        tmp.write_bytes(blob)
+        os.replace(tmp, cache / keys[arcname])
+
+    print(f"📦 Packaging submission to {output_tar} ({len(missing)} of {len(keys)} files changed)...")
+    with ThreadPoolExecutor(max_workers=workers) as pool:  # zlib releases the GIL
+        list(pool.map(build, missing))
+
+    tmp = f"{output_tar}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as out:
+        for key in keys.values():
+            with open(cache / key, "rb") as member:
+                out.write(member.read())
+        out.write(gzip.compress(b"\0" * tarfile.RECORDSIZE, mtime=0))  # end-of-archive blocks
+    os.replace(tmp, output_tar)
+
+    live = set(keys.values())
+    for stale in cache.iterdir():
+        if stale.name not in live:
+            stale.unlink(missing_ok=True)
+    manifest_path.write_text(json.dumps({"members": keys}, indent=2), encoding="utf-8")
+    print("✅ Submission tarball created.")
+    return len(keys), len(missing)
 
-def run_audits(tex_file, output_dir):
-    """Run dimensional and symbolic audits on a LaTeX file."""
-    dim_log = os.path.join(output_dir, "dimensional_audit.log")
-    sym_log = os.path.join(output_dir, "symbolic_audit.log")
-
-    print(f"🔍 Running dimensional audit on {tex_file}...")
-    subprocess.run([
-        sys.executable, "bin/dimensional_audit.py",
-        "-f", tex_file,
-        "-o", dim_log
-    ], check=True)
-
-    print(f"🔍 Running symbolic audit on {tex_file}...")
-    subprocess.run([
-        sys.executable, "bin/symbolic_audit.py",
-        "-f", tex_file,
-        "-o", sym_log
-    ], check=True)
-
-    return dim_log, sym_log
-
-def generate_summary(output_dir, dim_log, sym_log, summary_file):
-    """Combine audit results into a Markdown summary."""
-    with open(summary_file, "w") as out:
-        out.write(f"# 📄 Equation Lint Summary\n\n")
+def generate_summary(summary, summary_file, project):
+    """Per-file Markdown summary of the audits, with each file's report."""
+    with open(summary_file, "w", encoding="utf-8") as out:
+        out.write("# 📄 Equation Lint Summary\n\n")
         out.write(f"Generated on: {datetime.now()}\n\n")
-
-        out.write("## 📐 Dimensional Audit Results\n\n")
-        with open(dim_log) as dim:
-            out.writelines(dim.readlines())
-
-        out.write("\n## 🧠 Symbolic Audit Results\n\n")
-        with open(sym_log) as sym:
-            out.writelines(sym.readlines())
-
-        out.write("\n---\n✅ All equations checked using eqn-lint.\n")
+        out.write(f"Files: {summary['papers']}  done: {summary['done']}  failed: {summary['failed']}  "
+                  f"partial: {summary['partial']}\n\n")
+        for row in summary["per_paper"]:
+            rel = os.path.relpath(row["path"], project)
+            out.write(f"## {rel}\n\n")
+            out.write(f"Status: {row['status']}\n\n")
+            for audit, error in row.get("errors", {}).items():
+                out.write(f"- ❌ {audit}: {error}\n")
+            if row.get("error"):
+                out.write(f"- ❌ {row['error']}\n")
+            verdicts = row.get("verdicts", {})
+            if verdicts:
+                out.write("| Audit | Fail | Warn | Pass | Other |\n|---|---|---|---|---|\n")
+                for audit, counts in verdicts.items():
+                    other = sum(n for v, n in counts.items() if v not in ("fail", "warn", "pass"))
+                    out.write(f"| {audit} | {counts.get('fail', 0)} | {counts.get('warn', 0)} "
+                              f"| {counts.get('pass', 0)} | {other} |\n")
+                out.write("\n")
+            report = Path(row.get("report", "")) / "report.log"
+            if row.get("report") and report.is_file():
+                out.write("```\n" + report.read_text(encoding="utf-8").rstrip() + "\n```\n\n")
+
+        failing = sum(counts.get("fail", 0) for row in summary["per_paper"]
+                      for counts in row.get("verdicts", {}).values())
+        out.write("---\n")
+        out.write("✅ All equations checked using eqn-lint.\n" if not failing and not summary["failed"]
+                  else f"⚠️ {failing} failing verdict(s); see the sections above.\n")
     print(f"✅ Summary report written to {summary_file}")
 
-def package_submission(source_dir, output_tar, skip_figures):
-    """Package LaTeX sources and optionally figures into a tar.gz."""
-    print(f"📦 Packaging submission to {output_tar}...")
-    with tarfile.open(output_tar, "w:gz") as tar:
-        for root, dirs, files in os.walk(source_dir):
-            for f in files:
-                path = os.path.join(root, f)
-                rel_path = os.path.relpath(path, source_dir)
-                if skip_figures and rel_path.startswith("figures"):
-                    continue
-                tar.add(path, arcname=rel_path)
-    print("✅ Submission tarball created.")
+async def prepare_submission(args, audits, tex_files, out_dir, plans=None):
+    """
+    The audits (every file, one shared client, reports under args.out_dir)
+    and the packaging into out_dir (in a thread) run at the same time.
+    Returns the corpus summary, or None when --run-audits was not given.
+    """
+    from eqnlint.bin.corpus import run_corpus
 
-def main():
-    parser = argparse.ArgumentParser(description="Prepare LaTeX submission with audits and tarball.")
-    parser.add_argument("-p", "--project", required=True, help="Path to LaTeX project directory")
-    parser.add_argument("-o", "--output", default="submission", help="Output directory for reports and tarball")
-    parser.add_argument("--run-audits", action="store_true", help="Run dimensional & symbolic audits")
-    parser.add_argument("--skip-figures", action="store_true", help="Do not include figures in tarball")
-    parser.add_argument("--summary-only", action="store_true", help="Only generate summary, skip tarball packaging")
-    args = parser.parse_args()
-
-    os.makedirs(args.output, exist_ok=True)
-    summary_file = os.path.join(args.output, "eqn_lint_summary.md")
-    output_tar = os.path.join(args.output, "submission.tar.gz")
-
-    # Find .tex files in project directory
-    tex_files = [
-        os.path.join(root, f)
-        for root, dirs, files in os.walk(args.project)
-        for f in files if f.endswith(".tex")
+    steps = []
+    if args.run_audits:
+        steps.append(run_corpus(args, audits, tex_files, args.workers, plans=plans))
+    if not args.summary_only:
+        steps.append(asyncio.to_thread(package_submission, args.project, Path(out_dir) / "submission.tar.gz",
+                                       args.skip_figures, out_dir, args.workers))
+    results = await asyncio.gather(*steps)
+    return results[0] if args.run_audits else None
+
+def build_parser(audits):
+    from eqnlint.bin.eqnlint import audit_extra_args
+
+    extra = audit_extra_args(audits) + [
+        (["-p", "--project"], {"required": True, "help": "Path to LaTeX project directory"}),
+        (["--out-dir"], {"default": "submission", "help": "Output directory for reports and tarball"}),
+        (["--run-audits"], {"action": "store_true", "help": f"Run the audits (default: {DEFAULT_AUDITS})"}),
+        (["--skip-figures"], {"action": "store_true", "help": "Do not include figures in tarball"}),
+        (["--summary-only"], {"action": "store_true", "help": "Only generate summary, skip tarball packaging"}),
+        (["--force"], {"action": "store_true", "help": "Re-audit files whose content and settings are unchanged"}),
+        (["--workers"], {"type": int, "default": os.cpu_count() or 1,
+                         "help": "Processes for extraction, threads for compression"}),
+        (["--papers-in-flight"], {"type": int, "default": 8, "help": "Files whose audits may run at once"}),
     ]
+    p = base_parser("Prepare LaTeX submission with audits and tarball.", "create-submission", extra,
+                    require_file=False)
+    p.set_defaults(audits=DEFAULT_AUDITS)
+    return p
+
+def main(argv=None):
+    from eqnlint.bin.eqnlint import audit_names, discover_audits
+    from eqnlint.lib import _debug, _metrics, _trace
+
+    argv = sys.argv[1:] if argv is None else argv
+    pre = argparse.ArgumentParser(add_help=False)
+    pre.add_argument("--audits", default=DEFAULT_AUDITS)
+    selected = discover_audits(audit_names(pre.parse_known_args(argv)[0].audits))
+    args = build_parser(selected).parse_args(argv)
+    _debug.set_level(args.verbose)
+    _trace.configure(args)
+    _metrics.configure(args)
+    # Unchanged files are skipped through the corpus manifest (content hash + settings).
+    args.resume = args.resume or not args.force
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    summary_file = out_dir / "eqn_lint_summary.md"
+    tex_files = [Path(args.project) / rel for rel in project_files(args.project, out_dir) if rel.suffix == ".tex"]
 
     if not tex_files:
         print("❌ No LaTeX files found in project directory.")
         sys.exit(1)
 
     print(f"📂 Found {len(tex_files)} LaTeX file(s).")
-
-    if args.run_audits:
-        for tex_file in tex_files:
-            dim_log, sym_log = run_audits(tex_file, args.output)
-        generate_summary(args.output, dim_log, sym_log, summary_file)
-
-    if not args.summary_only:
-        package_submission(args.project, output_tar, args.skip_figures)
+    audit_args = argparse.Namespace(**vars(args))
+    audit_args.out_dir = str(out_dir / "audits")
+    plans = [] if args.dry_run else None
+    t0 = time.monotonic()
+    try:
+        summary = asyncio.run(prepare_submission(audit_args, selected, tex_files, out_dir, plans))
+    except KeyboardInterrupt:
+        print("Interrupted. Finished files are recorded; rerun to finish the rest.")
+        sys.exit(130)
+    if summary is not None:
+        generate_summary(summary, summary_file, args.project)
+    if plans is not None and args.run_audits:
+        from eqnlint.lib._estimate import dry_run_estimate, format_estimate
+        print(format_estimate(dry_run_estimate(plans, args), args))
+    _debug.logger.info(f"Submission prepared in {time.monotonic() - t0:.1f}s")
+    _trace.finish(args)
+    _metrics.finish(args)
+    sys.exit(1 if summary is not None and (summary["failed"] or summary["partial"]) else 0)
 
 if __name__ == "__main__":
     main()
@@ -14,6 +14,12 @@ from eqnlint.lib._fewshots import FewShotLibrary
 
 
 class DimensionalAuditStateMachine(AuditStateMachine):
+    audit_name = "dimensional"
+    uses_symbols = True
+    verdict_labels = {"pass": "CONSISTENT", "fail": "INCONSISTENT"}
+    fused_task = ("Determine SI *dimensional* consistency of both sides. Be strict; give a one-sentence reason "
+                  "that references dimensions (e.g. [J] vs [kg·m^2·s^-2], or curvature ~ m^-2).")
+
     def _get_few_shots(self):
         # System prompt + few-shot examples specialized for dimensional analysis
         self.system_prompt = (
@@ -22,7 +28,7 @@ class DimensionalAuditStateMachine(AuditStateMachine):
         )
         self.few_shots = FewShotLibrary.dimensions()
         self.state = State.CALL_AI_WITH_FEW_SHOTS_AND_TARGETS
-        self.log.debug(f"Audit Dimensional: few shots returns {self.few_shots}")
+        self.log.debug(f"Audit Dimensional: {len(self.few_shots)} few-shot messages")
         self.log.debug(f"Audit Dimensional: After State call {self.state}")
 
     def _build_prompt(self, eq: dict) -> str:
@@ -31,6 +37,7 @@ class DimensionalAuditStateMachine(AuditStateMachine):
             "Task: Determine SI *dimensional* consistency of both sides.\n"
             f"Equation:\n{eq['equation']}\n"
             f"Context:\n{eq['context']}\n"
+            f"{self._symbol_hint(eq)}"
             "Return exactly one of: ✅ CONSISTENT or ❌ INCONSISTENT — "
             "plus a one‑sentence reason that references dimensions (e.g., "
             "[J] vs [kg·m^2·s^-2], or curvature ~ m^-2, etc.).\n"
@@ -1,48 +1,255 @@
 #!/usr/bin/env python3
 """
-eqnlint.py — Run all available audits sequentially.
+eqnlint.py — Run all available audits concurrently.
 
-Finds eqnlint/bin/*_audit.py and runs their main() in order.
-All other CLI args are passed through to each audit.
+Looks the audits up in the declared registry (lib/_registry.py plus the
+`eqnlint.audits` entry-point group), imports only the selected ones, and runs
+their AuditStateMachine subclasses as tasks in one event loop. The audits share one parsed command line, one
+document (read and extracted once per target kind), one AIClient and hence
+one rate/concurrency budget, and one symbol table. Results are kept per audit
+and written together at the end.
 """
 
+# Keep module-level imports light: `--version` and `--list`
+# must not pull in asyncio, the audits, or the networking stack.
 import sys
-import argparse
+import time
 import importlib
-from pathlib import Path
-from eqnlint import __version__
+from eqnlint.lib import _registry
+from eqnlint.lib._cli import base_parser
+from eqnlint.lib._textio import emit_json, read_text, write_outputs
+
+def discover_audits(names=None):
+    """Map audit name -> AuditStateMachine subclass, importing only `names` (default: all)."""
+    return {name: _registry.load(name) for name in (names or _registry.available())}
+
+def audit_names(spec):
+    """Validate a comma-separated --audits value against the registry, without importing."""
+    if not spec:
+        return list(_registry.available())
+    names = [n.strip().removesuffix("_audit") for n in spec.split(",") if n.strip()]
+    available = _registry.available(include_plugins=False)
+    if any(n not in available for n in names):
+        available = _registry.available()  # only now scan entry points
+    unknown = [n for n in names if n not in available]
+    if unknown:
+        raise SystemExit(f"Unknown audit(s): {', '.join(unknown)}. Available: {', '.join(available)}")
+    return names
+
+def list_audits():
+    for name, (_, description) in _registry.available().items():
+        print(f"{name:12s} {description}")
+
+# `eqnlint <command> ...` runs another entry point ("module:function") instead of the suite.
+SUBCOMMANDS = {
+    "corpus": "eqnlint.bin.corpus:main",
+    "serve": "eqnlint.bin.serve:main",
+    "submit": "eqnlint.bin.serve:submit_main",
+    "lsp": "eqnlint.bin.lsp:main",
+    "query": "eqnlint.bin.query:main",
+    "calibrate": "eqnlint.bin.calibrate:main",
+    "bench": "eqnlint.lib._bench:main",
+}
+
+def audit_extra_args(audits):
+    """Every selected audit's extra flags (deduplicated) plus --audits."""
+    extra, seen = [], set()
+    for cls in audits.values():
+        for flags, kwargs in cls.extra_args or []:
+            if flags[0] not in seen:
+                seen.add(flags[0])
+                extra.append((flags, kwargs))
+    extra.append((["--audits"], {
+        "help": f"Comma-separated subset to run (default: all). Available: {', '.join(_registry.available(False))}",
+    }))
+    extra.append((["--pipeline"], {
+        "help": "Chain audits as a streaming pipeline, e.g. symbolic,dimensional,units: each stage\n"
+                "starts on a target as soon as the previous stage finishes it and sees its findings",
+    }))
+    extra.append((["--fuse"], {
+        "nargs": "?", "const": "all", "metavar": "AUDITS",
+        "help": "Ask the equation audits (default: all that support it, e.g. units,dimensional) about each\n"
+                "equation in one request with one answer section per audit, instead of one request each",
+    }))
+    extra.append((["--list"], {"action": "store_true", "help": "List available audits and exit"}))
+    return extra
+
+def build_parser(audits):
+    """One parser for the whole suite: base flags plus every audit's extras."""
+    return base_parser("Run eqnlint audits concurrently on one LaTeX file.", "eqnlint", audit_extra_args(audits))
+
+def select_audits(audits, spec):
+    if not spec:
+        return dict(audits)
+    names = [n.strip().removesuffix("_audit") for n in spec.split(",") if n.strip()]
+    unknown = [n for n in names if n not in audits]
+    if unknown:
+        raise SystemExit(f"Unknown audit(s): {', '.join(unknown)}. Available: {', '.join(audits)}")
+    return {n: audits[n] for n in names}
+
+class Progress:
+    """Per-audit progress lines, throttled to roughly every 10 %."""
+    def __init__(self, log):
+        self.log = log
+        self._last = {}
+
+    def __call__(self, name, done, total):
+        step = max(1, total // 10)
+        if done == total or done - self._last.get(name, 0) >= step:
+            self._last[name] = done
+            self.log.info(f"[{name}] {done}/{total}")
+
+async def run_audits(args, audits, document=None, client=None, progress=None, symbols=None, checkpoint=None,
+                     budget=None):
+    """
+    Run the given audit classes concurrently and return {name: machine}.
+
+    The caller may pass a shared `document`, `client`, symbol table,
+    checkpoint and budget; otherwise they are created here, and a client
+    created here is closed here. The budget (--max-calls, --deadline,
+    --fail-fast) belongs to the run, never to a shared client.
+    """
+    import asyncio
+    from eqnlint.lib import _debug
+    from eqnlint.lib._ai import AIClient, ollama_options, warm_up
+    from eqnlint.lib._budget import Budget
+    from eqnlint.lib._extract import Document, extract_equations_with_context
+    from eqnlint.lib._symbols import SymbolTable, symbol_table_path, target_key
+    from eqnlint.lib._checkpoint import Checkpoint, checkpoint_path
+    from eqnlint.lib._pipeline import pipeline_stages, link
+    from eqnlint.lib._fusion import fusion_for
+    from eqnlint.lib._trace import tracer
+
+    if document is None:
+        with tracer.span("read file", "eqnlint", cat="io"):
+            document = Document(read_text(args.file), args.file)
+    owns_client = client is None
+    if owns_client:
+        client = AIClient(args.model, rate=args.rate, max_tokens=args.max_tokens,
+                          concurrency=args.concurrency, ollama=ollama_options(args))
+    warm_up(client, args)  # loads local models while the audits extract (once per client)
+    if budget is None:
+        budget = Budget(args.max_calls, args.deadline)
+    if checkpoint is None:
+        checkpoint = Checkpoint(checkpoint_path(args), resume=args.resume)
+    if symbols is None:
+        symbols = SymbolTable.load(None if args.dry_run else symbol_table_path(args))
+    symbols.prune(target_key(eq) for eq in document.targets("equations", extract_equations_with_context))
+
+    # Producers first: tasks start in creation order, and the symbolic audit
+    # announces its pending targets before its first await.
+    stages = pipeline_stages(args.pipeline, audits) if getattr(args, "pipeline", None) else []
+    order = stages + sorted((n for n in audits if n not in stages), key=lambda name: name != "symbolic")
+    machines = {}
+    for name in order:
+        m = audits[name](args=args, ai_client=client, document=document, progress=progress)
+        m.symbols = symbols
+        m.checkpoint = checkpoint
+        m.budget = budget
+        machines[name] = m
+    link([machines[name] for name in stages])
+    fusion_for(args, machines, _debug.logger)
+    try:
+        await asyncio.gather(*(m.run() for m in machines.values()))
+    finally:
+        if owns_client:
+            await client.aclose()
+    return {name: machines[name] for name in audits}
+
+def write_suite_outputs(args, machines, estimate=None):
+    humans, results = [], {}
+    for name, m in machines.items():
+        if m.report is not None:
+            humans.append(m.report["human"])
+            results[name] = m.report["json"]
+        elif m.error is not None:
+            results[name] = {"audit": name, "error": str(m.error)}
+    extra = {}
+    if estimate is not None:
+        from eqnlint.lib._estimate import format_estimate
+        humans.append(format_estimate(estimate, args))
+        extra["estimate"] = estimate
+    write_outputs("\n\n".join(humans), emit_json(audits=results, **extra), args.output, args.json)
 
 def main():
-    # Provide --version at the top-level without consuming other args.
-    top = argparse.ArgumentParser(add_help=False)
-    top.add_argument("--version", action="version", version=f"eqnlint {__version__}")
-    top.parse_known_args()  # don’t eat the rest; audits will parse them
-
-    bin_dir = Path(__file__).resolve().parent
-    audits = sorted(
-        f.stem for f in bin_dir.glob("*_audit.py")
-        if f.is_file() and not f.stem.startswith("_")
-    )
-
-    print(f"Running all audits: {', '.join(audits)}\n")
-
-    exit_code = 0
-    for name in audits:
-        print(f"=== Running {name} ===")
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        module, func = SUBCOMMANDS[sys.argv[1]].split(":")
+        return getattr(importlib.import_module(module), func)(sys.argv[2:])
+
+    # Fast paths that need nothing but the registry.
+    argv = sys.argv[1:]
+    if "--version" in argv:
+        from eqnlint import __version__
+        print(f"eqnlint {__version__}")
+        return
+    if "--list" in argv:
+        list_audits()
+        return
+
+    import argparse
+    pre = argparse.ArgumentParser(add_help=False)
+    pre.add_argument("--audits")
+    pre.add_argument("--pipeline")
+    known = pre.parse_known_args(argv)[0]
+    names = audit_names(known.pipeline or known.audits)
+    selected = discover_audits(names)  # imports only the selected audits
+    if "--help-info" in argv:
+        for cls in selected.values():
+            print(f"{cls.audit_name:12s} {cls.description}")
+        return
+    args = build_parser(selected).parse_args(argv)
+
+    from eqnlint.lib import _debug, _metrics, _trace
+    _debug.set_level(args.verbose)
+    _trace.configure(args)
+    _metrics.configure(args)
+    log = _debug.logger
+
+    if args.pipeline:
+        log.info(f"Running pipeline: {' -> '.join(selected)}")
+    else:
+        log.info(f"Running audits concurrently: {', '.join(selected)}")
+    import asyncio
+    store = run_id = None
+    if args.db and not args.dry_run:
+        from eqnlint.lib._store import ResultStore
+        store = ResultStore(args.db)
+        run_id = store.start_run(args, selected, argv)
+    t0 = time.monotonic()
+    try:
         try:
-            mod = importlib.import_module(f"eqnlint.bin.{name}")
-            if hasattr(mod, "main"):
-                mod.main()  # each audit uses base_parser(), which already has --version
-            else:
-                print(f"[WARN] {name} has no main(), skipping.")
-        except SystemExit as e:
-            if e.code not in (0, None):
-                exit_code = e.code
-        except Exception as e:
-            print(f"[ERROR] {name} failed: {e}")
-            exit_code = 1
-
-    sys.exit(exit_code)
+            machines = asyncio.run(run_audits(args, selected, progress=Progress(log)))
+        except KeyboardInterrupt:
+            log.info("Interrupted by user. Finished results are checkpointed; rerun with --resume.")
+            sys.exit(130)
+        log.info(f"All audits finished in {time.monotonic() - t0:.1f}s")
+
+        estimate = None
+        if args.dry_run:
+            from eqnlint.lib._estimate import plan, dry_run_estimate
+            estimate = dry_run_estimate([plan(m) for m in machines.values() if m.error is None], args)
+        with _trace.tracer.span("write outputs", "eqnlint", cat="io"):
+            write_suite_outputs(args, machines, estimate)
+        if store is not None:
+            with _trace.tracer.span("results store", "eqnlint", cat="io"):
+                text = next(iter(machines.values())).document.text if machines else ""
+                rows = store.add_results(run_id, args.file, text, machines)
+            log.info(f"Recorded {rows} verdict(s) as run {run_id} in {args.db}")
+    finally:
+        # Interrupted or failed runs are closed too, so the database is never left open mid-run.
+        if store is not None:
+            store.finish_run(run_id)
+            store.close()
+    _trace.finish(args)
+    _metrics.finish(args)
+    failed = [name for name, m in machines.items() if m.error is not None]
+    for name in failed:
+        print(f"[ERROR] {name} failed: {machines[name].error}")
+    pending = sum(m.pending for m in machines.values())
+    if pending:
+        log.info(f"{pending} target(s) not sent (--max-calls, --deadline or --fail-fast); "
+                 f"rerun with --resume to finish.")
+    sys.exit(1 if failed or pending else 0)
 
 if __name__ == "__main__":
     main()
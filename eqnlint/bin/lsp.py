@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+lsp.py — eqnlint as a Language Server: `eqnlint lsp [--audits units,opacity ...]`
+
+Speaks LSP (JSON-RPC over stdio) so editors show findings inline as authors
+type:
+
+- Open documents live in memory as IncrementalDocuments; didChange edits are
+  applied incrementally and only the touched paragraphs are re-extracted.
+- After a pause in typing (--debounce) each audit is asked only about targets
+  it has no answer for; targets whose text changed while their request was in
+  flight are cancelled.
+- Diagnostics carry the exact range of each target (its source span) with
+  ❌ findings as errors and ⚠️ findings as warnings.
+
+Configure the editor to run `eqnlint lsp` with the usual eqnlint flags
+(--model, --rate, --concurrency, --audits).
+"""
+
+import sys
+import json
+import asyncio
+
+from eqnlint.lib._cli import base_parser
+
+DEFAULT_AUDITS = "units,dimensional,opacity"
+
+# LSP DiagnosticSeverity
+_ERROR, _WARNING = 1, 2
+
+class OpenDocument:
+    def __init__(self, uri, version, doc):
+        self.uri = uri
+        self.version = version
+        self.doc = doc
+        self.results = {}    # (audit, target key) -> result
+        self.flagged = {}    # (audit, target key) -> (severity, message) of the ❌/⚠️ results
+        self.inflight = {}   # (audit, target key) -> Task
+        self.current = {}    # (audit, target key) -> [(block, target)] for every target in the document
+        self.blocks = {}     # block -> the (audit, target key)s it holds
+        self.appeared = set()     # keys new to `current` since the last refresh
+        self.disappeared = set()  # keys gone from `current` since the last refresh
+        self.debounce = None # pending refresh
+        self.publish = None  # pending publishDiagnostics
+
+class Server:
+    def __init__(self, args, audits, out):
+        from eqnlint.lib._ai import AIClient, ollama_options
+        from eqnlint.lib._cache import ResponseCache
+        from eqnlint.lib._symbols import SymbolTable
+        from eqnlint.lib import _debug
+
+        self.args = args
+        self.out = out
+        self.log = _debug.logger
+        self.client = AIClient(args.model, rate=args.rate, max_tokens=args.max_tokens,
+                               concurrency=args.concurrency, cache=ResponseCache(), ollama=ollama_options(args))
+        symbols = SymbolTable(None)  # in memory only
+        # One configured machine per audit; the server calls its _dispatch
+        # per target instead of running the whole state machine per edit.
+        self.machines = {}
+        for name, cls in audits.items():
+            m = cls(args=args, ai_client=self.client)
+            m.symbols = symbols
+            m._get_few_shots()
+            m._prepare_prompts()
+            self.machines[name] = m
+        self.documents = {}
+        self.shutting_down = False
+
+    # ---- JSON-RPC ---------------------------------------------------------
+
+    def send(self, obj):
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.out.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+        self.out.flush()
+
+    def notify(self, method, params):
+        self.send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    async def handle(self, msg):
+        method, params, msg_id = msg.get("method"), msg.get("params") or {}, msg.get("id")
+        handler = getattr(self, "on_" + (method or "").replace("/", "_").replace("$", "dollar"), None)
+        if handler is None:
+            if msg_id is not None and method is not None:
+                self.send({"jsonrpc": "2.0", "id": msg_id,
+                           "error": {"code": -32601, "message": f"Method not found: {method}"}})
+            return
+        try:
+            result = handler(params)
+            if asyncio.iscoroutine(result):
+                result = await result
+        except Exception as e:
+            if msg_id is not None:
+                self.send({"jsonrpc": "2.0", "id": msg_id, "error": {"code": -32603, "message": str(e)}})
+            self.log.error(f"[lsp] {method} failed: {e}")
+            return
+        if msg_id is not None:
+            self.send({"jsonrpc": "2.0", "id": msg_id, "result": result})
+
+    # ---- lifecycle --------------------------------------------------------
+
+    def on_initialize(self, params):
+        from eqnlint import __version__
+
+        return {
+            "capabilities": {
+                "positionEncoding": "utf-16",
+                "textDocumentSync": {"openClose": True, "change": 2},  # 2 = incremental
+            },
+            "serverInfo": {"name": "eqnlint", "version": __version__},
+        }
+
+    def on_initialized(self, params):
+        self.log.info(f"[lsp] ready; audits: {', '.join(self.machines)}")
+
+    async def on_shutdown(self, params):
+        self.shutting_down = True
+        for state in self.documents.values():
+            self._cancel(state)
+        await self.client.aclose()
+        return None
+
+    # ---- documents --------------------------------------------------------
+
+    def on_textDocument_didOpen(self, params):
+        from eqnlint.lib._extract import IncrementalDocument
+
+        item = params["textDocument"]
+        state = OpenDocument(item["uri"], item.get("version"), IncrementalDocument(item["text"], item["uri"]))
+        self.documents[item["uri"]] = state
+        self._track(state, [], state.doc.blocks)
+        self._schedule_refresh(state, delay=0)
+
+    def on_textDocument_didChange(self, params):
+        state = self.documents.get(params["textDocument"]["uri"])
+        if state is None:
+            return
+        state.version = params["textDocument"].get("version")
+        doc = state.doc
+        for change in params["contentChanges"]:
+            rng = change.get("range")
+            if rng is None:
+                removed, added = doc.set_text(change["text"])
+            else:
+                start = doc.offset(rng["start"]["line"], rng["start"]["character"])
+                end = doc.offset(rng["end"]["line"], rng["end"]["character"])
+                removed, added = doc.apply_change(start, end, change["text"])
+            self._track(state, removed, added)
+        self._schedule_refresh(state)
+
+    def on_textDocument_didClose(self, params):
+        state = self.documents.pop(params["textDocument"]["uri"], None)
+        if state is not None:
+            self._cancel(state)
+            self.notify("textDocument/publishDiagnostics", {"uri": state.uri, "diagnostics": []})
+
+    # ---- auditing ---------------------------------------------------------
+
+    def _cancel(self, state):
+        for task in [state.debounce, *state.inflight.values()]:
+            if task is not None:
+                task.cancel()
+        state.inflight.clear()
+
+    def _schedule_refresh(self, state, delay=None):
+        if state.debounce is not None:
+            state.debounce.cancel()
+        state.debounce = asyncio.ensure_future(self._refresh_later(state, self.args.debounce if delay is None else delay))
+
+    async def _refresh_later(self, state, delay):
+        await asyncio.sleep(delay)
+        self.refresh(state)
+
+    def _track(self, state, removed, added):
+        """Keep state.current in step with an edit: only the replaced blocks are visited."""
+        from eqnlint.lib._checkpoint import checkpoint_key
+
+        for block in removed:
+            for key in state.blocks.pop(block, ()):
+                entries = [e for e in state.current[key] if e[0] is not block]
+                if entries:
+                    state.current[key] = entries
+                else:
+                    del state.current[key]
+                    state.disappeared.add(key)
+        for block in added:
+            keys = set()
+            for name, m in self.machines.items():
+                # Keys are memoized per block, so a block is hashed once.
+                for key, target in state.doc.keyed(block, m.target_kind, m._find_targets, checkpoint_key):
+                    key = (name, key)
+                    if key not in state.current:
+                        state.current[key] = []
+                        state.appeared.add(key)
+                    state.current[key].append((block, target))
+                    keys.add(key)
+            state.blocks[block] = keys
+
+    def refresh(self, state):
+        current = state.current
+        # Requests about text that no longer exists are cancelled; answers
+        # about it are dropped (the reply cache still has them for undo).
+        for key in state.disappeared:
+            if key in current:
+                continue
+            task = state.inflight.pop(key, None)
+            if task is not None:
+                task.cancel()
+            state.results.pop(key, None)
+            state.flagged.pop(key, None)
+        for key in state.appeared:
+            if key in current and key not in state.results and key not in state.inflight:
+                # Same key, same equation and context: any occurrence will do.
+                state.inflight[key] = asyncio.ensure_future(self._audit(state, key, current[key][0][1]))
+        state.appeared, state.disappeared = set(), set()
+        self._publish_soon(state)
+
+    async def _audit(self, state, key, target):
+        from eqnlint.lib._budget import BudgetExhausted
+        from eqnlint.lib._verdict import Verdict, parse_verdict
+
+        try:
+            result = await self.machines[key[0]]._dispatch(target)
+        except asyncio.CancelledError:
+            return
+        except BudgetExhausted:
+            return
+        finally:
+            if state.inflight.get(key) is asyncio.current_task():
+                del state.inflight[key]
+        state.results[key] = result
+        level = {Verdict.FAIL: _ERROR, Verdict.WARN: _WARNING}.get(parse_verdict(result.get("notes", "")))
+        if level is not None:
+            state.flagged[key] = (level, result["notes"].strip())
+        self._publish_soon(state)
+
+    def _publish_soon(self, state):
+        # Coalesce the answers that land together into one notification.
+        if state.publish is None:
+            state.publish = asyncio.get_running_loop().call_later(0.1, self._publish, state)
+
+    def _publish(self, state):
+        state.publish = None
+        if state.uri not in self.documents:
+            return
+        diagnostics = []
+        for key, (level, message) in state.flagged.items():
+            for block, target in state.current.get(key, ()):
+                if "start" not in target:
+                    continue
+                start, end = state.doc.absolute(block, target)
+                sl, sc = state.doc.position(start)
+                el, ec = state.doc.position(end)
+                diagnostics.append({
+                    "range": {"start": {"line": sl, "character": sc}, "end": {"line": el, "character": ec}},
+                    "severity": level,
+                    "source": "eqnlint",
+                    "code": key[0],
+                    "message": message,
+                })
+        diagnostics.sort(key=lambda d: (d["range"]["start"]["line"], d["range"]["start"]["character"]))
+        self.notify("textDocument/publishDiagnostics",
+                    {"uri": state.uri, "version": state.version, "diagnostics": diagnostics})
+
+async def read_message(reader):
+    """One JSON-RPC message framed by Content-Length, or None at EOF."""
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line:
+            return None
+        line = line.decode("ascii", "replace").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if "content-length" not in headers:
+        return {}
+    return json.loads(await reader.readexactly(int(headers["content-length"])))
+
+async def serve(args, audits, stdin, stdout):
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), stdin)
+    server = Server(args, audits, stdout)
+    from eqnlint.lib._ai import warm_up
+    warm_up(server.client, args)  # the model loads while the editor opens its first file
+    while True:
+        try:
+            msg = await read_message(reader)
+        except (asyncio.IncompleteReadError, ValueError):
+            msg = None
+        if msg is None or msg.get("method") == "exit":
+            break
+        if msg:
+            await server.handle(msg)
+    if not server.shutting_down:
+        await server.client.aclose()
+    return 0 if server.shutting_down else 1
+
+def build_parser(audits):
+    from eqnlint.bin.eqnlint import audit_extra_args
+
+    extra = audit_extra_args(audits) + [
+        (["--debounce"], {"type": float, "default": 0.75,
+                          "help": "Seconds without edits before a document is re-audited"}),
+    ]
+    return base_parser("Serve eqnlint diagnostics over the Language Server Protocol (stdio).",
+                       "lsp", extra, require_file=False)
+
+def main(argv=None):
+    import argparse
+    from eqnlint.bin.eqnlint import audit_names, discover_audits
+    from eqnlint.lib import _debug
+
+    pre = argparse.ArgumentParser(add_help=False)
+    pre.add_argument("--audits", default=DEFAULT_AUDITS)
+    names = audit_names(pre.parse_known_args(argv)[0].audits)
+    audits = discover_audits(names)
+    args = build_parser(audits).parse_args(argv)
+    _debug.set_level(args.verbose)
+
+    # stdout carries the protocol; anything else printed goes to stderr.
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    sys.stdout = sys.stderr
+    try:
+        sys.exit(asyncio.run(serve(args, audits, stdin, stdout)))
+    except KeyboardInterrupt:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,18 @@ from eqnlint.lib._fewshots import FewShotLibrary
 from .audit_template import AuditStateMachine, State
 
 class OpacityAuditStateMachine(AuditStateMachine):
+    audit_name = "opacity"
+    uses_symbols = True
+    verdict_labels = {"pass": "ALL SYMBOLS DEFINED", "fail": "UNDEFINED SYMBOL", "warn": "UNCLEAR NOTATION"}
+    response_fields = {
+        "undefined": {"type": ["array", "null"], "items": {"type": "string"},
+                      "description": "Symbols, acronyms or notation not defined in the context"},
+    }
+    max_output_tokens = 250
+    stop_fields = None  # the undefined list matters too: never cut before the object ends
+    fused_task = ("Identify any symbols, acronyms or notation the context does not define (likely meanings "
+                  "given with the equation are inferred and do not count as defined), and list them.")
+
     def _get_few_shots(self):
         # System prompt + few-shots for opacity/undefined symbol checks
         self.system_prompt = (
@@ -24,14 +36,18 @@ class OpacityAuditStateMachine(AuditStateMachine):
         )
         self.few_shots = FewShotLibrary.opacity()
         self.state = State.CALL_AI_WITH_FEW_SHOTS_AND_TARGETS
-        self.log.debug(f"Audit Opacity: few shots returns {self.few_shots}")
+        self.log.debug(f"Audit Opacity: {len(self.few_shots)} few-shot messages")
         self.log.debug(f"Audit Opacity: After State call {self.state}")
 
     def _build_prompt(self, eq: dict) -> str:
-        # The base template already extracts equations + local context
+        # The base template already extracts equations + local context.
+        # Shared symbol meanings come from the symbolic audit, not the paper,
+        # so they are labelled as inferred and must not count as "defined".
+        hint = self._symbol_hint(eq, label="Likely meanings (inferred, may be undefined in the text)")
         return (
             f"Check this equation:\n{eq['equation']}\n"
-            f"Context:\n{eq['context']}\n\n"
+            f"Context:\n{eq['context']}\n"
+            f"{hint}\n"
             "Identify any undefined symbols, acronyms, or notations missing from the context. "
             "Suggest clear definitions, or mark as:\n"
             "✅ ALL SYMBOLS DEFINED if nothing is missing.\n"
@@ -4,9 +4,38 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[1] / "lib"))
 
 from eqnlint.lib._fewshots import FewShotLibrary
+from eqnlint.lib._prose import TriageThresholds, extract_paragraphs, triage
+from eqnlint.lib._textio import emit_human, emit_json
 from .audit_template import AuditStateMachine, State
 
+_TH = TriageThresholds()
+
 class ProseAuditStateMachine(AuditStateMachine):
+    audit_name = "prose"
+    target_kind = "paragraphs"
+    verdict_labels = {"pass": "CLEAR", "fail": "UNCLEAR", "warn": "NEEDS EDIT"}
+    response_fields = {
+        "rewrite": {"type": ["string", "null"], "description": "Concise rewrite of the text, or null if none is needed"},
+    }
+    max_output_tokens = 700
+    stop_fields = None  # the rewrite matters too: never cut before the object ends
+    extra_args = [
+        (["--no-triage"], {"action": "store_true",
+                           "help": "Send every paragraph to the model (skip local readability triage)"}),
+        (["--max-sentence-words"], {"type": int, "default": _TH.max_sentence_words,
+                                    "help": "Triage: flag sentences longer than this"}),
+        (["--min-reading-ease"], {"type": float, "default": _TH.min_reading_ease,
+                                  "help": "Triage: flag Flesch reading ease below this"}),
+        (["--max-passive"], {"type": float, "default": _TH.max_passive,
+                             "help": "Triage: flag passive constructions per sentence above this"}),
+        (["--max-nominal"], {"type": float, "default": _TH.max_nominal,
+                             "help": "Triage: flag nominalization share of words above this"}),
+        (["--max-repeats"], {"type": int, "default": _TH.max_repeats,
+                             "help": "Triage: flag a content word repeated more often than this"}),
+        (["--max-fillers"], {"type": int, "default": _TH.max_fillers,
+                             "help": "Triage: flag more filler/hedging phrases than this"}),
+    ]
+
     def _get_few_shots(self):
         self.system_prompt = (
             "You review scientific prose for clarity, concision, and flow, "
@@ -15,51 +44,53 @@ class ProseAuditStateMachine(AuditStateMachine):
         self.few_shots = FewShotLibrary.prose()
         self.state = State.CALL_AI_WITH_FEW_SHOTS_AND_TARGETS
 
-    # eqnlint/bin/prose_audit.py (inside ProseAuditStateMachine)
-
-    def _extract_targets(self):
-        import re
-        tex = self.text
+    def _thresholds(self) -> TriageThresholds:
+        return TriageThresholds(**{
+            name: getattr(self.args, name, default)
+            for name, default in vars(_TH).items()
+        })
 
-        # Remove preamble and very common non-prose blocks
-        # crude but effective for now
-        tex = re.sub(r"\\documentclass\[.*?\]\{.*?\}", "", tex)
-        tex = re.sub(r"\\usepackage(\[.*?\])?\{.*?\}", "", tex)
-        tex = re.sub(r"\\title\{.*?\}", "", tex, flags=re.DOTALL)
-        tex = re.sub(r"\\author\{.*?\}", "", tex, flags=re.DOTALL)
-        tex = re.sub(r"\\date\{.*?\}", "", tex, flags=re.DOTALL)
-        tex = re.sub(r"\\maketitle", "", tex)
-        tex = re.sub(r"\\tableofcontents", "", tex)
-        tex = re.sub(r"\\begin\{document\}|\\end\{document\}", "", tex)
-        tex = re.sub(r"\\begin\{abstract\}|\\end\{abstract\}", "", tex)
+    def _find_targets(self, text: str) -> list:
+        # One pass over the source; each paragraph keeps its source span/line.
+        return extract_paragraphs(text)
 
-        # Drop math blocks entirely (optional for prose audit)
-        tex = re.sub(r"\\\[(?:.|\n)*?\\\]", " ", tex)  # \[ ... \]
-        tex = re.sub(r"\\begin\{equation\*?\}(?:.|\n)*?\\end\{equation\*?\}", " ", tex)
-        tex = re.sub(r"\$\$(?:.|\n)*?\$\$", " ", tex)
-        tex = re.sub(r"\$(?:\\\$|[^$])*\$", " ", tex)
-
-        # Remove most commands to reveal prose-ish text
-        tex = re.sub(r"\\[a-zA-Z]+\*?(?:\[[^\]]*\])?(?:\{[^}]*\})*", " ", tex)
-
-        # Split into paragraphs
-        paras = [p.strip() for p in re.split(r"\n\s*\n", tex) if p.strip()]
+    def _extract_targets(self):
+        run_triage = not getattr(self.args, "no_triage", False)
+        th = self._thresholds()
+        paras = []
+        # Copies: the document's target lists are shared with other audits and read-only.
+        for p in self.document.targets(self.target_kind, self._find_targets):
+            stats, reasons = triage(p["equation"], th)
+            paras.append({**p, "triage": stats, "reasons": reasons})
+        keep = [p for p in paras if p["reasons"]] if run_triage else paras
 
-        # Heuristics to keep only “real” prose
-        keep = []
-        for p in paras:
-            # not too short, has spaces (i.e., not a single token), contains letters
-            if len(p) >= 30 and " " in p and re.search(r"[A-Za-z]", p):
-                keep.append(p)
+        self.equations = keep
+        self.prefiltered = [p for p in paras if not p["reasons"]] if run_triage else []
+        self.log.debug(f"Found {len(paras)} paragraphs.")
+        if run_triage:
+            self.log.info(f"Prose triage: {len(keep)} of {len(paras)} paragraphs cross a threshold.")
 
-        self.equations = [{"equation": para, "context": ""} for para in keep]
-        self.log.debug(f"Found {len(self.equations)} paragraphs.")
-        self.state = State.GET_FEW_SHOTS
+        if getattr(self.args, "dry_run", False):
+            lines = [
+                f"\n--- Paragraph (line {p['line']}) ---\n{p['equation']}\n"
+                f"Triage: {', '.join(p['reasons']) or 'ok'}"
+                for p in paras
+            ]
+            human = emit_human("=== DRY RUN: Prose ===", lines)
+            self._emit(human, emit_json(paragraphs=[
+                {"line": p["line"], "text": p["equation"], "reasons": p["reasons"], "triage": p["triage"]}
+                for p in paras
+            ]))
+            self.state = State.SHUTDOWN
+        else:
+            self.state = State.GET_FEW_SHOTS
 
     def _build_prompt(self, item: dict) -> str:
+        flags = f"Flagged for: {', '.join(item['reasons'])}\n" if item.get("reasons") else ""
         return (
             "Text:\n"
             f"{item['equation']}\n"
+            f"{flags}"
             "Task: Start with one verdict (✅ CLEAR, ⚠️ NEEDS EDIT, or ❌ UNCLEAR), "
             "then provide a concise rewrite if needed."
         )
@@ -68,4 +99,4 @@ def main():
     asyncio.run(ProseAuditStateMachine().run())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
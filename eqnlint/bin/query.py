@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+query.py — Reports from the results database: `eqnlint query --db results.db <report>`
+
+    runs                         recent runs with verdict counts
+    summary  [--run N]           verdicts, latency and tokens per audit (default: last run)
+    failing  [--run N] [--warn]  failing targets of a run
+    flips    [--since 7d] [--to fail]
+                                 targets whose verdict changed to --to since then
+    trend    [--path P]          fail/warn/pass per run, optionally for one paper
+
+Add --audit NAME to narrow failing/flips, --json for machine-readable output.
+"""
+
+import sys
+import json
+import time
+import argparse
+
+from eqnlint.lib._schedule import parse_duration
+
+REPORTS = ("runs", "summary", "failing", "flips", "trend")
+
+def build_parser():
+    p = argparse.ArgumentParser(prog="eqnlint query", description="Query the eqnlint results database.",
+                                formatter_class=argparse.RawTextHelpFormatter)
+    p.add_argument("report", choices=REPORTS, help="Which report to print")
+    p.add_argument("--db", required=True, help="SQLite database written with --db")
+    p.add_argument("--run", type=int, help="Run id (default: the latest run)")
+    p.add_argument("--since", type=parse_duration, default=parse_duration("7d"),
+                   help="For flips: how far back, e.g. 24h, 7d, 2w (default: 7d)")
+    p.add_argument("--to", default="fail", choices=("fail", "warn", "pass", "error", "unknown"),
+                   help="For flips: the verdict targets changed to (default: fail)")
+    p.add_argument("--audit", help="Only this audit")
+    p.add_argument("--path", help="For trend: only this paper")
+    p.add_argument("--warn", action="store_true", help="For failing: include warnings")
+    p.add_argument("--limit", type=int, default=20, help="Rows for runs/trend (default: 20)")
+    p.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    return p
+
+def print_table(rows, width=60):
+    if not rows:
+        print("(no rows)")
+        return
+    cols = rows[0].keys()
+    cells = [[_cell(r[c], width) for c in cols] for r in rows]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(cols)]
+    print("  ".join(c.ljust(w) for c, w in zip(cols, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+def _cell(value, width):
+    text = "" if value is None else " ".join(str(value).split())
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+def main(argv=None):
+    from eqnlint.lib._store import ResultStore
+
+    args = build_parser().parse_args(argv)
+    store = ResultStore(args.db)
+    try:
+        run = args.run or store.last_run()
+        if args.report == "runs":
+            rows = store.runs(args.limit)
+        elif run is None:
+            print("No runs recorded yet.")
+            return
+        elif args.report == "summary":
+            rows = store.summary(run)
+        elif args.report == "failing":
+            rows = store.failing(run, ("fail", "warn") if args.warn else ("fail",), args.audit)
+        elif args.report == "flips":
+            rows = store.flips(time.time() - args.since, args.to, args.audit)
+        else:
+            rows = store.trend(args.path, args.limit)
+        if args.json:
+            print(json.dumps([dict(r) for r in rows], indent=2, ensure_ascii=False))
+        else:
+            if args.report in ("summary", "failing"):
+                print(f"Run {run}")
+            print_table(rows)
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
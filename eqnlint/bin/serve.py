@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+serve.py — Long-running eqnlint daemon and its thin client.
+
+    eqnlint serve [--socket PATH | --port N]       # start the daemon
+    eqnlint submit -f paper.tex [eqnlint flags]    # audit through it
+
+The daemon pays interpreter start, imports, dotenv loading and TLS setup once,
+and keeps AIClients (one per model/token cap), a reply cache, parsed documents
+and symbol tables warm between requests. The client sends the file text and
+its eqnlint flags and streams progress and per-audit results back, so editor
+integrations and pre-commit hooks get answers without a cold start.
+
+Wire protocol: one JSON object per line, both directions.
+  -> {"op": "audit", "argv": [...], "text": "..."}
+  <- {"event": "progress", "audit": ..., "done": n, "total": m}
+  <- {"event": "result", "audit": ..., "report": {...} | null, "error": ... | null}
+  <- {"event": "done", "seconds": s}          (or {"event": "error", "message": ...})
+  -> {"op": "ping"} / {"op": "shutdown"}
+"""
+
+import os
+import sys
+import json
+import socket
+import argparse
+import tempfile
+from pathlib import Path
+
+def default_socket():
+    if os.environ.get("EQNLINT_SOCKET"):
+        return os.environ["EQNLINT_SOCKET"]
+    uid = os.getuid() if hasattr(os, "getuid") else "user"
+    return str(Path(tempfile.gettempdir()) / f"eqnlint-{uid}.sock")
+
+def _transport_args(p):
+    p.add_argument("--socket", default=None, help="Unix socket path (default: $EQNLINT_SOCKET or a per-user temp path)")
+    p.add_argument("--port", type=int, default=None, help="Use TCP on 127.0.0.1:PORT instead of a Unix socket")
+
+# ---------------------------------------------------------------------------
+# Daemon
+# ---------------------------------------------------------------------------
+
+class Daemon:
+    def __init__(self, opts):
+        # Imports happen here, once, so the client never pays for them.
+        from collections import OrderedDict
+        from eqnlint.bin.eqnlint import discover_audits, build_parser
+        from eqnlint.lib._cache import ResponseCache
+        from eqnlint.lib import _debug
+
+        self.opts = opts
+        self.log = _debug.logger
+        self.audits = discover_audits()
+        self.parser = build_parser(self.audits)
+        self.cache = ResponseCache(opts.cache_size)
+        self.clients = {}                 # (model, max_tokens) -> AIClient
+        self.documents = OrderedDict()    # (path, sha) -> Document, LRU
+        self.symbols = {}                 # path -> SymbolTable
+        self.requests = 0
+        self._stop = None
+
+    def client_for(self, args):
+        from eqnlint.lib._ai import AIClient, ollama_options
+
+        key = (args.model, args.max_tokens)
+        if key not in self.clients:
+            # One global budget per model, set by the daemon's own flags.
+            self.clients[key] = AIClient(args.model, rate=self.opts.rate, max_tokens=args.max_tokens,
+                                         concurrency=self.opts.concurrency, cache=self.cache,
+                                         ollama=ollama_options(args))
+        return self.clients[key]
+
+    def document_for(self, path, text):
+        import hashlib
+        from eqnlint.lib._extract import Document
+
+        key = (path, hashlib.sha1(text.encode("utf-8")).hexdigest())
+        doc = self.documents.get(key)
+        if doc is None:
+            doc = Document(text, path)
+            self.documents[key] = doc
+            while len(self.documents) > self.opts.max_documents:
+                self.documents.popitem(last=False)
+        self.documents.move_to_end(key)
+        return doc
+
+    def symbols_for(self, args):
+        from eqnlint.lib._symbols import SymbolTable, symbol_table_path
+
+        if args.dry_run:
+            return None
+        table = self.symbols.get(args.file)
+        if table is None:
+            table = self.symbols[args.file] = SymbolTable.load(symbol_table_path(args))
+        return table
+
+    def stats(self):
+        return {"requests": self.requests, "documents": len(self.documents),
+                "clients": len(self.clients), "cache": self.cache.as_dict(),
+                "usage": {f"{model}@{tokens}": c.meter.as_dict() for (model, tokens), c in self.clients.items()}}
+
+    async def audit(self, req, send):
+        import time
+        from eqnlint.bin.eqnlint import run_audits, select_audits
+        from eqnlint.lib._textio import read_text
+
+        try:
+            args = self.parser.parse_args(req.get("argv", []))
+        except SystemExit:
+            send({"event": "error", "message": "invalid arguments"})
+            return
+        args.output = args.json = None  # the client writes its own outputs
+        text = req["text"] if req.get("text") is not None else read_text(args.file)
+
+        t0 = time.monotonic()
+        try:
+            # Bad --audits/--pipeline/--fuse values end in SystemExit, which
+            # must end this request, not the daemon.
+            selected = select_audits(self.audits, args.pipeline or args.audits)
+            machines = await run_audits(
+                args, selected,
+                document=self.document_for(args.file, text),
+                client=self.client_for(args),
+                symbols=self.symbols_for(args),
+                progress=lambda name, done, total: send(
+                    {"event": "progress", "audit": name, "done": done, "total": total}),
+            )
+        except SystemExit as e:
+            send({"event": "error", "message": str(e.code) if e.code not in (None, 0) else "invalid arguments"})
+            return
+        for name, m in machines.items():
+            send({"event": "result", "audit": name, "report": m.report,
+                  "error": str(m.error) if m.error is not None else None})
+        send({"event": "done", "seconds": round(time.monotonic() - t0, 3), "stats": self.stats()})
+
+    async def handle(self, reader, writer):
+        def send(obj):
+            writer.write((json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8"))
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    req = json.loads(line)
+                except ValueError:
+                    send({"event": "error", "message": "bad request"})
+                    continue
+                op = req.get("op")
+                self.requests += 1
+                if op == "ping":
+                    send({"event": "pong", "pid": os.getpid(), "stats": self.stats()})
+                elif op == "shutdown":
+                    send({"event": "bye"})
+                    self._stop.set()
+                elif op == "audit":
+                    try:
+                        await self.audit(req, send)
+                    except Exception as e:
+                        send({"event": "error", "message": f"{type(e).__name__}: {e}"})
+                else:
+                    send({"event": "error", "message": f"unknown op {op!r}"})
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        import asyncio
+
+        self._stop = asyncio.Event()
+        if self.opts.port:
+            server = await asyncio.start_server(self.handle, "127.0.0.1", self.opts.port)
+            where = f"127.0.0.1:{self.opts.port}"
+        else:
+            path = self.opts.socket or default_socket()
+            if os.path.exists(path):
+                os.unlink(path)  # stale socket from a previous daemon
+            server = await asyncio.start_unix_server(self.handle, path=path)
+            os.chmod(path, 0o600)
+            where = path
+        self.log.info(f"eqnlint daemon listening on {where} (pid {os.getpid()})")
+        try:
+            async with server:
+                await self._stop.wait()
+        finally:
+            for client in self.clients.values():
+                await client.aclose()
+            if not self.opts.port and os.path.exists(where):
+                os.unlink(where)
+        self.log.info("eqnlint daemon stopped.")
+
+def main(argv=None):
+    import asyncio
+    from eqnlint.lib import _debug, _metrics
+    from eqnlint.lib._cli import metrics_args
+
+    p = argparse.ArgumentParser(description="Run the eqnlint daemon (warm clients and caches).")
+    _transport_args(p)
+    p.add_argument("--rate", type=float, default=0.5, help="Global max QPS across all requests (per model)")
+    p.add_argument("--concurrency", type=int, default=4, help="Global max requests in flight (per model)")
+    p.add_argument("--cache-size", type=int, default=10000, help="Cached model replies to keep")
+    p.add_argument("--max-documents", type=int, default=64, help="Parsed documents to keep warm")
+    metrics_args(p)
+    p.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+    opts = p.parse_args(argv)
+    _debug.set_level(opts.verbose)
+    _metrics.configure(opts)
+    try:
+        asyncio.run(Daemon(opts).serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _metrics.finish(opts)
+
+# ---------------------------------------------------------------------------
+# Thin client — deliberately stdlib-only so it starts fast.
+# ---------------------------------------------------------------------------
+
+def _connect(opts):
+    if opts.port:
+        return socket.create_connection(("127.0.0.1", opts.port))
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    s.connect(opts.socket or default_socket())
+    return s
+
+def request(opts, payload):
+    """Send one request and yield the daemon's events until the exchange ends."""
+    with _connect(opts) as s:
+        s.sendall((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+        with s.makefile("r", encoding="utf-8") as f:
+            for line in f:
+                event = json.loads(line)
+                yield event
+                if event.get("event") in ("done", "error", "pong", "bye"):
+                    return
+
+def submit_main(argv=None):
+    p = argparse.ArgumentParser(
+        description="Audit a file through a running eqnlint daemon. Unknown flags are passed to eqnlint.")
+    _transport_args(p)
+    p.add_argument("-f", "--file", help="Input LaTeX file")
+    p.add_argument("-o", "--output", help="Write human log to file")
+    p.add_argument("--json", help="Write machine-readable JSON to file")
+    p.add_argument("-q", "--quiet", action="store_true", help="Do not print progress")
+    p.add_argument("--ping", action="store_true", help="Check that the daemon is up and print its stats")
+    p.add_argument("--shutdown", action="store_true", help="Stop the daemon")
+    opts, rest = p.parse_known_args(argv)
+
+    if not (opts.ping or opts.shutdown or opts.file):
+        p.error("-f/--file is required")
+    if opts.file:
+        path = str(Path(opts.file).resolve())
+        from eqnlint.lib._textio import read_text
+        text = read_text(path)
+    try:
+        if opts.ping or opts.shutdown:
+            for event in request(opts, {"op": "ping" if opts.ping else "shutdown"}):
+                print(json.dumps(event))
+            return
+        humans, results, failed, finished = [], {}, False, False
+        for event in request(opts, {"op": "audit", "argv": rest + ["-f", path], "text": text}):
+            kind = event.get("event")
+            if kind == "progress" and not opts.quiet:
+                print(f"[{event['audit']}] {event['done']}/{event['total']}", file=sys.stderr)
+            elif kind == "result":
+                if event["report"]:
+                    humans.append(event["report"]["human"])
+                    results[event["audit"]] = event["report"]["json"]
+                if event["error"]:
+                    failed = True
+                    results[event["audit"]] = {"audit": event["audit"], "error": event["error"]}
+                    print(f"[ERROR] {event['audit']} failed: {event['error']}", file=sys.stderr)
+            elif kind == "done":
+                finished = True
+            elif kind == "error":
+                print(f"[ERROR] daemon: {event['message']}", file=sys.stderr)
+                sys.exit(2)
+        if not finished:
+            print("[ERROR] daemon closed the connection before the audit finished", file=sys.stderr)
+            sys.exit(2)
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        print(f"[ERROR] eqnlint daemon not reachable ({e}). Start it with: eqnlint serve", file=sys.stderr)
+        sys.exit(2)
+
+    from eqnlint.lib._textio import write_outputs
+    write_outputs("\n\n".join(humans), {"audits": results}, opts.output, opts.json)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,95 @@
+import json
+
 from eqnlint.lib._fewshots import FewShotLibrary
+from eqnlint.lib._symbols import parse_symbol_reply, target_key
+from eqnlint.lib._schema import SYMBOLS_SCHEMA
 from .audit_template import AuditStateMachine, State
 
 class SymbolicAuditStateMachine(AuditStateMachine):
+    audit_name = "symbolic"
+    max_output_tokens = 400
+    fused_task = "Build a symbol dictionary: every symbol in the equation with its meaning and SI unit."
+
     def _get_few_shots(self):
         # Sets the system prompt and few-shot examples for symbolic audits.
         self.system_prompt = "You are an expert in dimensional analysis and LaTeX math."
         self.few_shots = FewShotLibrary.symbols()
         self.state = State.CALL_AI_WITH_FEW_SHOTS_AND_TARGETS
-        self.log.debug(f"Audit Symbols: few shots returns {self.few_shots}")
+        self.log.debug(f"Audit Symbols: {len(self.few_shots)} few-shot messages")
         self.log.debug(f"Audit Symbols: After State call {self.state}")
 
     def _build_prompt(self, eq: dict) -> str:
-        return (
-            f"Build a symbol dictionary for: {eq['equation']}\n"
-            f"Context: {eq['context']}\n"
-            "Output format: JSON dictionary with symbol as key and definition as value."
-        )
+        prompt = f"Build a symbol dictionary for: {eq['equation']}\nContext: {eq['context']}\n"
+        if self.response_schema is None:
+            prompt += "Output format: JSON dictionary with symbol as key and definition as value."
+        return prompt
+
+    def _response_schema(self):
+        # A list of {symbol, meaning} pairs: strict schemas cannot describe
+        # a dictionary with free-form keys.
+        return SYMBOLS_SCHEMA
+
+    def _render(self, obj: dict) -> str:
+        # Notes stay the JSON dictionary the symbol table and reports read.
+        return json.dumps({s["symbol"]: s["meaning"] for s in obj["symbols"]}, ensure_ascii=False)
+
+    def _structured_fewshots(self, schema: dict) -> list:
+        shots = []
+        for msg in self.few_shots:
+            if msg.get("role") == "assistant":
+                pairs = parse_symbol_reply(msg["content"]).items()
+                msg = {"role": "assistant", "content": json.dumps(
+                    {"symbols": [{"symbol": k, "meaning": v} for k, v in pairs]}, ensure_ascii=False)}
+            shots.append(msg)
+        return shots
+
+    async def _dispatch(self, eq: dict) -> dict:
+        # Every dictionary lands in the shared symbol table; targets whose
+        # source is unchanged are served from it without a request.
+        table = self._symbol_table()
+        key = target_key(eq)
+        cached = table.get(key)
+        if cached is not None:
+            if self.fusion is not None:
+                self.fusion.skip(self, eq)
+            return {"equation": eq["equation"], "notes": json.dumps(cached, ensure_ascii=False), "cached": True}
+        try:
+            result = await super()._dispatch(eq)
+            symbols = parse_symbol_reply(result["notes"])
+            if symbols:
+                table.put(key, eq["equation"], symbols)
+            return result
+        finally:
+            table.resolve(key)  # unblock audits waiting on this target
+
+    def _handoff(self, result: dict) -> str:
+        # Later stages already get these symbols through the shared table.
+        return ""
+
+    def _resumed(self, eq: dict, result: dict) -> None:
+        # A result reused from the checkpoint still feeds the symbol table.
+        table = self._symbol_table()
+        key = target_key(eq)
+        symbols = parse_symbol_reply(result["notes"])
+        if symbols:
+            table.put(key, eq["equation"], symbols)
+        table.resolve(key)
+
+    async def _call_ai(self):
+        # Announce the targets we are about to fill before the first await, so
+        # audits running alongside wait for them instead of racing ahead.
+        table = self._symbol_table()
+        table.expect(target_key(eq) for eq in self.equations)
+        try:
+            await super()._call_ai()
+        finally:
+            table.resolve_all()
+            table.save()
+        self.log.debug(f"Symbol table saved to {table.path} ({len(table.merged())} symbols)")
 
 def main():
     import asyncio
     asyncio.run(SymbolicAuditStateMachine().run())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
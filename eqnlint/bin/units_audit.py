@@ -17,18 +17,25 @@ from .audit_template import AuditStateMachine
 from .audit_template import State
 
 class UnitsAuditStateMachine(AuditStateMachine):
+    audit_name = "units"
+    uses_symbols = True
+    verdict_labels = {"pass": "CONSISTENT", "fail": "INCONSISTENT", "warn": "MIXED UNITS"}
+    fused_task = ("Check the units: are they consistent (preferably SI)? Note any mixed or invalid unit usage. "
+                  "Be brief, but state the reason for your decision.")
+
     def _get_few_shots(self):
         # Sets the system prompt and few-shot examples for unit/dimensional audits.
         self.system_prompt = "You are auditing LaTeX equations for unit system consistency and detecting non-standard units."
         self.few_shots = FewShotLibrary.units()
         self.state = State.CALL_AI_WITH_FEW_SHOTS_AND_TARGETS
-        self.log.debug(f"Audit Units: few shots returns {self.few_shots}")
+        self.log.debug(f"Audit Units: {len(self.few_shots)} few-shot messages")
         self.log.debug(f"Audit Units: After State call {self.state}")
 
     def _build_prompt(self, eq: dict) -> str:
         return (
             f"Check the units in:\n{eq['equation']}\n"
             f"Context: {eq['context']}\n"
+            f"{self._symbol_hint(eq)}"
             "Make sure all units are consistent (preferably SI) and note any mixed or invalid unit usage.\n"
             "Return one of: ✅ CONSISTENT, ❌ INCONSISTENT, ⚠️ MIXED UNITS. Be brief, but state the reason for your decision.\n"
         )
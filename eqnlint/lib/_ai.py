@@ -1,31 +1,140 @@
 # lib/_ai.py
 import os
 import json
+import time
 import asyncio
 import contextlib
 import inspect
-import httpx
-from dotenv import load_dotenv
-from ._budget import RateLimiter
+from ._budget import Budget, RateLimiter, Meter
+from ._trace import tracer, current_audit, first_byte, mark_first_byte
+from ._metrics import metrics, observe_request
 
-load_dotenv()
+# Token cap when neither the caller nor --max-tokens sets one (free-text replies).
+DEFAULT_MAX_TOKENS = 1200
+
+# httpx, openai and python-dotenv are imported on first use, not at import
+# time, so commands that never talk to a model start fast.
+_env_loaded = False
+
+def _load_env():
+    global _env_loaded
+    if not _env_loaded:
+        _env_loaded = True
+        try:
+            from dotenv import load_dotenv
+        except ImportError:
+            return
+        load_dotenv()
+
+# Ollama: models stay loaded this long after the last request (server default: 5m).
+OLLAMA_KEEP_ALIVE = "30m"
+OLLAMA_TIMEOUT = 300.0  # the first request of a cold model includes loading it
+
+def ollama_host():
+    host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+    return host if "://" in host else f"http://{host}"
+
+def ollama_options(args):
+    """Backend settings for Ollama models from --ollama-* flags (see AIClient.ollama)."""
+    options = {}
+    for item in getattr(args, "ollama_option", None) or []:
+        key, _, value = item.partition("=")
+        try:
+            options[key.strip()] = json.loads(value)
+        except ValueError:
+            options[key.strip()] = value
+    if getattr(args, "ollama_num_ctx", None):
+        options["num_ctx"] = args.ollama_num_ctx
+    return {"keep_alive": getattr(args, "ollama_keep_alive", None) or OLLAMA_KEEP_ALIVE, "options": options}
+
+# meta field -> phase name in traces and the -v summary
+_PHASES = (("queue_ms", "wait for slot"), ("limiter_ms", "rate limiter"),
+           ("ttfb_ms", "time to first byte"), ("latency_ms", "network"))
+
+async def _on_response(response):
+    mark_first_byte()
+    _count_response(response.status_code)
+
+def _count_response(status):
+    # Every HTTP response of one request lands in its first_byte slot, so
+    # the SDK's own retries and 429s show up in the metrics.
+    slot = first_byte.get()
+    if slot is not None:
+        slot["responses"] = slot.get("responses", 0) + 1
+        if status == 429:
+            slot["429"] = slot.get("429", 0) + 1
+
+def _stopped_early(meta, messages, kept):
+    # The usage report comes with the last chunk, which an early stop never
+    # reads: count locally instead.
+    if meta is None:
+        return
+    from ._estimate import count_tokens, message_tokens
+
+    meta["stopped_early"] = True
+    meta["tokens_in"] = message_tokens(messages[0]["content"], messages[1:])
+    meta["tokens_out"] = count_tokens(kept)
+
+def warm_up(client, args):
+    """Warm up the models a run will use (--model and the cascade tiers) unless --no-warm-up or --dry-run."""
+    if getattr(args, "dry_run", False) or getattr(args, "no_warm_up", False):
+        return
+    triage = getattr(args, "triage_model", None)
+    if triage and triage.startswith("ollama:"):
+        client.sibling(triage, rate=getattr(args, "triage_rate", None))  # as the audits will create it
+    escalate = getattr(args, "escalate_model", None)
+    if escalate and escalate.startswith("ollama:"):
+        client.sibling(escalate)
+    client.warm_up()
 
 class AIClient:
-    def __init__(self, model, rate=0.5, max_tokens=1200):
+    def __init__(self, model, rate=0.5, max_tokens=None, concurrency=4, cache=None, ollama=None):
         self.model = model
+        self.qps = rate
         self.rate = RateLimiter(rate)
-        self.max_tokens = max_tokens
+        self.max_tokens = max_tokens or DEFAULT_MAX_TOKENS  # per-call max_tokens overrides
+        self.concurrency = max(1, concurrency)
+        self.cache = cache  # optional ResponseCache shared by long-lived processes
+        self._sem = None  # created on first use so it binds to the running loop
         self._openai_client = None  # persistent async client
+        self._ollama_client = None  # persistent httpx client for Ollama (connection reuse)
+        self.ollama = ollama or {"keep_alive": OLLAMA_KEEP_ALIVE, "options": {}}  # see ollama_options()
+        self._warm = None  # warm-up task, started once
+        self._json_schema_ok = True  # False once the backend has rejected json_schema response formats
+        self._siblings = {}  # model -> AIClient
+        self.meter = Meter()  # requests and tokens actually sent by this client
 
     async def _ensure_openai_client(self):
         if self._openai_client is None:
             import openai
+            kwargs = {}
+            http_client = getattr(openai, "DefaultAsyncHttpxClient", None)
+            if http_client is not None:
+                # Response hooks fire once headers arrive: time to first byte.
+                kwargs["http_client"] = http_client(event_hooks={"response": [_on_response]})
             # Create once; reuse for all calls
             self._openai_client = openai.AsyncOpenAI(
-                api_key=os.getenv("OPENAI_API_KEY")
+                api_key=os.getenv("OPENAI_API_KEY"), **kwargs
             )
 
 
+    def sibling(self, model, rate=None, concurrency=None):
+        """
+        Client for another model (the tiers of a --triage-model cascade). It
+        has its own rate limiter and concurrency cap, so a local model does
+        not queue behind a remote API's limits; the run's Budget is passed
+        with each request and so covers both. Created once per model and
+        closed with this client.
+        """
+        if model == self.model:
+            return self
+        sib = self._siblings.get(model)
+        if sib is None:
+            sib = AIClient(model, rate=self.qps if rate is None else rate, max_tokens=self.max_tokens,
+                           concurrency=concurrency or self.concurrency, cache=self.cache, ollama=self.ollama)
+            self._siblings[model] = sib
+        return sib
+
     async def aclose(self):
         """
         Best-effort teardown of the persistent OpenAI async client.
@@ -35,6 +144,14 @@ class AIClient:
         - No-ops safely if there's no running loop or it's already closed.
         - Yields control once so httpx/anyio can finish background cleanup.
         """
+        for sib in self._siblings.values():
+            await sib.aclose()
+        if self._warm is not None and not self._warm.done():
+            self._warm.cancel()
+        if self._ollama_client is not None:
+            ollama, self._ollama_client = self._ollama_client, None
+            with contextlib.suppress(Exception):
+                await ollama.aclose()
         client = self._openai_client
         self._openai_client = None  # drop reference early
         if not client:
@@ -70,14 +187,178 @@ class AIClient:
         with contextlib.suppress(asyncio.CancelledError):
             await asyncio.sleep(0)
 
-    async def complete(self, system, user, fewshot=None):
-        await self.rate.wait_async()
-        if self.model.startswith("ollama:"):
-            return await self._ollama(system, user, fewshot)
-        else:
-            return await self._openai(system, user, fewshot)
+    def warm_up(self):
+        """
+        Start loading the model(s) on a local Ollama server in the background
+        (this client and its cascade siblings), so the first real request
+        does not also pay for the model load. Runs once per client; other
+        backends need nothing. Returns the tasks started.
+        """
+        models = [c for c in (self, *self._siblings.values()) if c.model.startswith("ollama:") and c._warm is None]
+        for c in models:
+            c._warm = asyncio.ensure_future(c._ollama_load())
+        return [c._warm for c in models]
+
+    async def _ollama_load(self):
+        # A chat request without messages loads the model and applies keep_alive.
+        try:
+            resp = await self._ollama_http().post(f"{ollama_host()}/api/chat", json={
+                "model": self.model.removeprefix("ollama:"), "messages": [],
+                "keep_alive": self.ollama.get("keep_alive"), "options": self.ollama.get("options") or {}})
+            resp.raise_for_status()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[WARN] Ollama warm-up of {self.model} failed: {type(e).__name__}: {e}")
+
+    async def complete(self, system, user, fewshot=None, meta=None, schema=None, max_tokens=None, stop=None,
+                       budget=None):
+        """
+        One chat completion. Safe to call from many tasks at once: at most
+        `concurrency` requests are in flight and starts are spaced by the
+        shared rate limiter, so audits sharing a client share one rate and
+        concurrency budget. With the run's `budget` (lib/_budget.py) it
+        raises BudgetExhausted once that run has sent its max_calls requests,
+        passed its deadline (in-flight requests are cut off at it), or been
+        halted.
+
+        If a `meta` dict is given it is filled with what the call cost:
+        latency_ms (request only, not queueing), tokens_in/tokens_out when the
+        backend reports them, cached, and where the time went: queue_ms
+        (waiting for a concurrency slot), limiter_ms (rate limiter), ttfb_ms
+        (first response byte).
+
+        With a JSON `schema` the backend is asked for structured output
+        (OpenAI json_schema in strict mode, falling back to JSON mode;
+        Ollama `format`) and the reply is the raw JSON text; the caller
+        validates it. `max_tokens` overrides the client's cap for this call.
+
+        With a `stop` rule (lib/_stream.py) the reply is streamed and the
+        generation is cut off as soon as `stop(text_so_far)` returns the
+        reply to keep; meta["stopped_early"] is then set and the token counts
+        are local estimates.
+        """
+        if meta is None:
+            meta = {}
+        meta["cached"] = False
+        meta["model"] = self.model
+        max_tokens = max_tokens or self.max_tokens
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(self.model, max_tokens, system, user, fewshot, schema,
+                                 getattr(stop, "key", None))
+            cached = self.cache.get(key)
+            if cached is not None:
+                meta.update(cached=True, latency_ms=0.0)
+                if metrics.enabled:
+                    observe_request(self.model, current_audit(), meta, True)
+                return cached
+        if budget is None:
+            budget = Budget()  # a request outside any run: no cap, deadline or halt
+        budget.check()
+        _load_env()
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.concurrency)
+        t_enter = time.perf_counter()
+        async with self._sem:
+            t_slot = time.perf_counter()
+            await budget.before_deadline(self.rate.wait_async())
+            budget.check()
+            budget.calls += 1
+            slot = {}
+            first_byte.set(slot)
+            t_send = time.perf_counter()
+            if self.model.startswith("ollama:"):
+                reply = await budget.before_deadline(self._ollama(system, user, fewshot, meta, schema, max_tokens, stop))
+            else:
+                reply = await budget.before_deadline(self._openai(system, user, fewshot, meta, schema, max_tokens, stop))
+            t_done = time.perf_counter()
+        meta["queue_ms"] = round((t_slot - t_enter) * 1000.0, 1)
+        meta["limiter_ms"] = round((t_send - t_slot) * 1000.0, 1)
+        meta["latency_ms"] = round((t_done - t_send) * 1000.0, 1)
+        if "t" in slot:
+            meta["ttfb_ms"] = round((slot["t"] - t_send) * 1000.0, 1)
+        self.meter.log(1, meta.get("tokens_in") or 0, meta.get("tokens_out") or 0)
+        if tracer.enabled:
+            self._trace(meta, t_enter, t_slot, t_send, slot.get("t"), t_done)
+        if metrics.enabled:
+            observe_request(self.model, current_audit(), meta, not reply.startswith("[ERROR]"),
+                            slot.get("responses", 1), slot.get("429", 0))
+        if key is not None:
+            self.cache.put(key, reply)
+        return reply
+
+    def _trace(self, meta, t_enter, t_slot, t_send, t_first, t_done):
+        audit = current_audit()
+        track = tracer.lane(f"{audit or 'ai'} requests", t_enter, t_done)
+        args = {k: meta[k] for k in ("model", "tokens_in", "tokens_out") if meta.get(k) is not None}
+        tracer.add(f"{self.model}", track, t_enter, t_done, cat="request", **args)
+        if t_slot > t_enter:
+            tracer.add("wait for slot", track, t_enter, t_slot, cat="queue")
+        if t_send > t_slot:
+            tracer.add("rate limiter", track, t_slot, t_send, cat="queue")
+        tracer.add("network", track, t_send, t_done, cat="network")
+        if t_first is not None:
+            tracer.add("time to first byte", track, t_send, t_first, cat="network")
+        for metric, name in _PHASES:
+            tracer.sample(audit, name, meta.get(metric))
+
+    def _response_format(self, schema):
+        if schema is None:
+            return {}
+        if not self._json_schema_ok:
+            return {"response_format": {"type": "json_object"}}
+        return {"response_format": {"type": "json_schema",
+                                    "json_schema": {"name": "eqnlint_reply", "schema": schema, "strict": True}}}
 
-    async def _openai(self, system, user, fewshot):
+    async def _openai_create(self, msgs, schema, max_tokens, stream):
+        kwargs = {"model": self.model, "messages": msgs, "temperature": 0,
+                  "max_tokens": max_tokens or self.max_tokens}
+        if stream:
+            kwargs.update(stream=True, stream_options={"include_usage": True})
+        fmt = self._response_format(schema)
+        try:
+            return await self._openai_client.chat.completions.create(**kwargs, **fmt)
+        except Exception as e:
+            # Models/servers without json_schema support reject the request
+            # outright; plain JSON mode is the next best thing.
+            if "json_schema" not in str(fmt) or "response_format" not in str(e):
+                raise
+            if self._json_schema_ok:
+                self._json_schema_ok = False
+                print(f"[WARN] {self.model} rejected json_schema output; using JSON mode")
+            return await self._openai_client.chat.completions.create(**kwargs, **self._response_format(schema))
+
+    async def _openai_stream(self, msgs, meta, schema, max_tokens, stop):
+        """
+        Stream the reply and hand the text so far to `stop` after every
+        chunk; once it returns the reply to keep, the stream is closed,
+        which ends the generation on the server.
+        """
+        stream = await self._openai_create(msgs, schema, max_tokens, stream=True)
+        parts, usage = [], None
+        try:
+            async for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                parts.append(delta)
+                kept = stop("".join(parts))
+                if kept is not None:
+                    _stopped_early(meta, msgs, kept)
+                    return kept
+        finally:
+            await stream.close()
+        if meta is not None and usage is not None:
+            meta["tokens_in"] = usage.prompt_tokens
+            meta["tokens_out"] = usage.completion_tokens
+        return "".join(parts)
+
+    async def _openai(self, system, user, fewshot, meta=None, schema=None, max_tokens=None, stop=None):
         await self._ensure_openai_client()
         msgs = [{"role": "system", "content": system}]
         if fewshot:
@@ -85,13 +366,15 @@ class AIClient:
         msgs.append({"role": "user", "content": user})
 
         try:
-            resp = await self._openai_client.chat.completions.create(
-                model=self.model,
-                messages=msgs,
-                temperature=0,
-                max_tokens=self.max_tokens
-            )
-            content = resp.choices[0].message.content.strip()
+            if stop is not None:
+                content = (await self._openai_stream(msgs, meta, schema, max_tokens, stop)).strip()
+            else:
+                resp = await self._openai_create(msgs, schema, max_tokens, stream=False)
+                usage = getattr(resp, "usage", None)
+                if meta is not None and usage is not None:
+                    meta["tokens_in"] = usage.prompt_tokens
+                    meta["tokens_out"] = usage.completion_tokens
+                content = resp.choices[0].message.content.strip()
             if content.startswith("```json"):
                 content = content.removeprefix("```json").removesuffix("```").strip()
             elif content.startswith("```"):
@@ -104,39 +387,67 @@ class AIClient:
             print(f"[ERROR] OpenAI call failed: {type(e).__name__}: {e}")
             return "[ERROR] Failed to get response from OpenAI."
 
-    async def _ollama(self, system, user, fewshot):
-        prompt = system + "\n"
-        if fewshot:
-            for msg in fewshot:
-                prompt += f"{msg['role'].capitalize()}: {msg['content']}\n"
-        prompt += f"User: {user}\n"
+    def _ollama_http(self):
+        if self._ollama_client is None:
+            import httpx
+            self._ollama_client = httpx.AsyncClient(timeout=httpx.Timeout(OLLAMA_TIMEOUT, connect=5.0))
+        return self._ollama_client
 
-        url = "http://localhost:11434/api/generate"
+    async def _ollama(self, system, user, fewshot, meta=None, schema=None, max_tokens=None, stop=None):
+        # /api/chat with the system prompt and few-shots as leading messages.
+        # Every request of an audit starts with the same system prompt, which
+        # the server can reuse; the few-shots are picked per target, so the
+        # rest of the prefix is shared only by targets with the same
+        # selection (or by every request with --all-few-shots).
+        messages = [{"role": "system", "content": system}]
+        if fewshot:
+            messages += [{"role": m["role"], "content": m["content"]} for m in fewshot]
+        messages.append({"role": "user", "content": user})
         data = {
             "model": self.model.removeprefix("ollama:"),
-            "prompt": prompt,
+            "messages": messages,
             "stream": True,
+            "keep_alive": self.ollama.get("keep_alive"),
+            "options": {"temperature": 0, **(self.ollama.get("options") or {}),
+                        "num_predict": max_tokens or self.max_tokens},
         }
+        if schema is not None:
+            data["format"] = schema
 
         try:
-            # This client is scoped to the call and closed before return.
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                async with client.stream("POST", url, json=data) as response:
-                    if response.status_code != 200:
-                        body = await response.aread()
-                        raise RuntimeError(f"Ollama error: {response.status_code} {body!r}")
-                    reply = ""
-                    async for line in response.aiter_lines():
-                        if not line.strip():
-                            continue
-                        try:
-                            json_chunk = json.loads(line)
-                            reply += json_chunk.get("response", "")
-                        except Exception as ex:
-                            print(f"[ERROR] Streaming: {type(ex).__name__}: {ex}")
-                    return reply.strip()
+            # The client persists across calls (one connection pool); leaving
+            # the stream early disconnects, and Ollama then stops generating.
+            async with self._ollama_http().stream("POST", f"{ollama_host()}/api/chat", json=data) as response:
+                _count_response(response.status_code)
+                if response.status_code != 200:
+                    body = await response.aread()
+                    raise RuntimeError(f"Ollama error: {response.status_code} {body!r}")
+                parts = []
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    mark_first_byte()
+                    try:
+                        json_chunk = json.loads(line)
+                    except ValueError as ex:
+                        print(f"[ERROR] Streaming: {type(ex).__name__}: {ex}")
+                        continue
+                    if json_chunk.get("error"):
+                        raise RuntimeError(f"Ollama error: {json_chunk['error']}")
+                    content = (json_chunk.get("message") or {}).get("content")
+                    if content:
+                        parts.append(content)
+                        if stop is not None:
+                            kept = stop("".join(parts))
+                            if kept is not None:
+                                _stopped_early(meta, messages, kept)
+                                return kept.strip()
+                    if json_chunk.get("done") and meta is not None:
+                        meta["tokens_in"] = json_chunk.get("prompt_eval_count")
+                        meta["tokens_out"] = json_chunk.get("eval_count")
+                return "".join(parts).strip()
         except asyncio.CancelledError:
             raise
         except Exception as e:
             print(f"[ERROR] Ollama call failed: {type(e).__name__}: {e}")
-            return "[ERROR] Failed to get response from Ollama."
\ No newline at end of file
+            return "[ERROR] Failed to get response from Ollama."
@@ -0,0 +1,208 @@
+# eqnlint/lib/_api.py
+"""
+Library entry points: audit in-memory LaTeX from another program without
+argparse, sys.argv, files or a subprocess per document.
+
+    import eqnlint
+
+    client = eqnlint.AIClient("gpt-4o-mini", rate=5, concurrency=16)
+    report = await eqnlint.audit(text, audits=["units", "dimensional"], client=client,
+                                 options={"max_tokens": 300})
+    for f in report.failures:
+        print(f.audit, f.line, f.target, f.notes)
+
+`options` takes the same settings as the command line, by their argparse
+names (`model`, `triage_model`, `few_shots`, `pipeline`, ...). Nothing is
+written unless asked for: the checkpoint and symbol table live in memory
+unless `options` names a `checkpoint` or `symbols` path.
+
+Concurrency: every call builds its own audits and document, so any number
+of `audit()` calls may run as tasks in one event loop, sharing a client and
+hence one rate/concurrency budget. `audit_sync()` runs calls on one
+background event loop, so it is safe from many threads at once and a
+client passed to it is always used on the same loop. A client belongs to
+the loop it is first used on: share it between `audit()` calls in one loop,
+or between `audit_sync()` calls, not both. `fail_fast`, `max_calls` and
+`deadline` apply to the one call they are given to, even on a shared client.
+"""
+import time
+import asyncio
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from ._verdict import Verdict, parse_verdict
+
+
+class Finding(NamedTuple):
+    """One audited target."""
+    audit: str
+    target: str  # the equation, citation or paragraph that was checked
+    verdict: Verdict
+    notes: str  # the rendered reply ('❌ INCONSISTENT: ...')
+    line: Optional[int] = None
+    structured: Optional[dict] = None  # the validated reply object, for structured audits
+    pending: bool = False  # left unsent (max_calls, deadline, fail_fast)
+    tier: Optional[str] = None  # "triage" or "escalated" in a cascade
+    meta: Optional[dict] = None  # model, latency_ms, tokens_in, tokens_out, ...
+
+
+class AuditResult(NamedTuple):
+    """What one audit found in a document."""
+    audit: str
+    findings: List[Finding]
+    error: Optional[str] = None  # the audit itself failed
+    coverage: Optional[dict] = None  # set when targets were left unsent
+    report: Optional[dict] = None  # {"human": str, "json": dict}, as the CLI writes them
+
+
+class Report(NamedTuple):
+    """Every selected audit's result for one document."""
+    path: str
+    audits: Dict[str, AuditResult]
+    seconds: float
+
+    @property
+    def findings(self) -> List[Finding]:
+        return [f for r in self.audits.values() for f in r.findings]
+
+    @property
+    def failures(self) -> List[Finding]:
+        return [f for f in self.findings if f.verdict is Verdict.FAIL]
+
+    @property
+    def errors(self) -> Dict[str, str]:
+        return {name: r.error for name, r in self.audits.items() if r.error is not None}
+
+    @property
+    def pending(self) -> int:
+        return sum(f.pending for f in self.findings)
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """{audit: {verdict: n}}."""
+        out = {}
+        for name, r in self.audits.items():
+            c = out.setdefault(name, {})
+            for f in r.findings:
+                c[f.verdict.value] = c.get(f.verdict.value, 0) + 1
+        return out
+
+
+def _names(audits) -> tuple:
+    from . import _registry
+
+    if audits is None:
+        return tuple(_registry.available())
+    if isinstance(audits, str):
+        audits = audits.split(",")
+    names = tuple(n.strip().removesuffix("_audit") for n in audits if n.strip())
+    available = _registry.available()
+    unknown = [n for n in names if n not in available]
+    if unknown:
+        raise ValueError(f"Unknown audit(s): {', '.join(unknown)}. Available: {', '.join(available)}")
+    return names
+
+
+@lru_cache(maxsize=None)
+def _defaults(names: tuple) -> dict:
+    # The command line's defaults for these audits, parsed from an empty
+    # argv (never sys.argv) once per audit selection.
+    from eqnlint.bin.eqnlint import audit_extra_args, discover_audits
+    from ._cli import base_parser
+
+    parser = base_parser("eqnlint library call", "eqnlint", audit_extra_args(discover_audits(list(names))),
+                         require_file=False)
+    return vars(parser.parse_args([]))
+
+
+def options_namespace(names, path: str, options: Optional[dict] = None):
+    """The argparse-style namespace the audits read, from defaults plus `options`."""
+    import argparse
+
+    values = dict(_defaults(tuple(names)))
+    unknown = sorted(set(options or {}) - set(values))
+    if unknown:
+        raise ValueError(f"Unknown option(s): {', '.join(unknown)}")
+    values.update(options or {})
+    values.update(file=path, output=None, json=None, audits=",".join(names))
+    return argparse.Namespace(**values)
+
+
+def _finding(audit: str, result: dict) -> Finding:
+    notes = result.get("notes", "")
+    return Finding(audit=audit, target=result.get("equation", ""), verdict=parse_verdict(notes), notes=notes,
+                   line=result.get("line"), structured=result.get("structured"),
+                   pending=bool(result.get("pending")), tier=result.get("tier"), meta=result.get("meta"))
+
+
+def _result(name: str, machine) -> AuditResult:
+    return AuditResult(audit=name, findings=[_finding(name, r) for r in machine.results or [] if r],
+                       error=str(machine.error) if machine.error is not None else None,
+                       coverage=machine.coverage if machine.pending else None, report=machine.report)
+
+
+async def audit(text: str, audits: Union[Iterable[str], str, None] = None, client=None,
+                options: Optional[dict] = None, path: str = "<memory>",
+                progress: Optional[Callable[[str, int, int], None]] = None) -> Report:
+    """
+    Audit LaTeX `text` and return a Report.
+
+    `audits` selects audits by name (default: all registered). `client` is
+    an AIClient shared with other calls; without one a client is created
+    from `options` (model, rate, concurrency, ...) and closed afterwards.
+    `path` only labels the document in reports. `progress(audit, done,
+    total)` is called as targets finish.
+    """
+    from eqnlint.bin.eqnlint import discover_audits, run_audits, select_audits
+    from ._extract import Document
+    from ._symbols import SymbolTable
+    from ._checkpoint import Checkpoint
+
+    names = _names((options or {}).get("pipeline") or audits)
+    args = options_namespace(names, path, options)
+    selected = select_audits(discover_audits(list(names)), args.pipeline or args.audits)
+    symbols = SymbolTable.load(args.symbols if args.symbols and not args.dry_run else None)
+    checkpoint = Checkpoint(args.checkpoint if not args.dry_run else None, resume=args.resume)
+    t0 = time.monotonic()
+    machines = await run_audits(args, selected, document=Document(text, path), client=client,
+                                progress=progress, symbols=symbols, checkpoint=checkpoint)
+    return Report(path=path, audits={name: _result(name, m) for name, m in machines.items()},
+                  seconds=round(time.monotonic() - t0, 3))
+
+
+class _Loop:
+    """The background event loop behind the sync API, started on first use."""
+
+    def __init__(self):
+        self.loop = None
+        self.lock = threading.Lock()
+
+    def get(self) -> asyncio.AbstractEventLoop:
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, name="eqnlint-api", daemon=True).start()
+            return self.loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        return asyncio.run_coroutine_threadsafe(coro, self.get()).result(timeout)
+
+
+_loop = _Loop()
+
+
+def audit_sync(text: str, audits: Union[Iterable[str], str, None] = None, client=None,
+               options: Optional[dict] = None, path: str = "<memory>",
+               progress: Optional[Callable[[str, int, int], None]] = None,
+               timeout: Optional[float] = None) -> Report:
+    """
+    Blocking audit(): runs on a shared background event loop, so it can be
+    called from any number of threads, and concurrent calls share `client`
+    and its budget. `progress` is called from the background thread.
+    """
+    return _loop.run(audit(text, audits, client, options, path, progress), timeout)
+
+
+def close_sync(client) -> None:
+    """Close a client used with audit_sync(), on the loop it was used on."""
+    _loop.run(client.aclose())
@@ -0,0 +1,147 @@
+# eqnlint/lib/_archive.py
+import re
+import gzip
+import tarfile
+import zipfile
+import posixpath
+from typing import Dict, NamedTuple, Optional
+
+ARCHIVE_SUFFIXES = (".tar.gz", ".tgz", ".tar.bz2", ".tar.xz", ".tar", ".zip", ".gz")
+TEXT_SUFFIXES = (".tex", ".ltx", ".bbl")
+MAX_MEMBER = 32 * 1024 * 1024  # skip members larger than this (data dumps, not LaTeX)
+MAX_DEPTH = 16  # nested \input levels
+
+_DOCUMENTCLASS = re.compile(r"^[^%\n]*\\documentclass", re.MULTILINE)
+_INCLUDE = re.compile(r"\\(input|include|subfile)\s*\{([^}]+)\}|\\input\s+([^\s{}\\%]+)")
+_IMPORT = re.compile(r"\\(?:sub)?import\s*\{([^}]*)\}\s*\{([^}]+)\}")
+_BIBLIOGRAPHY = re.compile(r"\\bibliography\s*\{[^}]*\}")
+_COMMENT = re.compile(r"(?<!\\)%")
+_MAIN_NAMES = ("main", "ms", "paper", "article", "manuscript")
+
+
+class ArchiveText(NamedTuple):
+    text: str
+    main: str  # member name of the main file
+    files: int  # text members read
+
+
+def is_archive(path) -> bool:
+    return str(path).lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def decode(data: bytes) -> str:
+    """LaTeX sources are usually UTF-8; older arXiv papers are often Latin-1."""
+    if data.startswith(b"\xef\xbb\xbf"):
+        data = data[3:]
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+def _members(path) -> Dict[str, str]:
+    """
+    Text members (.tex, .ltx, .bbl) of an archive, decoded, keyed by their
+    normalized name. Tarballs are read as a stream (mode 'r|*': one pass,
+    no seeking, other members skipped); nothing is written to disk.
+    """
+    files = {}
+    name = str(path).lower()
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(TEXT_SUFFIXES) \
+                        and info.file_size <= MAX_MEMBER:
+                    files[posixpath.normpath(info.filename)] = decode(zf.read(info))
+        return files
+    if not tarfile.is_tarfile(path):
+        # arXiv serves single-file submissions as a bare gzipped .tex.
+        with gzip.open(path, "rb") as fh:
+            return {"main.tex": decode(fh.read())}
+    with tarfile.open(path, mode="r|*") as tf:
+        for member in tf:
+            if member.isfile() and member.name.lower().endswith(TEXT_SUFFIXES) and member.size <= MAX_MEMBER:
+                fh = tf.extractfile(member)
+                if fh is not None:
+                    files[posixpath.normpath(member.name)] = decode(fh.read())
+    return files
+
+
+def find_main(files: Dict[str, str]) -> Optional[str]:
+    """
+    The main file: a .tex with an uncommented \\documentclass; among several,
+    prefer one with \\begin{document}, a conventional name, the shallowest
+    path, then the largest.
+    """
+    tex = [n for n in files if not n.lower().endswith(".bbl")]
+    candidates = [n for n in tex if _DOCUMENTCLASS.search(files[n])]
+    if not candidates:
+        return tex[0] if len(tex) == 1 else None
+
+    def rank(n):
+        stem = posixpath.splitext(posixpath.basename(n))[0].lower()
+        return ("\\begin{document}" not in files[n], stem not in _MAIN_NAMES, n.count("/"), -len(files[n]), n)
+
+    return min(candidates, key=rank)
+
+
+def _lookup(files, base_dir, target, suffix=".tex"):
+    target = target.strip()
+    for name in (target, target + suffix):
+        for candidate in (posixpath.normpath(posixpath.join(base_dir, name)), posixpath.normpath(name)):
+            if candidate in files:
+                return candidate
+    return None
+
+
+def _flatten(files, name, base_dir, seen, depth):
+    out = []
+    for line in files[name].splitlines(keepends=True):
+        cut = _COMMENT.search(line)
+        code, comment = (line[:cut.start()], line[cut.start():]) if cut else (line, "")
+        out.append(_expand(files, code, base_dir, seen, depth) + comment)
+    return "".join(out)
+
+
+def _expand(files, code, base_dir, seen, depth):
+    def include(target, directory=base_dir):
+        found = _lookup(files, directory, target)
+        if found is None or found in seen or depth >= MAX_DEPTH:
+            return None
+        seen.add(found)
+        try:
+            return _flatten(files, found, directory, seen, depth + 1).removesuffix("\n")
+        finally:
+            seen.discard(found)
+
+    def sub_include(m):
+        text = include(m.group(2) or m.group(3))
+        return m.group(0) if text is None else text
+
+    def sub_import(m):
+        directory = posixpath.normpath(posixpath.join(base_dir, m.group(1))) if m.group(1) else base_dir
+        text = include(m.group(2), directory)
+        return m.group(0) if text is None else text
+
+    def sub_bibliography(m):
+        # arXiv bundles ship the compiled .bbl next to the main file.
+        bbl = next((n for n in files if n.lower().endswith(".bbl") and posixpath.dirname(n) == base_dir), None)
+        return files[bbl] if bbl is not None else m.group(0)
+
+    code = _INCLUDE.sub(sub_include, code)
+    code = _IMPORT.sub(sub_import, code)
+    return _BIBLIOGRAPHY.sub(sub_bibliography, code)
+
+
+def read_archive(path) -> ArchiveText:
+    """
+    The main LaTeX file of an archive (.tar, .tar.gz/.tgz, .zip, or a bare
+    gzipped .tex) with its \\input/\\include/\\subfile/\\import files and the
+    .bbl inlined, decoded in memory.
+    """
+    files = _members(path)
+    main = find_main(files)
+    if main is None:
+        raise ValueError(f"{path}: no main .tex file (none with \\documentclass) among {len(files)} text members")
+    text = _flatten(files, main, posixpath.dirname(main), {main}, 0)
+    return ArchiveText(text, main, len(files))
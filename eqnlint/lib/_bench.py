@@ -0,0 +1,456 @@
+# eqnlint/lib/_bench.py
+"""
+Performance checks that guard against regressions: `eqnlint bench <suite>`.
+
+    eqnlint bench startup     # CLI start-up time and what it imports
+    eqnlint bench extract     # targets/s of every extractor and audit, up to 10k equations
+    eqnlint bench dispatch    # one audit against a simulated-latency backend
+    eqnlint bench e2e         # full suite runs under several --concurrency/--rate settings
+
+Each suite prints a table and exits non-zero when a limit is exceeded, so it
+can run in CI next to the build. The throughput suites write their numbers
+with --save-baseline FILE and compare against --baseline FILE, failing on a
+drop of more than --threshold (default 25 %).
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+
+# Modules that only commands talking to a model should ever import.
+HEAVY_MODULES = ("httpx", "openai", "dotenv", "rich", "sympy", "tqdm", "numpy")
+
+_SAMPLE_TEX = r"""\documentclass{article}
+\begin{document}
+Energy and mass are related by $E = mc^2$, where $c$ is the speed of light.
+
+\begin{equation}
+F = ma
+\end{equation}
+\end{document}
+"""
+
+
+def _run(cmd, env=None):
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    return (time.perf_counter() - t0) * 1000.0, proc
+
+
+def _imported(stderr):
+    """Top-level module names from `python -X importtime` output."""
+    names = set()
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            names.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return names
+
+
+def startup_cases(sample_path):
+    return {
+        "version": ["--version"],
+        "list": ["--list"],
+        "dry-run": ["-f", sample_path, "--dry-run", "--audits", "units",
+                    "-o", os.devnull, "--json", os.devnull],
+    }
+
+
+def measure_startup(runs=5):
+    """
+    Median wall time (ms) per CLI case and its overhead over a bare
+    interpreter, plus any heavy modules each case imported.
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    with tempfile.NamedTemporaryFile("w", suffix=".tex", delete=False) as fh:
+        fh.write(_SAMPLE_TEX)
+        sample = fh.name
+    try:
+        bare = statistics.median(_run([sys.executable, "-c", "pass"], env)[0] for _ in range(runs))
+        out = {"bare_ms": round(bare, 1), "cases": {}}
+        for name, argv in startup_cases(sample).items():
+            cmd = [sys.executable, "-m", "eqnlint.bin.eqnlint", *argv]
+            times = [_run(cmd, env)[0] for _ in range(runs)]
+            _, proc = _run([sys.executable, "-X", "importtime", "-m", "eqnlint.bin.eqnlint", *argv], env)
+            out["cases"][name] = {
+                "median_ms": round(statistics.median(times), 1),
+                "overhead_ms": round(statistics.median(times) - bare, 1),
+                "returncode": proc.returncode,
+                "heavy_imports": sorted(_imported(proc.stderr) & set(HEAVY_MODULES)),
+            }
+        return out
+    finally:
+        os.unlink(sample)
+
+
+def startup_main(argv=None):
+    p = argparse.ArgumentParser(prog="eqnlint bench startup", description="Guard CLI start-up time.")
+    p.add_argument("--runs", type=int, default=5, help="Runs per case (median is reported)")
+    p.add_argument("--max-overhead-ms", type=float, default=100.0,
+                   help="Fail if a case takes longer than this over a bare interpreter")
+    p.add_argument("--json", help="Write results to this file")
+    args = p.parse_args(argv)
+
+    res = measure_startup(args.runs)
+    failures = []
+    print(f"bare interpreter: {res['bare_ms']} ms")
+    print(f"{'case':10s} {'median':>9s} {'overhead':>9s}  heavy imports")
+    for name, c in res["cases"].items():
+        print(f"{name:10s} {c['median_ms']:7.1f}ms {c['overhead_ms']:7.1f}ms  {', '.join(c['heavy_imports']) or '-'}")
+        if c["returncode"] != 0:
+            failures.append(f"{name}: exited {c['returncode']}")
+        if c["overhead_ms"] > args.max_overhead_ms:
+            failures.append(f"{name}: {c['overhead_ms']} ms over budget ({args.max_overhead_ms} ms)")
+        if c["heavy_imports"]:
+            failures.append(f"{name}: imports {', '.join(c['heavy_imports'])}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(res, fh, indent=2)
+    for f in failures:
+        print(f"[FAIL] {f}")
+    sys.exit(1 if failures else 0)
+
+
+# ---- throughput suites ------------------------------------------------------
+
+# Real sample papers shipped with the repository (absent in an installed package).
+SAMPLE_DIR = Path(__file__).resolve().parents[2] / "test"
+
+_SYMBOLS = ("E", "m", "c", "F", "a", "\\alpha", "\\Phi", "G_{N}", "\\hbar", "\\omega", "k_B", "T")
+_PROSE = (
+    "In this section we consider the behaviour of the system in the limit of weak coupling.",
+    "It should be noted that the approximation is in fact basically valid only for small amplitudes.",
+    "The results obtained by means of the numerical integration are shown in the figure below.",
+    "A detailed derivation, which follows the standard treatment, is given in the appendix.",
+)
+
+
+def synthetic_document(n_equations: int, seed: int = 0) -> str:
+    """
+    A LaTeX document with `n_equations` equations in the mix real papers
+    have: inline math, \\[...\\] displays and labelled equation environments
+    referenced with \\eqref, plus citations and prose paragraphs.
+    """
+    rng = random.Random(seed)
+    parts = ["\\documentclass{article}\n\\begin{document}\n"]
+    count = 0
+    while count < n_equations:
+        a, b, c = (rng.choice(_SYMBOLS) for _ in range(3))
+        para = [rng.choice(_PROSE), f"Here ${a} = {b} {c}^2$ relates the quantities"]
+        count += 1
+        if count > 1 and rng.random() < 0.3:
+            para.append(f"as in \\eqref{{eq:{count - 1}}}")
+        if rng.random() < 0.3:
+            para.append(f"following \\cite{{ref{rng.randrange(200)}}}")
+        para.append(".")
+        kind = rng.random()
+        if count < n_equations and kind < 0.4:
+            count += 1
+            para.append(f"\n\\begin{{equation}}\n\\label{{eq:{count}}}\n"
+                        f"{a} = \\frac{{{b}}}{{{c}}} + \\int_0^\\infty {b}(x)\\,dx\n\\end{{equation}}\n")
+        elif count < n_equations and kind < 0.7:
+            count += 1
+            para.append(f"\n\\[\n{a} \\approx \\sum_{{n}} {b}_n {c}^n\n\\]\n")
+        parts.append(" ".join(para) + "\n\n")
+    parts.append("\\end{document}\n")
+    return "".join(parts)
+
+
+def _documents(sizes):
+    docs = {}
+    for path in sorted(SAMPLE_DIR.glob("*.tex")):
+        docs[path.name] = path.read_text(encoding="utf-8")
+    for n in sizes:
+        docs[f"synthetic-{n}"] = synthetic_document(n)
+    return docs
+
+
+def _timed(fn, runs):
+    """Median wall time (s) of `runs` calls and the last result."""
+    times, result = [], None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), result
+
+
+def _suite_args(audits, argv):
+    from eqnlint.bin.eqnlint import build_parser
+    return build_parser(audits).parse_args(argv)
+
+
+def measure_extract(sizes=(100, 1000, 10000), runs=3):
+    """targets/s of each extraction function and each audit's _extract_targets, per document."""
+    from eqnlint.lib import _extract, _prose, _registry, _debug
+    from eqnlint.lib._extract import Document, IncrementalDocument
+
+    functions = {
+        "extract_equations_with_context": _extract.extract_equations_with_context,
+        "extract_citations_with_context": _extract.extract_citations_with_context,
+        "extract_paragraphs": _prose.extract_paragraphs,
+        "IncrementalDocument.targets": lambda text: IncrementalDocument(text).targets(
+            "equations", _extract.extract_equations_with_context),
+    }
+    audits = {name: _registry.load(name) for name in _registry.BUILTIN_AUDITS}
+    args = _suite_args(audits, ["-f", "bench.tex"])
+    level = _debug.logger.level
+    _debug.logger.setLevel("WARNING")  # prose triage logs a line per run
+    rows = []
+    try:
+        for doc, text in _documents(sizes).items():
+            for name, fn in functions.items():
+                sec, targets = _timed(lambda: fn(text), runs)
+                rows.append(_row("extract", name, doc, len(targets), sec))
+            for name, cls in audits.items():
+                def extract():
+                    m = cls(args=args, document=Document(text, doc))
+                    m._extract_targets()
+                    return m.equations
+                sec, targets = _timed(extract, runs)
+                rows.append(_row("extract", f"{name}._extract_targets", doc, len(targets), sec))
+    finally:
+        _debug.logger.setLevel(level)
+    return rows
+
+
+def _row(suite, case, doc, n, sec, **extra):
+    return {"suite": suite, "case": case, "doc": doc, "n": n, "ms": round(sec * 1000.0, 2),
+            "per_s": round(n / sec, 1) if sec > 0 else 0.0, **extra}
+
+
+def _simulated_value(schema):
+    """The first valid value for a (structured-output) schema."""
+    if "enum" in schema:
+        return schema["enum"][0]
+    types = schema.get("type", "string")
+    types = [types] if isinstance(types, str) else types
+    if "null" in types:
+        return None
+    if "object" in types:
+        return {k: _simulated_value(v) for k, v in schema.get("properties", {}).items()}
+    if "array" in types:
+        return []
+    if "number" in types or "integer" in types:
+        return 0.99
+    return "simulated"
+
+
+def simulated_client(latency_ms=50.0, jitter=0.2, seed=0, **kwargs):
+    """
+    An AIClient whose backend sleeps instead of calling a model: `latency_ms`
+    per request (± jitter), first byte at a fifth of it, and a reply that
+    satisfies the request's schema. Everything in front of the backend
+    (semaphore, rate limiter, budget, cache, tracing) is the real code.
+    """
+    from eqnlint.lib._ai import AIClient
+    from eqnlint.lib._trace import mark_first_byte
+
+    rng = random.Random(seed)
+
+    class SimulatedClient(AIClient):
+        async def _openai(self, system, user, fewshot, meta=None, schema=None, max_tokens=None, stop=None):
+            total = latency_ms / 1000.0 * (1 + rng.uniform(-jitter, jitter))
+            await asyncio.sleep(total / 5)
+            mark_first_byte()
+            await asyncio.sleep(total - total / 5)
+            if meta is not None:
+                meta["tokens_in"], meta["tokens_out"] = len(user) // 4, 20
+            if schema is None:
+                return "✅ CONSISTENT: simulated"
+            return json.dumps(_simulated_value(schema))
+
+        _ollama = _openai
+
+    return SimulatedClient("sim", **kwargs)
+
+
+def measure_dispatch(targets=200, concurrency=(1, 8, 32), latency_ms=50.0, audit="units"):
+    """Targets/s of one audit's AI stage against the simulated backend, per concurrency."""
+    from eqnlint.lib import _registry, _debug
+    from eqnlint.lib._extract import Document
+    from eqnlint.lib._symbols import SymbolTable
+    from eqnlint.lib._checkpoint import Checkpoint
+
+    cls = _registry.load(audit)
+    text = synthetic_document(targets)
+    rows = []
+    level = _debug.logger.level
+    _debug.logger.setLevel("WARNING")
+    try:
+        for c in concurrency:
+            args = _suite_args({audit: cls}, ["-f", "bench.tex", "--concurrency", str(c), "--rate", "100000"])
+            client = simulated_client(latency_ms, concurrency=c, rate=args.rate)
+
+            async def run():
+                m = cls(args=args, ai_client=client, document=Document(text, "bench.tex"))
+                m.symbols = SymbolTable(None)
+                m.checkpoint = Checkpoint(None)
+                await m.run()
+                return m
+
+            t0 = time.perf_counter()
+            m = asyncio.run(run())
+            sec = time.perf_counter() - t0
+            ideal = c / (latency_ms / 1000.0)
+            row = _row("dispatch", f"{audit} concurrency={c}", f"synthetic-{targets}", len(m.equations), sec)
+            row["efficiency"] = round(row["per_s"] / ideal, 3)
+            rows.append(row)
+    finally:
+        _debug.logger.setLevel(level)
+    return rows
+
+
+def measure_e2e(concurrency=(1, 4, 16), rates=(10.0, 100.0), latency_ms=50.0, doc=None):
+    """Full suite runs (all built-in audits, one shared simulated client) per setting."""
+    from eqnlint.lib import _registry, _debug
+    from eqnlint.bin.eqnlint import run_audits
+
+    audits = {name: _registry.load(name) for name in _registry.BUILTIN_AUDITS}
+    path = Path(doc) if doc else SAMPLE_DIR / "test_paper.tex"
+    rows = []
+    level = _debug.logger.level
+    _debug.logger.setLevel("WARNING")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for c in concurrency:
+                for rate in rates:
+                    argv = ["-f", str(path), "--concurrency", str(c), "--rate", str(rate),
+                            "--checkpoint", os.path.join(tmp, f"c{c}-r{rate}.jsonl"),
+                            "--symbols", os.path.join(tmp, f"c{c}-r{rate}.symbols.json")]
+                    args = _suite_args(audits, argv)
+                    client = simulated_client(latency_ms, concurrency=c, rate=rate)
+                    t0 = time.perf_counter()
+                    asyncio.run(run_audits(args, audits, client=client))
+                    sec = time.perf_counter() - t0
+                    ideal = min(rate, c / (latency_ms / 1000.0))
+                    row = _row("e2e", f"concurrency={c} rate={rate:g}", path.name, client.meter.calls, sec)
+                    row["efficiency"] = round(row["per_s"] / ideal, 3)
+                    rows.append(row)
+    finally:
+        _debug.logger.setLevel(level)
+    return rows
+
+
+# ---- baselines --------------------------------------------------------------
+
+def _key(row):
+    return f"{row['suite']}/{row['case']}/{row['doc']}"
+
+
+def compare(rows, baseline, threshold):
+    """Rows whose throughput fell more than `threshold` (a fraction) below the baseline."""
+    slower = []
+    for row in rows:
+        base = baseline.get("cases", {}).get(_key(row))
+        if base and row["per_s"] < base * (1 - threshold):
+            slower.append(f"{_key(row)}: {row['per_s']}/s vs baseline {base}/s "
+                          f"({row['per_s'] / base - 1:+.0%})")
+    return slower
+
+
+def save_baseline(rows, path):
+    """Merge these rows' throughput into a baseline file (other suites' entries are kept)."""
+    data = {"version": 1, "cases": {}}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    data.update(python=platform.python_version(), machine=platform.machine(), saved_at=time.time())
+    data["cases"].update({_key(r): r["per_s"] for r in rows})
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+
+
+def _throughput_parser(suite, description):
+    p = argparse.ArgumentParser(prog=f"eqnlint bench {suite}", description=description)
+    p.add_argument("--json", help="Write results to this file")
+    p.add_argument("--baseline", help="Compare against this baseline file")
+    p.add_argument("--save-baseline", help="Record these results in this baseline file")
+    p.add_argument("--threshold", type=float, default=0.25,
+                   help="Fail when throughput drops more than this fraction below the baseline")
+    return p
+
+
+def _report(args, rows):
+    cols = [c for c in ("case", "doc", "n", "ms", "per_s", "efficiency") if any(c in r for r in rows)]
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in cols}
+    print("  ".join(c.ljust(widths[c]) for c in cols))
+    for r in rows:
+        print("  ".join(str(r.get(c, "")).ljust(widths[c]) for c in cols))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(rows, fh, indent=2)
+    failures = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fh:
+            failures = compare(rows, json.load(fh), args.threshold)
+    if args.save_baseline:
+        save_baseline(rows, args.save_baseline)
+        print(f"Baseline saved to {args.save_baseline}")
+    for f in failures:
+        print(f"[FAIL] {f}")
+    sys.exit(1 if failures else 0)
+
+
+def _ints(value):
+    return tuple(int(v) for v in value.split(","))
+
+
+def _floats(value):
+    return tuple(float(v) for v in value.split(","))
+
+
+def extract_main(argv=None):
+    p = _throughput_parser("extract", "Extraction throughput on the sample papers and synthetic documents.")
+    p.add_argument("--sizes", type=_ints, default=(100, 1000, 10000),
+                   help="Synthetic document sizes in equations (default: 100,1000,10000)")
+    p.add_argument("--runs", type=int, default=3, help="Runs per case (median is reported)")
+    args = p.parse_args(argv)
+    _report(args, measure_extract(args.sizes, args.runs))
+
+
+def dispatch_main(argv=None):
+    p = _throughput_parser("dispatch", "One audit's AI stage against a simulated-latency backend.")
+    p.add_argument("--audit", default="units", help="Audit to run (default: units)")
+    p.add_argument("--targets", type=int, default=200, help="Equations in the synthetic document")
+    p.add_argument("--concurrency", type=_ints, default=(1, 8, 32), help="Settings to try (default: 1,8,32)")
+    p.add_argument("--latency-ms", type=float, default=50.0, help="Simulated request latency")
+    args = p.parse_args(argv)
+    _report(args, measure_dispatch(args.targets, args.concurrency, args.latency_ms, args.audit))
+
+
+def e2e_main(argv=None):
+    p = _throughput_parser("e2e", "Full eqnlint runs against a simulated-latency backend.")
+    p.add_argument("-f", "--file", help="Paper to audit (default: test/test_paper.tex)")
+    p.add_argument("--concurrency", type=_ints, default=(1, 4, 16), help="Settings to try (default: 1,4,16)")
+    p.add_argument("--rate", type=_floats, default=(10.0, 100.0), help="Settings to try (default: 10,100)")
+    p.add_argument("--latency-ms", type=float, default=50.0, help="Simulated request latency")
+    args = p.parse_args(argv)
+    _report(args, measure_e2e(args.concurrency, args.rate, args.latency_ms, args.file))
+
+
+SUITES = {
+    "startup": startup_main,
+    "extract": extract_main,
+    "dispatch": dispatch_main,
+    "e2e": e2e_main,
+}
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] not in SUITES:
+        print(f"usage: eqnlint bench {{{','.join(SUITES)}}} [options]")
+        sys.exit(2)
+    SUITES[argv[0]](argv[1:])
+
+
+if __name__ == "__main__":
+    main()
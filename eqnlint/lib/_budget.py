@@ -1,10 +1,65 @@
 # eqnlint/lib/_budget.py
 import time
 import asyncio
+import inspect
 import threading
 from typing import Optional
 
 
+class BudgetExhausted(RuntimeError):
+    """Raised instead of sending a request once a run's call budget is spent."""
+
+
+class Budget:
+    """
+    What one run may still send: a cap on requests (--max-calls), a
+    wall-clock deadline (--deadline) and a halt switch (--fail-fast).
+
+    A run creates its own Budget and passes it with every request, so a
+    client shared between runs (the daemon's, a library caller's) carries
+    nothing from one run into the next; the client itself keeps only the
+    rate limiter and concurrency cap.
+    """
+
+    def __init__(self, max_calls: Optional[int] = None, deadline: Optional[float] = None):
+        self.max_calls = max_calls
+        self.calls = 0  # requests sent (cache hits are free)
+        self.deadline = None  # monotonic time after which nothing more is sent
+        self.halted: Optional[str] = None  # reason, once halt() has been called
+        self.set_deadline(deadline)
+
+    def set_deadline(self, seconds: Optional[float]) -> None:
+        """Stop sending `seconds` from now (None clears the deadline)."""
+        self.deadline = None if seconds is None else time.monotonic() + seconds
+
+    def halt(self, reason: str) -> None:
+        """Refuse all further requests, e.g. after the first hard failure with --fail-fast."""
+        if self.halted is None:
+            self.halted = reason
+
+    def check(self) -> None:
+        if self.halted is not None:
+            raise BudgetExhausted(self.halted)
+        if self.max_calls is not None and self.calls >= self.max_calls:
+            raise BudgetExhausted(f"call budget of {self.max_calls} requests reached")
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise BudgetExhausted("deadline reached")
+
+    async def before_deadline(self, aw):
+        """Await `aw`, cut off with BudgetExhausted at the deadline."""
+        if self.deadline is None:
+            return await aw
+        remaining = self.deadline - time.monotonic()
+        try:
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            return await asyncio.wait_for(aw, remaining)
+        except asyncio.TimeoutError:
+            if inspect.iscoroutine(aw):
+                aw.close()
+            raise BudgetExhausted("deadline reached") from None
+
+
 class RateLimiter:
     """
     Simple QPS limiter usable from both sync and async code.
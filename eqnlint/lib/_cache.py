@@ -0,0 +1,57 @@
+# eqnlint/lib/_cache.py
+import json
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+
+class ResponseCache:
+    """
+    In-memory LRU of model replies keyed by everything that shapes the reply
+    (model, token cap, system prompt, few-shots, user prompt, response schema).
+
+    Used by long-lived processes (the daemon) so re-auditing an unchanged
+    target costs nothing. Error replies are never stored.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model, max_tokens, system, user, fewshot=None, schema=None, stop=None) -> str:
+        h = hashlib.sha256()
+        parts = [model, str(max_tokens), system, json.dumps(fewshot or [], sort_keys=True), user]
+        if schema is not None:
+            parts.append(json.dumps(schema, sort_keys=True))
+        if stop is not None:
+            parts.append(f"stop:{stop}")  # replies cut short by an early-stop rule
+        for part in parts:
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        if not value or value.startswith(("[ERROR]", "ERROR:")):
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def as_dict(self) -> dict:
+        return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
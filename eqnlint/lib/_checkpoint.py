@@ -0,0 +1,123 @@
+# eqnlint/lib/_checkpoint.py
+import os
+import json
+import hashlib
+import pathlib
+from typing import Dict, Optional, Tuple
+
+from ._textio import side_file
+from ._verdict import Verdict, parse_verdict
+
+# Target fields that move when unrelated text is edited; they do not change
+# what the model is asked, so they are left out of the key.
+_POSITIONAL = ("line", "start", "end")
+
+
+def checkpoint_key(target: dict) -> str:
+    """Stable hash of everything an audit sends about one target."""
+    stable = {k: v for k, v in target.items() if k not in _POSITIONAL}
+    return hashlib.sha1(json.dumps(stable, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def run_config_key(audit_name, model, max_tokens, system_prompt="", few_shots=None) -> str:
+    """Settings that change an audit's replies; results are reused only if these match."""
+    cfg = [audit_name, model, max_tokens, system_prompt, few_shots or []]
+    return hashlib.sha1(json.dumps(cfg, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:12]
+
+
+def checkpoint_path(args) -> Optional[pathlib.Path]:
+    """--checkpoint if given, else next to -o, else in the cache dir; None when not applicable."""
+    if getattr(args, "dry_run", False):
+        return None
+    explicit = getattr(args, "checkpoint", None)
+    if explicit:
+        return pathlib.Path(explicit)
+    return side_file(args, ".checkpoint.jsonl")
+
+
+def is_failed(result: dict) -> bool:
+    return parse_verdict(result.get("notes", "")) is Verdict.ERROR
+
+
+class Checkpoint:
+    """
+    Append-only JSONL journal of finished targets, one line per result,
+    written as each result completes so an interrupted run loses at most the
+    requests that were in flight.
+
+    Lines are keyed by (run config, target hash). With `resume=True` finished
+    targets are served from the journal and only pending or failed ones are
+    dispatched again; without it each audit starts its journal afresh.
+    A torn last line (crash mid-write) is ignored on load.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path=None, resume: bool = False):
+        self.path = pathlib.Path(path) if path else None
+        self.resume = resume
+        self._entries: Dict[Tuple[str, str], dict] = {}
+        if self.path is not None and self.path.is_file():
+            with open(self.path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(entry, dict) and entry.get("v") == self.VERSION:
+                        self._entries[(entry["config"], entry["target"])] = entry
+
+    def begin(self, config: str) -> Dict[str, int]:
+        """
+        Start journaling one audit run. A fresh (non-resume) run forgets that
+        configuration's old results. Returns {"done": n, "failed": m} on record.
+        """
+        if not self.resume:
+            stale = [k for k in self._entries if k[0] == config]
+            for k in stale:
+                del self._entries[k]
+            if stale:
+                self._rewrite()
+        counts = {"done": 0, "failed": 0}
+        for (cfg, _), entry in self._entries.items():
+            if cfg == config:
+                counts[entry["status"]] += 1
+        return counts
+
+    def get(self, config: str, target: dict) -> Optional[dict]:
+        """The journaled result for a finished target, or None if it must be (re)dispatched."""
+        if not self.resume:
+            return None
+        entry = self._entries.get((config, checkpoint_key(target)))
+        if entry is None or entry["status"] != "done":
+            return None
+        return entry["result"]
+
+    def record(self, config: str, target: dict, result: dict) -> None:
+        entry = {
+            "v": self.VERSION,
+            "config": config,
+            "target": checkpoint_key(target),
+            "status": "failed" if is_failed(result) else "done",
+            "result": result,
+        }
+        self._entries[(config, entry["target"])] = entry
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            fh.flush()
+
+    def _rewrite(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            for entry in self._entries.values():
+                fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
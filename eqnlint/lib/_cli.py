@@ -1,33 +1,82 @@
 # lib/_cli.py
 import argparse, json, sys, pathlib
+from ._schedule import parse_duration
+from ._sample import parse_sample
 
-# NEW: pull package version; fallback if missing
-try:
-    from .. import __version__
-except Exception:  # pragma: no cover
-    __version__ = "0.0.0"
+class _VersionAction(argparse.Action):
+    """--version that looks the package version up only when asked."""
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS, help=None):
+        super().__init__(option_strings, dest=dest, default=default, nargs=0,
+                         help=help or "show program's version number and exit")
 
-def base_parser(description, audit_name, extra_args=None):
+    def __call__(self, parser, namespace, values, option_string=None):
+        try:
+            from .. import __version__
+        except Exception:  # pragma: no cover
+            __version__ = "0.0.0"
+        parser.exit(message=f"{parser.prog} {__version__}\n")
+
+def base_parser(description, audit_name, extra_args=None, require_file=True):
     p = argparse.ArgumentParser(
         description=description,
         formatter_class=argparse.RawTextHelpFormatter
     )
 
     # NEW: standard --version flag (works for all entry points using base_parser)
-    p.add_argument(
-        "--version",
-        action="version",
-        version=f"%(prog)s {__version__}"
-    )
+    p.add_argument("--version", action=_VersionAction)
 
-    p.add_argument("-f","--file", required=True, help="Input LaTeX file")
+    p.add_argument("-f","--file", required=require_file, help="Input LaTeX file")
     p.add_argument("-o","--output", help="Write human log to file")
     p.add_argument("--json", help="Write machine-readable JSON to file")
     p.add_argument("--dry-run", action="store_true", help="Parse only; no AI")
     p.add_argument("--model", default="gpt-4o-mini", help="LLM id or 'ollama:phi'")
     p.add_argument("--rate", type=float, default=0.5, help="Max QPS (requests/sec)")
-    p.add_argument("--max-tokens", type=int, default=1200, help="LLM token cap")
-    p.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+    p.add_argument("--concurrency", type=int, default=4, help="Max requests in flight")
+    p.add_argument("--max-tokens", type=int, default=None,
+                   help="LLM token cap per reply (default: each audit's own budget; 1200 with --free-text)")
+    p.add_argument("--free-text", action="store_true",
+                   help="Ask for free-text replies instead of schema-checked JSON")
+    p.add_argument("--no-early-stop", action="store_true",
+                   help="Let every reply run to its end instead of streaming it and cutting it off\n"
+                        "once the verdict and reason have arrived")
+    p.add_argument("--reason-on-fail", action="store_true",
+                   help="Keep reasons only for failing/warning verdicts: stop a pass at its verdict")
+    ollama_args(p)
+    p.add_argument("--triage-model", help="Cheap/local model that gives a verdict first (e.g. ollama:phi);\n"
+                                          "only targets it does not pass confidently are escalated")
+    p.add_argument("--escalate-model", help="Model for escalated targets (default: --model)")
+    p.add_argument("--triage-confidence", type=float, default=0.8,
+                   help="Triage passes at or above this confidence are final (default: 0.8)")
+    p.add_argument("--triage-rate", type=float, default=None, help="Max QPS for the triage model (default: --rate)")
+    p.add_argument("--few-shots", type=int, default=3,
+                   help="Examples per request, the most similar to the target (default: 3)")
+    p.add_argument("--few-shot-tokens", type=int, default=600,
+                   help="Token budget for the examples of one request (default: 600)")
+    p.add_argument("--all-few-shots", action="store_true", help="Send every example with every request")
+    p.add_argument("--few-shot-pool", help="JSON/JSONL file of extra examples: {\"audit\", \"user\", \"assistant\"}")
+    p.add_argument("--symbols", help="Shared symbol table JSON (default: next to -o, else in ~/.cache/eqnlint)")
+    p.add_argument("--checkpoint", help="Result journal for --resume (default: next to -o, else in ~/.cache/eqnlint)")
+    p.add_argument("--resume", action="store_true",
+                   help="Reuse finished results from the checkpoint; re-send only pending or failed targets")
+    p.add_argument("--max-calls", type=int, default=None,
+                   help="Stop sending requests after N; finish later with --resume")
+    p.add_argument("--deadline", type=parse_duration, default=None,
+                   help="Wall-clock limit (e.g. 120s, 5m): send the highest-priority targets first\n"
+                        "and report what was covered when time runs out")
+    p.add_argument("--sample", type=parse_sample, default=None, metavar="FRACTION|N",
+                   help="Audit a stratified random sample of the equations (0.1, 10%% or 200), stratified by\n"
+                        "environment type and section, and report each verdict's estimated rate with a 95%% CI")
+    p.add_argument("--sample-seed", type=int, default=0, help="Seed of the --sample draw (default: 0)")
+    p.add_argument("--sample-expand", type=float, default=None, metavar="RATE",
+                   help="After the sample, audit every equation of any section whose estimated\n"
+                        "failure rate is at least RATE (e.g. 0.2)")
+    p.add_argument("--fail-fast", action="store_true",
+                   help="Stop sending requests after the first failing verdict")
+    p.add_argument("--db", help="Also record results in this SQLite database (see `eqnlint query`)")
+    p.add_argument("--trace", help="Write a Chrome/Perfetto trace of states and requests to this JSON file")
+    metrics_args(p)
+    p.add_argument("-v", "--verbose", action="store_true",
+                   help="Enable verbose logging and print p50/p95/p99 timings at the end")
     p.add_argument("--help-info", action="store_true",
                    help="Print Info Section for pipeline probing and exit")
 
@@ -38,6 +87,25 @@ def base_parser(description, audit_name, extra_args=None):
     p.set_defaults(_audit_name=audit_name)
     return p
 
+def ollama_args(p):
+    """Local-model backend flags (models named 'ollama:...')."""
+    p.add_argument("--ollama-keep-alive", default=None,
+                   help="How long Ollama keeps the model loaded after a request (default: 30m; -1 = forever)")
+    p.add_argument("--ollama-num-ctx", type=int, default=None,
+                   help="Ollama context window in tokens (the server default may truncate long prompts)")
+    p.add_argument("--ollama-option", action="append", default=[], metavar="KEY=VALUE",
+                   help="Extra Ollama model option, e.g. num_gpu=99 (repeatable)")
+    p.add_argument("--no-warm-up", action="store_true",
+                   help="Do not load Ollama models in the background before the first request")
+
+def metrics_args(p):
+    """Prometheus exporter flags, shared with `eqnlint serve`."""
+    p.add_argument("--metrics-port", type=int, default=None,
+                   help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics while running")
+    p.add_argument("--metrics-file", help="Write Prometheus metrics to this file (node-exporter textfile collector)")
+    p.add_argument("--metrics-interval", type=float, default=15.0,
+                   help="Seconds between --metrics-file updates (default: 15)")
+
 def info_block(audit_name, summary, inputs, outputs, steps):
     return f"""\
 === Info Section ({audit_name}) ===
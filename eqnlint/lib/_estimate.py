@@ -0,0 +1,332 @@
+# eqnlint/lib/_estimate.py
+import re
+import math
+import argparse
+from typing import Dict, List, Optional
+
+# USD per 1M tokens (input, output), list prices; longest matching prefix
+# wins. Local models are free. Check your provider's current pricing.
+PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "o4-mini": (1.10, 4.40),
+    "o3-mini": (1.10, 4.40),
+    "ollama:": (0.0, 0.0),
+}
+
+# Per-request latency when the results store has none for a model:
+# fixed overhead (s) plus output tokens at a generation speed (tokens/s).
+LATENCY = {"remote": (0.6, 60.0), "ollama": (0.3, 25.0)}
+
+MESSAGE_OVERHEAD = 4  # role and separators per chat message
+FALLBACK_REPLY = 150  # expected reply tokens for audits without examples
+
+_TOKEN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+_encoder = None
+
+
+def _tiktoken():
+    # tiktoken is optional; without it (or its encoding files) the
+    # heuristic below is used.
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoder = False
+    return _encoder
+
+
+def tokenizer_name() -> str:
+    return "tiktoken o200k_base" if _tiktoken() else "a local estimate (words, digit groups, symbols)"
+
+
+def count_tokens(text: str) -> int:
+    """Token count of `text`: tiktoken if installed, else a BPE-like estimate."""
+    if not text:
+        return 0
+    enc = _tiktoken()
+    if enc:
+        return len(enc.encode(text, disallowed_special=()))
+    n = 0
+    for tok in _TOKEN.findall(text):
+        if tok[0].isalpha():
+            n += 1 + (len(tok) - 1) // 6
+        elif tok[0].isdigit():
+            n += math.ceil(len(tok) / 3)
+        else:
+            n += 1
+    return n
+
+
+def message_tokens(system: str, few_shots: Optional[List[dict]] = None, user: str = "") -> int:
+    msgs = [system, *(m.get("content", "") for m in few_shots or []), *([user] if user else [])]
+    return sum(count_tokens(m) + MESSAGE_OVERHEAD for m in msgs) + 3
+
+
+def expected_reply(few_shots: List[dict], cap: int) -> int:
+    """Typical reply length: the mean of the example answers, capped at the reply budget."""
+    answers = [count_tokens(m["content"]) for m in few_shots if m.get("role") == "assistant"]
+    typical = round(sum(answers) / len(answers)) if answers else FALLBACK_REPLY
+    return max(1, min(cap, typical))
+
+
+def price_for(model: str):
+    matches = [p for p in PRICES if model.startswith(p)]
+    return PRICES[max(matches, key=len)] if matches else None
+
+
+def _live_args(args):
+    # Where a real run would find its checkpoint and symbol table.
+    return argparse.Namespace(**{**vars(args), "dry_run": False})
+
+
+def plan(machine) -> dict:
+    """
+    What one audit of a --dry-run would send: builds the real system prompt,
+    few-shots and per-target prompts (the same code a run uses), and counts
+    their tokens. Also counts what reuse would save: targets already
+    finished in the checkpoint (--resume), symbol dictionaries already in
+    the symbol table, duplicate prompts, and targets a local prefilter
+    dropped.
+    """
+    from eqnlint.lib._ai import DEFAULT_MAX_TOKENS
+    from eqnlint.lib._checkpoint import Checkpoint, checkpoint_path, run_config_key
+    from eqnlint.lib._symbols import SymbolTable, symbol_table_path, target_key
+    from eqnlint.bin.audit_template import TRIAGE_TOKENS
+    from eqnlint.lib._fusion import fusable
+
+    m = machine
+    args = m.args
+    live = _live_args(args)
+    if not m.symbols or not len(m.symbols):
+        m.symbols = SymbolTable.load(symbol_table_path(live))
+    m._get_few_shots()
+    m._prepare_prompts()
+    cap = m._reply_budget() or DEFAULT_MAX_TOKENS
+    reply = expected_reply(m.few_shots, cap)
+    prefixes = {}  # (triage, id(few-shot list)) -> tokens; selections are shared list objects
+
+    def prefix_for(prompt, triage=False):
+        shots = m._few_shots_for(prompt, triage)
+        key = (triage, id(shots))
+        if key not in prefixes:
+            prefixes[key] = message_tokens(m.triage_system if triage else m.system_prompt, shots)
+        return prefixes[key]
+
+    ckpt = Checkpoint(checkpoint_path(live), resume=True)
+    config = run_config_key(m.audit_name, m._model_key(), m._reply_budget(), m.system_prompt, m.few_shots)
+
+    p = {"audit": m.audit_name, "model": getattr(args, "escalate_model", None) or args.model,
+         "targets": len(m.equations), "requests": 0, "tokens_in": 0, "tokens_out": 0, "tokens_out_max": 0,
+         "prefix_tokens": 0, "resumable": 0, "resumable_tokens": 0, "symbol_hits": 0,
+         "duplicates": 0, "prefiltered": len(m.prefiltered), "prefiltered_tokens": 0, "triage": None,
+         "fusable": fusable(type(m)) and m.response_schema is not None}
+    seen = set()
+    prompts = []
+    for eq in m.equations:
+        if m.audit_name == "symbolic" and m.symbols.get(target_key(eq)) is not None:
+            p["symbol_hits"] += 1
+            continue
+        prompt = m._build_prompt(eq)
+        prefix = prefix_for(prompt)
+        p["prefix_tokens"] += prefix
+        tokens = prefix + count_tokens(prompt) + MESSAGE_OVERHEAD
+        if ckpt.get(config, eq) is not None:
+            p["resumable"] += 1
+            p["resumable_tokens"] += tokens
+        if prompt in seen:
+            p["duplicates"] += 1
+        seen.add(prompt)
+        prompts.append(prompt)
+        p["requests"] += 1
+        p["tokens_in"] += tokens
+        p["tokens_out"] += reply
+        p["tokens_out_max"] += cap
+    for eq in m.prefiltered:
+        prompt = m._build_prompt(eq)
+        p["prefiltered_tokens"] += prefix_for(prompt) + count_tokens(prompt) + MESSAGE_OVERHEAD
+    if m.triage_schema is not None:
+        # Every target goes to triage; escalation is counted for all of them
+        # (the worst case) since the share triage settles is unknown.
+        p["triage"] = {"model": args.triage_model, "requests": len(prompts),
+                       "tokens_in": sum(prefix_for(q, True) + count_tokens(q) + MESSAGE_OVERHEAD for q in prompts),
+                       "tokens_out": expected_reply(m.triage_few_shots, TRIAGE_TOKENS) * len(prompts),
+                       "tokens_out_max": TRIAGE_TOKENS * len(prompts)}
+    return p
+
+
+def merge(plans: List[dict]) -> List[dict]:
+    """Sum plans of the same audit (the papers of a corpus)."""
+    out: Dict[str, dict] = {}
+    for p in plans:
+        acc = out.get(p["audit"])
+        if acc is None:
+            out[p["audit"]] = {**p, "triage": dict(p["triage"]) if p["triage"] else None}
+            continue
+        for k, v in p.items():
+            if isinstance(v, int) and not isinstance(v, bool):
+                acc[k] += v
+        if p["triage"]:
+            for k in ("requests", "tokens_in", "tokens_out", "tokens_out_max"):
+                acc["triage"][k] += p["triage"][k]
+    return list(out.values())
+
+
+def request_latency(model: str, tokens_out: float, store=None) -> float:
+    """Seconds per request: the median of past runs in the results store, else the LATENCY model."""
+    if store is not None:
+        observed = store.latency(model)
+        if observed is not None:
+            return observed / 1000.0
+    base, speed = LATENCY["ollama" if model.startswith("ollama:") else "remote"]
+    return base + tokens_out / speed
+
+
+def wall_time(requests: int, rate: float, concurrency: int, latency: float) -> float:
+    """Requests through one rate limiter and concurrency cap: the tighter one, plus one request."""
+    if not requests:
+        return 0.0
+    return max(requests / max(rate, 1e-9), requests * latency / max(1, concurrency)) + latency
+
+
+def estimate(plans: List[dict], args, store=None) -> dict:
+    """
+    Requests, tokens, cost per model, and predicted wall time for `plans`
+    under the run's --rate/--concurrency (a model has its own limiter;
+    models run side by side), plus what reuse, prefilters and --fuse save.
+    """
+    plans = merge(plans)
+    models: Dict[str, dict] = {}
+
+    def add(model, requests, tin, tout, tmax, rate):
+        row = models.setdefault(model, {"model": model, "requests": 0, "tokens_in": 0, "tokens_out": 0,
+                                        "tokens_out_max": 0, "rate": rate})
+        row["requests"] += requests
+        row["tokens_in"] += tin
+        row["tokens_out"] += tout
+        row["tokens_out_max"] += tmax
+
+    triage_rate = getattr(args, "triage_rate", None) or args.rate
+    for p in plans:
+        add(p["model"], p["requests"], p["tokens_in"], p["tokens_out"], p["tokens_out_max"], args.rate)
+        if p["triage"]:
+            t = p["triage"]
+            add(t["model"], t["requests"], t["tokens_in"], t["tokens_out"], t["tokens_out_max"], triage_rate)
+
+    wall = 0.0
+    for row in models.values():
+        price = price_for(row["model"])
+        if price is None:
+            row["cost"] = row["cost_max"] = None
+        else:
+            row["cost"] = round((row["tokens_in"] * price[0] + row["tokens_out"] * price[1]) / 1e6, 4)
+            row["cost_max"] = round((row["tokens_in"] * price[0] + row["tokens_out_max"] * price[1]) / 1e6, 4)
+        per_request = row["tokens_out"] / row["requests"] if row["requests"] else 0
+        row["latency_s"] = round(request_latency(row["model"], per_request, store), 2)
+        row["wall_s"] = round(wall_time(row["requests"], row.pop("rate"), args.concurrency, row["latency_s"]), 1)
+        wall = max(wall, row["wall_s"])
+
+    requests = sum(r["requests"] for r in models.values())
+    notes = []
+    if args.max_calls is not None and requests > args.max_calls:
+        notes.append(f"--max-calls {args.max_calls} stops the run after {args.max_calls} of {requests} requests")
+    if args.deadline is not None and wall > args.deadline:
+        notes.append(f"--deadline {args.deadline:g}s cuts the run off before the predicted {wall:.0f}s; "
+                     f"the highest-priority targets go first")
+
+    # --fuse: the fused audits share one request per equation, so all but the
+    # largest audit's requests go, and with them their copies of the context.
+    fused = [p for p in plans if p.get("fusable")]
+    if len(fused) < 2:
+        fused = []
+    top = max(fused, key=lambda p: p["requests"], default=None)
+    savings = {
+        "resume": {"requests": sum(p["resumable"] for p in plans),
+                   "tokens_in": sum(p["resumable_tokens"] for p in plans)},
+        "symbol_table": {"requests": sum(p["symbol_hits"] for p in plans)},
+        "duplicates": {"requests": sum(p["duplicates"] for p in plans)},
+        "prefilter": {"targets": sum(p["prefiltered"] for p in plans),
+                      "tokens_in": sum(p["prefiltered_tokens"] for p in plans)},
+        "fusion": {"audits": [p["audit"] for p in fused],
+                   "requests": sum(p["requests"] for p in fused if p is not top),
+                   "tokens_in": sum(p["tokens_in"] - p["prefix_tokens"] for p in fused if p is not top)},
+    }
+    return {"audits": plans, "models": list(models.values()), "requests": requests,
+            "wall_s": round(wall, 1), "savings": savings, "notes": notes, "tokenizer": tokenizer_name()}
+
+
+def _table(rows: List[dict], cols: List[str]) -> List[str]:
+    cells = [["-" if r.get(c) is None else f"{r[c]:,}" if isinstance(r[c], int) else str(r[c]) for c in cols]
+             for r in rows]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(cols)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(cols, widths)), "  ".join("-" * w for w in widths)]
+    return lines + ["  ".join(v.ljust(w) for v, w in zip(row, widths)) for row in cells]
+
+
+def _duration(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    minutes, secs = divmod(round(seconds), 60)
+    if minutes < 60:
+        return f"{minutes}m {secs:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
+
+
+def format_estimate(est: dict, args) -> str:
+    lines = ["=== DRY RUN: Estimate ==="]
+    lines += _table(est["audits"], ["audit", "model", "targets", "requests", "tokens_in", "tokens_out",
+                                    "tokens_out_max"])
+    lines.append("")
+    money = [{**r, "cost": None if r["cost"] is None else f"${r['cost']:.4f}",
+              "cost_max": None if r["cost_max"] is None else f"${r['cost_max']:.4f}"} for r in est["models"]]
+    lines += _table(money, ["model", "requests", "tokens_in", "tokens_out", "cost", "cost_max", "latency_s",
+                            "wall_s"])
+    lines.append("")
+    lines.append(f"Wall time: ~{_duration(est['wall_s'])} for {est['requests']:,} requests at --rate {args.rate:g} "
+                 f"and --concurrency {args.concurrency}")
+    s = est["savings"]
+    lines.append("Savings:")
+    lines.append(f"  --resume: {s['resume']['requests']:,} requests already in the checkpoint "
+                 f"(~{s['resume']['tokens_in']:,} input tokens)")
+    if s["symbol_table"]["requests"]:
+        lines.append(f"  symbol table: {s['symbol_table']['requests']:,} symbolic targets already known "
+                     f"(not counted above)")
+    lines.append(f"  prefilters: {s['prefilter']['targets']:,} targets dropped locally "
+                 f"(~{s['prefilter']['tokens_in']:,} input tokens, not counted above)")
+    lines.append(f"  cache: {s['duplicates']['requests']:,} duplicate prompts (answered from the reply cache "
+                 f"by `eqnlint serve`)")
+    fusion = s.get("fusion")
+    if fusion and fusion["audits"]:
+        lines.append(f"  --fuse {','.join(fusion['audits'])}: {fusion['requests']:,} fewer requests, "
+                     f"~{fusion['tokens_in']:,} fewer input tokens of repeated equations and context "
+                     f"(counted unfused above)")
+    lines += [f"Note: {n}" for n in est["notes"]]
+    if any(p["triage"] for p in est["audits"]):
+        lines.append("Note: every target is counted as escalated; `eqnlint calibrate` shows the real share.")
+    lines.append(f"Tokens counted with {est['tokenizer']}; output uses the mean example reply (max: the reply "
+                 f"budget). Prices are list prices per 1M tokens; check your provider.")
+    return "\n".join(lines)
+
+
+def dry_run_estimate(plans: List[dict], args) -> dict:
+    """estimate() with observed latencies from --db when that database exists."""
+    import os
+
+    store = None
+    if getattr(args, "db", None) and os.path.exists(args.db):
+        from ._store import ResultStore
+        store = ResultStore(args.db)
+    try:
+        return estimate(plans, args, store)
+    finally:
+        if store is not None:
+            store.close()
@@ -1,5 +1,7 @@
 # lib/_extract.py
 import re
+from bisect import bisect_right
+from itertools import accumulate
 
 EQN_ENV = r"(\\begin\{equation\*?\}.*?\\end\{equation\*?\})"
 EQN_DSP = r"(\\\[.*?\\\])"
@@ -14,7 +16,8 @@ def extract_equations_with_context(tex):
         cstart = 0 if cstart==-1 else cstart
         cend = tex.find("\n\n", end)
         cend = len(tex) if cend==-1 else cend
-        out.append({"equation": m.group().strip(), "context": tex[cstart:cend].strip()})
+        out.append({"equation": m.group().strip(), "context": tex[cstart:cend].strip(),
+                    "start": start, "end": end})
     return out
 
 def extract_citations_with_context(tex):
@@ -24,5 +27,290 @@ def extract_citations_with_context(tex):
         start,end = m.span()
         cstart = tex.rfind("\n\n", 0, start); cstart = 0 if cstart==-1 else cstart
         cend = tex.find("\n\n", end); cend = len(tex) if cend==-1 else cend
-        out.append({"citation": m.group().strip(), "context": tex[cstart:cend].strip()})
-    return out
\ No newline at end of file
+        out.append({"citation": m.group().strip(), "context": tex[cstart:cend].strip(),
+                    "start": start, "end": end})
+    return out
+
+class Document:
+    """
+    Source text plus memoized target extraction.
+
+    Audits that look at the same kind of target (e.g. units, dimensional,
+    opacity and symbolic all use equations) share one extraction per run.
+    Shared target lists must be treated as read-only.
+    """
+    def __init__(self, text, path=None, targets=None):
+        self.text = text
+        self.path = path
+        self._targets = dict(targets or {})  # kind -> targets, e.g. prepared in a worker process
+
+    def targets(self, kind, extractor):
+        if kind not in self._targets:
+            self._targets[kind] = extractor(self.text)
+        return self._targets[kind]
+
+
+# Paragraph boundaries. Every extractor takes its context from the enclosing
+# paragraph, so extracting block by block gives the same targets as
+# extracting the whole text as long as no block boundary falls inside a
+# target. A blank line therefore only ends a block outside the equations
+# ALL_EQN matches (`\\[1ex]` in an align opens a `\[` for it too) and
+# outside math environments; after an opener that finds no closer the block
+# runs on to the end of the text, where a later closer may still be.
+_BLOCK_END = re.compile(r"\n\n")
+_MATH_ENV = r"(?:equation|align|alignat|flalign|gather|multline|eqnarray|displaymath|math)\*?"
+_ENV = re.compile(r"\\begin\{(%s)\}.*?\\end\{\1\}" % _MATH_ENV, re.DOTALL)
+_EQN_OPENER = re.compile(r"\\\[|\$|\\begin\{equation\*?\}")
+_ENV_OPENER = re.compile(r"\\begin\{%s\}" % _MATH_ENV)
+
+def _merged(spans):
+    out = []
+    for a, b in sorted(spans):
+        if out and a < out[-1][1]:
+            out[-1][1] = max(out[-1][1], b)
+        else:
+            out.append([a, b])
+    return out
+
+def _inside(spans, starts, k):
+    i = bisect_right(starts, k) - 1
+    return i >= 0 and k < spans[i][1]
+
+def _split_blocks(text):
+    """
+    Cut `text` into blocks at safe blank lines. Returns (blocks, open), with
+    open set when the last block holds an opener without a closer.
+    """
+    spans = []
+    # An opener is loose when the scan that would start a match there
+    # (ALL_EQN or _ENV, each skipping over its own matches) finds no closer.
+    loose = len(text)
+    for pattern, opener in ((ALL_EQN, _EQN_OPENER), (_ENV, _ENV_OPENER)):
+        matched = [m.span() for m in pattern.finditer(text)]
+        starts = [a for a, _ in matched]
+        loose = min([loose] + [m.start() for m in opener.finditer(text)
+                               if not _inside(matched, starts, m.start())])
+        spans.extend(matched)
+    spans = _merged(spans)
+    starts = [a for a, _ in spans]
+    out, pos = [], 0
+    for m in _BLOCK_END.finditer(text):
+        if m.start() > loose:
+            break
+        if not _inside(spans, starts, m.start()):
+            out.append(text[pos:m.end()])
+            pos = m.end()
+    if pos < len(text) or not out:
+        out.append(text[pos:])
+    return out, loose < len(text)
+
+class _Block:
+    __slots__ = ("text", "newlines", "targets", "keys")
+
+    def __init__(self, text):
+        self.text = text
+        self.newlines = text.count("\n")
+        self.targets = {}  # kind -> targets with block-relative spans
+        self.keys = {}     # kind -> key of each target, see keyed()
+
+def _utf16_len(s):
+    return len(s.encode("utf-16-le")) // 2
+
+class IncrementalDocument(Document):
+    """
+    A Document that is edited in place (e.g. by an editor) and re-extracts
+    only the paragraphs an edit touched.
+
+    The text is kept as paragraph blocks, each with its own memoized targets
+    and keys. `apply_change` re-splits the touched blocks plus one neighbour
+    on each side (more after an unclosed opener), keeps every block whose
+    text is unchanged, and reports which blocks it replaced, so the work per
+    edit follows the size of the edit, not of the document. Block offsets
+    after an edit are brought up to date only when something reads them.
+
+    `keyed` gives one block's targets with block-relative spans; `absolute`
+    places one of them in the text. `targets` (the Document interface) makes
+    every span absolute and is meant for whole-document runs. Positions are
+    LSP-style (0-based line, UTF-16 column).
+    """
+    def __init__(self, text, path=None):
+        self.path = path
+        self._blocks = []
+        self.set_text(text)
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = "".join(b.text for b in self._blocks)
+        return self._text
+
+    @property
+    def blocks(self):
+        """The paragraph blocks in document order (read-only)."""
+        return self._blocks
+
+    def __len__(self):
+        return self._length
+
+    def _ensure(self, i):
+        # Offsets of the blocks after the last edit are stale until read.
+        v = self._valid
+        if i < v:
+            return
+        start = self._starts[v - 1] + self._lengths[v - 1] if v else 0
+        line = self._lines[v - 1] + self._newlines[v - 1] if v else 0
+        n = len(self._blocks)
+        self._starts[v:] = accumulate(self._lengths[v:n - 1], initial=start)
+        self._lines[v:] = accumulate(self._newlines[v:n - 1], initial=line)
+        self._valid = n
+
+    def targets(self, kind, extractor):
+        if kind not in self._targets:
+            self._ensure(len(self._blocks) - 1)
+            out = []
+            for b, offset, line in zip(self._blocks, self._starts, self._lines):
+                if kind not in b.targets:
+                    b.targets[kind] = extractor(b.text)
+                for t in b.targets[kind]:
+                    t = dict(t)
+                    if "start" in t:
+                        t["start"] += offset
+                        t["end"] += offset
+                    if "line" in t:
+                        t["line"] += line
+                    out.append(t)
+            self._targets[kind] = out
+        return self._targets[kind]
+
+    def keyed(self, block, kind, extractor, key):
+        """
+        [(key(target), target)] for one block's targets of `kind`, with
+        block-relative spans. Targets and keys are memoized per block, so
+        only blocks new since the last call are extracted and hashed. `key`
+        must ignore positions ("start", "end", "line").
+        """
+        if kind not in block.targets:
+            block.targets[kind] = extractor(block.text)
+        if kind not in block.keys:
+            block.keys[kind] = [key(t) for t in block.targets[kind]]
+        return list(zip(block.keys[kind], block.targets[kind]))
+
+    def block_start(self, block):
+        """Offset of a current block in the text."""
+        if self._index is None:
+            self._index = dict(zip(self._blocks, range(len(self._blocks))))
+        i = self._index[block]
+        self._ensure(i)
+        return self._starts[i]
+
+    def absolute(self, block, target):
+        """(start, end) offsets in the text of a target from `keyed`."""
+        offset = self.block_start(block)
+        return target["start"] + offset, target["end"] + offset
+
+    # ---- edits ----------------------------------------------------------
+
+    def set_text(self, text):
+        """Replace the whole text. Returns (removed, added) blocks, as apply_change does."""
+        removed = self._blocks
+        self._blocks = [_Block(t) for t in _split_blocks(text)[0]]
+        self._lengths = [len(b.text) for b in self._blocks]
+        self._newlines = [b.newlines for b in self._blocks]
+        self._starts = [0] * len(self._blocks)
+        self._lines = [0] * len(self._blocks)
+        self._valid = 0
+        self._length = len(text)
+        self._index = None
+        self._text = None
+        self._targets = {}
+        return removed, list(self._blocks)
+
+    def apply_change(self, start, end, new_text):
+        """
+        Replace text[start:end] (character offsets) with `new_text`. Returns
+        (removed, added): the blocks that left the document and the new ones
+        in their place. Blocks whose text did not change stay, with their
+        targets and keys.
+        """
+        start = max(0, min(start, self._length))
+        end = max(start, min(end, self._length))
+        first = max(0, self._block_at(start) - 1)
+        last = min(len(self._blocks) - 1, self._block_at(end) + 1)
+        lo, line = self._starts[first], self._lines[first]
+        region = "".join(b.text for b in self._blocks[first:last + 1])
+        region = region[:start - lo] + new_text + region[end - lo:]
+        texts, opened = _split_blocks(region)
+        while opened and last + 1 < len(self._blocks):
+            # An opener without its closer: take in the next block and re-split.
+            last += 1
+            region += self._blocks[last].text
+            texts, opened = _split_blocks(region)
+        old = self._blocks[first:last + 1]
+        reuse = {}
+        for b in old:
+            reuse.setdefault(b.text, []).append(b)
+        blocks = [reuse[t].pop(0) if reuse.get(t) else _Block(t) for t in texts]
+        kept, before = set(blocks), set(old)
+        removed = [b for b in old if b not in kept]
+        added = [b for b in blocks if b not in before]
+
+        lengths = [len(b.text) for b in blocks]
+        newlines = [b.newlines for b in blocks]
+        self._blocks[first:last + 1] = blocks
+        self._lengths[first:last + 1] = lengths
+        self._newlines[first:last + 1] = newlines
+        self._starts[first:last + 1] = accumulate(lengths[:-1], initial=lo)
+        self._lines[first:last + 1] = accumulate(newlines[:-1], initial=line)
+        self._valid = first + len(blocks)
+        self._length += len(new_text) - (end - start)
+        if self._index is not None and len(blocks) == len(old):
+            for b in removed:
+                del self._index[b]
+            for i, b in enumerate(blocks, first):
+                self._index[b] = i
+        else:
+            self._index = None
+        self._text = None
+        self._targets = {}
+        return removed, added
+
+    def _block_at(self, offset):
+        v = self._valid
+        if not v or offset >= self._starts[v - 1] + self._lengths[v - 1]:
+            self._ensure(len(self._blocks) - 1)
+            v = self._valid
+        return max(0, bisect_right(self._starts, offset, 0, v) - 1)
+
+    def _block_at_line(self, line):
+        v = self._valid
+        if not v or line >= self._lines[v - 1] + self._newlines[v - 1]:
+            self._ensure(len(self._blocks) - 1)
+            v = self._valid
+        return max(0, bisect_right(self._lines, line, 0, v) - 1)
+
+    # ---- LSP positions --------------------------------------------------
+
+    def position(self, offset):
+        """Character offset -> (line, UTF-16 column)."""
+        i = self._block_at(offset)
+        text = self._blocks[i].text[:offset - self._starts[i]]
+        bol = text.rfind("\n") + 1  # blocks always begin at a line start
+        return self._lines[i] + text.count("\n"), _utf16_len(text[bol:])
+
+    def offset(self, line, character):
+        """(line, UTF-16 column) -> character offset, clamped to the text."""
+        i = self._block_at_line(line)
+        text = self._blocks[i].text
+        pos = 0
+        for _ in range(line - self._lines[i]):
+            nl = text.find("\n", pos)
+            if nl == -1:
+                return self._length
+            pos = nl + 1
+        units = 0
+        for j in range(pos, len(text)):
+            ch = text[j]
+            if ch == "\n" or units >= character:
+                return self._starts[i] + j
+            units += 2 if ord(ch) > 0xFFFF else 1
+        return self._starts[i] + len(text)
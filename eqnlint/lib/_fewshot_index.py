@@ -0,0 +1,159 @@
+# eqnlint/lib/_fewshot_index.py
+import json
+import math
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from ._estimate import count_tokens, MESSAGE_OVERHEAD
+
+NGRAM = 3  # character n-grams: robust to LaTeX macros and subscripts
+NUMPY_MIN = 64  # below this many examples the pure-Python scorer is faster than importing NumPy
+
+
+def _grams(text: str) -> Counter:
+    t = " ".join(text.lower().split())
+    return Counter(t[i:i + NGRAM] for i in range(max(0, len(t) - NGRAM + 1)))
+
+
+def split_examples(few_shots: List[dict]) -> Tuple[List[dict], List[List[dict]]]:
+    """
+    (preamble, examples): leading system messages, then one message list per
+    example, a user message with the assistant answer(s) that follow it.
+    """
+    preamble, examples = [], []
+    for msg in few_shots:
+        if msg.get("role") == "user":
+            examples.append([msg])
+        elif examples:
+            examples[-1].append(msg)
+        else:
+            preamble.append(msg)
+    return preamble, examples
+
+
+def _question(example: List[dict]) -> str:
+    # What the example asks, without its inline answer ('...\nOutput:\n✅ ...').
+    return example[0].get("content", "").rpartition("\nOutput:\n")[0] or example[0].get("content", "")
+
+
+class FewShotIndex:
+    """
+    Picks the few-shot examples closest to each target instead of sending
+    the whole pool with every request.
+
+    Examples are indexed as TF-IDF vectors over character trigrams the
+    first time a target needs ranking, so runs that never rank (a pool no
+    larger than `k`) pay nothing. Pools of NUMPY_MIN examples or more use a
+    NumPy matrix when NumPy is installed (the `fast` extra); smaller pools,
+    and `pure=True` (--dry-run, which must not import NumPy), use sparse
+    dicts. select() ranks the examples by cosine similarity to the target
+    prompt and keeps the top `k` that fit in `budget` tokens. Message lists
+    are built once per distinct selection and the same list object is
+    returned every time it is picked again, so requests that share a
+    selection share a prefix.
+    """
+
+    def __init__(self, few_shots: List[dict], k: int = 3, budget: int = None, pure: bool = False):
+        self.few_shots = few_shots
+        self.preamble, self.examples = split_examples(few_shots)
+        self.k = k
+        self.budget = budget
+        self.pure = pure
+        self.sizes = [sum(count_tokens(m.get("content", "")) + MESSAGE_OVERHEAD for m in ex) for ex in self.examples]
+        self._lists: Dict[Tuple[int, ...], List[dict]] = {}
+        self._built = False
+        self._np = None
+
+    def _build(self) -> None:
+        self._built = True
+        docs = [_grams(_question(ex)) for ex in self.examples]
+        df = Counter(g for d in docs for g in d)
+        n = len(docs)
+        self.vocab = {g: i for i, g in enumerate(df)}
+        self.idf = {g: math.log((1 + n) / (1 + c)) + 1.0 for g, c in df.items()}
+        np = None
+        if not self.pure and n >= NUMPY_MIN:
+            try:
+                import numpy as np
+            except ImportError:
+                pass
+        if np is None:
+            self._rows = [self._unit({g: c * self.idf[g] for g, c in d.items()}) for d in docs]
+            return
+        self._np = np
+        self._idf = np.array([self.idf[g] for g in self.vocab], dtype=np.float32)
+        matrix = np.zeros((n, len(self.vocab)), dtype=np.float32)
+        for row, d in enumerate(docs):
+            for g, c in d.items():
+                matrix[row, self.vocab[g]] = c
+        matrix *= self._idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self._matrix = matrix / np.where(norms == 0, 1.0, norms)
+
+    @staticmethod
+    def _unit(vec: Dict[str, float]) -> Dict[str, float]:
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        return {g: v / norm for g, v in vec.items()}
+
+    def scores(self, text: str) -> List[float]:
+        """Cosine similarity of `text` to every example, in pool order."""
+        if not self._built:
+            self._build()
+        grams = _grams(text)
+        if self._np is not None:
+            np = self._np
+            q = np.zeros(len(self.vocab), dtype=np.float32)
+            for g, c in grams.items():
+                i = self.vocab.get(g)
+                if i is not None:
+                    q[i] = c
+            q *= self._idf
+            norm = float(np.linalg.norm(q)) or 1.0
+            return (self._matrix @ (q / norm)).tolist()
+        q = self._unit({g: c * self.idf[g] for g, c in grams.items() if g in self.idf})
+        return [sum(w * q.get(g, 0.0) for g, w in row.items()) for row in self._rows]
+
+    def select(self, text: str) -> List[dict]:
+        """Preamble plus the chosen examples, in pool order."""
+        if len(self.examples) <= self.k and (self.budget is None or sum(self.sizes) <= self.budget):
+            return self.few_shots
+        scores = self.scores(text)
+        chosen, used = [], 0
+        for i in sorted(range(len(scores)), key=lambda i: (-scores[i], i)):
+            if len(chosen) == self.k:
+                break
+            if self.budget is not None and chosen and used + self.sizes[i] > self.budget:
+                continue
+            chosen.append(i)
+            used += self.sizes[i]
+        key = tuple(sorted(chosen))
+        messages = self._lists.get(key)
+        if messages is None:
+            messages = self._lists[key] = self.preamble + [m for i in key for m in self.examples[i]]
+        return messages
+
+
+@lru_cache(maxsize=None)
+def _load_pool(path: str) -> Tuple[Tuple[str, str, str], ...]:
+    with open(path, "r", encoding="utf-8") as fh:
+        text = fh.read()
+    try:
+        entries = json.loads(text)
+    except ValueError:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if isinstance(entries, dict):
+        entries = [entries]
+    return tuple((e["audit"], e["user"], e["assistant"]) for e in entries)
+
+
+def pool_examples(path: str, audit: str) -> List[dict]:
+    """
+    Extra examples for `audit` from a --few-shot-pool file: a JSON list or
+    JSON lines of {"audit": "units", "user": "...", "assistant": "✅ CONSISTENT: ..."}.
+    """
+    out = []
+    for name, user, assistant in _load_pool(path):
+        if name == audit:
+            out += [{"role": "user", "content": user}, {"role": "assistant", "content": assistant}]
+    return out
@@ -40,6 +40,20 @@ class FewShotLibrary:
   \"E\": \"energy (J)\",
   \"m\": \"mass (kg)\",
   \"c\": \"speed of light (m/s)\"
+}"""},
+            {"role": "user", "content": "Build a symbol dictionary for: \\nabla \\cdot \\mathbf{E} = \\rho / \\varepsilon_0"},
+            {"role": "assistant", "content": """{
+  \"\\\\mathbf{E}\": \"electric field (V/m)\",
+  \"\\\\rho\": \"charge density (C/m^3)\",
+  \"\\\\varepsilon_0\": \"vacuum permittivity (F/m)\"
+}"""},
+            {"role": "user", "content": "Build a symbol dictionary for: PV = nRT"},
+            {"role": "assistant", "content": """{
+  \"P\": \"pressure (Pa)\",
+  \"V\": \"volume (m^3)\",
+  \"n\": \"amount of substance (mol)\",
+  \"R\": \"gas constant (J/(mol·K))\",
+  \"T\": \"temperature (K)\"
 }"""},
         ]
 
@@ -53,6 +67,23 @@ class FewShotLibrary:
   \"c\": \"speed of light (m/s)\"
 }"""},
             {"role": "assistant", "content": "✅ CONSISTENT: [J] = [kg][m/s]^2 is dimensionally valid."},
+            {"role": "user", "content": """Check: v = x + t\nSymbols:\n{
+  \"v\": \"velocity (m/s)\",
+  \"x\": \"position (m)\",
+  \"t\": \"time (s)\"
+}"""},
+            {"role": "assistant", "content": "❌ INCONSISTENT: x [m] and t [s] cannot be added, and neither matches v [m/s]."},
+            {"role": "user", "content": """Check: R_{\\mu\\nu} - \\frac{1}{2} R g_{\\mu\\nu} = \\frac{8\\pi G}{c^4} T_{\\mu\\nu}\nSymbols:\n{
+  \"R_{\\\\mu\\\\nu}\": \"Ricci curvature (m^-2)\",
+  \"T_{\\\\mu\\\\nu}\": \"stress-energy tensor (J/m^3)\",
+  \"G\": \"gravitational constant (m^3 kg^-1 s^-2)\"
+}"""},
+            {"role": "assistant", "content": "✅ CONSISTENT: curvature ~ m^-2 on the left; G/c^4 [s^2 kg^-1 m^-1] times [J/m^3] gives m^-2 on the right."},
+            {"role": "user", "content": """Check: \\psi(x) = A e^{k x}\nSymbols:\n{
+  \"k\": \"wavenumber (1/m)\",
+  \"x\": \"position (m)\"
+}"""},
+            {"role": "assistant", "content": "✅ CONSISTENT: the exponent kx is dimensionless, as an exponent must be."},
         ]
 
     @staticmethod
@@ -75,6 +106,14 @@ Context: g = 32 ft/s^2
 Context: E in eV, h in J·s, c in m/s, λ in nm.
 """}, 
             {"role": "assistant", "content": "⚠️ MIXED UNITS: Energy is in eV and wavelength in nm, while Planck’s constant uses SI units. Consider converting to consistent units."},
+            {"role": "user", "content": """Check the units in: p = \\rho g h
+Context: \\rho in g/cm^3, h in m, p in Pa.
+"""},
+            {"role": "assistant", "content": "⚠️ MIXED UNITS: density is in g/cm^3 (CGS) while h and p are SI; use kg/m^3 to get Pa directly."},
+            {"role": "user", "content": """Check the units in: Q = m c \\Delta T
+Context: m in kg, c in J/(kg·K), \\Delta T in K, Q in J.
+"""},
+            {"role": "assistant", "content": "✅ CONSISTENT: kg · J/(kg·K) · K = J, all SI."},
    ]
 
     @staticmethod
@@ -202,6 +241,25 @@ Special relativity: m is mass, c is speed of light, E is energy.
 
 Output:
 ✅ ALL SYMBOLS DEFINED: No undefined symbols found in nearby text."""},
+            {"role": "user", "content": """Check this equation:
+\\begin{equation}
+\\mathcal{L}_{\\mathrm{eff}} = \\mathcal{L}_0 + \\lambda \\mathcal{O}_6
+\\end{equation}
+Context:
+We add the leading correction to the SM Lagrangian.
+
+Output:
+⚠️ UNCLEAR NOTATION: \\mathcal{O}_6 and \\lambda are not introduced, and the acronym SM is not expanded.
+Undefined: \\mathcal{O}_6, \\lambda, SM"""},
+            {"role": "user", "content": """Check this equation:
+\\begin{equation}
+\\tau = r \\times F
+\\end{equation}
+Context:
+The torque \\tau is the cross product of the lever arm r and the applied force F.
+
+Output:
+✅ ALL SYMBOLS DEFINED: \\tau, r and F are all defined in the sentence."""},
         ]
 
     @staticmethod
@@ -212,6 +270,10 @@ Output:
         {"role":"assistant","content":"⚠️ NEEDS EDIT: Redundant hedging.\nRewrite: These results are novel and show that ..."},
         {"role":"user","content":"Text:\nWe define S(x) as local entropy density and use it consistently hereafter.\nTask: Suggest a concise rewrite starting with a one-line verdict."},
         {"role":"assistant","content":"✅ CLEAR: No change needed."},
+        {"role":"user","content":"Text:\nIt is shown, by means of the application of the method that was described in the previous section, that the error is reduced by it.\nTask: Suggest a concise rewrite starting with a one-line verdict."},
+        {"role":"assistant","content":"⚠️ NEEDS EDIT: Passive, wordy construction.\nRewrite: Applying the method of the previous section reduces the error."},
+        {"role":"user","content":"Text:\nThis, which as before, and the latter of which, yields it where needed as such.\nTask: Suggest a concise rewrite starting with a one-line verdict."},
+        {"role":"assistant","content":"❌ UNCLEAR: The referents of 'this', 'the latter' and 'it' cannot be recovered from the sentence.\nRewrite: None possible without the surrounding text; name each quantity explicitly."},
     ]
 
 few_shot_context = [
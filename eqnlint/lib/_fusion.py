@@ -0,0 +1,198 @@
+# eqnlint/lib/_fusion.py
+import asyncio
+from typing import Dict, List, Optional
+
+from ._schema import parse_structured, schema_instructions, validate
+from ._symbols import target_key
+from ._verdict import Verdict, parse_verdict
+
+FUSED_SYSTEM = ("You run several independent checks on one LaTeX equation and answer all of them in a single "
+                "JSON object with one section per check. Judge each check on its own terms; a problem found "
+                "by one check is not a reason to fail another.")
+
+
+def fusable(cls) -> bool:
+    """Whether an audit class can share a fused request: equation targets and a fused_task."""
+    return cls.target_kind == "equations" and cls.fused_task is not None
+
+
+def fused_audits(spec, audits: dict) -> List[str]:
+    """
+    Validate a --fuse value against the selected audit classes and return
+    the names to fuse. "all" (bare --fuse) means every selected audit that
+    can be fused; audits that opted out simply keep their own requests.
+    """
+    if spec in (None, "", "all"):
+        names = [n for n, cls in audits.items() if fusable(cls)]
+    else:
+        names = [n.strip().removesuffix("_audit") for n in spec.split(",") if n.strip()]
+        unknown = [n for n in names if n not in audits]
+        if unknown:
+            raise SystemExit(f"--fuse names audit(s) not selected: {', '.join(unknown)}")
+        opted_out = [n for n in names if not fusable(audits[n])]
+        if opted_out:
+            raise SystemExit(f"Cannot fuse {', '.join(opted_out)}: only equation audits with a fused task can")
+    return names
+
+
+class Fusion:
+    """
+    One request per target for several equation audits (--fuse).
+
+    Each fused audit still runs its own state machine, checkpoint and
+    report; its `_dispatch` hands the target here instead of asking the
+    model. Once every fused audit has either submitted a target or passed
+    on it (checkpoint hit, cached symbols, audit finished or failed), the
+    target goes out as one request: the equation and context once, one
+    schema section per audit. The reply is split back into per-audit
+    results, each validated against that audit's own schema and rendered
+    by its own `_render`, so reports and JSON look as if each audit had
+    asked alone.
+    """
+
+    def __init__(self, machines: List):
+        self.machines: Dict[str, object] = {m.audit_name: m for m in machines}
+        self.active = set(self.machines)
+        # Targets are the document's shared, read-only lists (Document.targets),
+        # so every audit hands over the same object for the same target.
+        self.groups: Dict[int, Dict[str, tuple]] = {}  # id(target) -> audit -> (target, future)
+        self.passed: Dict[int, set] = {}  # id(target) -> audits that will not submit it
+        self.tasks = set()
+        self._prompts: Dict[tuple, tuple] = {}  # audit names -> (system, schema)
+
+    async def ask(self, machine, eq: dict) -> dict:
+        """What `machine` would have got from `_ask` for `eq`, answered by a shared request."""
+        if machine.uses_symbols and "symbolic" not in self.machines:
+            # The symbol table is filled by a separate symbolic audit; wait as usual.
+            await machine._symbol_table().ready(target_key(eq))
+        future = asyncio.get_running_loop().create_future()
+        self.groups.setdefault(id(eq), {})[machine.audit_name] = (eq, future)
+        self._maybe_send(id(eq))
+        return await future
+
+    def skip(self, machine, eq: dict) -> None:
+        """`machine` has its answer for `eq` already (checkpoint, symbol table)."""
+        self.passed.setdefault(id(eq), set()).add(machine.audit_name)
+        self._maybe_send(id(eq))
+
+    def leave(self, machine) -> None:
+        """`machine` submits nothing more (finished, failed or cancelled)."""
+        self.active.discard(machine.audit_name)
+        for key in list(self.groups):
+            self._maybe_send(key)
+
+    def _maybe_send(self, key: int) -> None:
+        group = self.groups.get(key)
+        if not group or self.active - self.passed.get(key, set()) - set(group):
+            return
+        del self.groups[key]
+        self.passed.pop(key, None)
+        task = asyncio.ensure_future(self._send(group))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def _prompts_for(self, names: tuple) -> tuple:
+        """(system prompt, schema) for one combination of audits; stable, so the prefix caches."""
+        if names not in self._prompts:
+            sections, props = [], {}
+            for name in names:
+                m = self.machines[name]
+                props[name] = m.response_schema
+                sections.append(f"## {name}\n{m.fused_task}{self._example(m)}")
+            schema = {"type": "object", "properties": props, "required": list(names), "additionalProperties": False}
+            system = f"{FUSED_SYSTEM}\n\n" + "\n\n".join(sections) + f"\n\n{schema_instructions(schema)}"
+            self._prompts[names] = (system, schema)
+        return self._prompts[names]
+
+    @staticmethod
+    def _example(m) -> str:
+        # The audits' few-shots are whole conversations in their own format;
+        # one question/answer pair per section keeps the reply format anchored.
+        shots = m.few_shots
+        for q, a in zip(shots, shots[1:]):
+            if q.get("role") == "user" and a.get("role") == "assistant":
+                return f"\nExample:\n{q['content'].strip()}\nSection: {a['content'].strip()}"
+        return ""
+
+    def _user_prompt(self, eq: dict, machines: list) -> str:
+        prompt = f"Equation:\n{eq['equation']}\nContext:\n{eq['context']}\n"
+        if any(m.uses_symbols for m in machines):
+            prompt += machines[0]._symbol_hint(eq, label="Likely meanings (inferred, may be undefined in the text)")
+        return prompt
+
+    async def _send(self, group: Dict[str, tuple]) -> None:
+        names = tuple(n for n in self.machines if n in group)
+        machines = [self.machines[n] for n in names]
+        eq = group[names[0]][0]
+        try:
+            system, schema = self._prompts_for(names)
+            lead = machines[0]
+            budgets = [m._reply_budget() for m in machines]
+            reply, _, _, meta = await lead._complete(
+                lead._escalation_client(), system, [], self._user_prompt(eq, machines), schema,
+                sum(budgets) if all(budgets) else None)
+        except asyncio.CancelledError:
+            for _, future in group.values():
+                future.cancel()
+            raise
+        except Exception as ex:  # BudgetExhausted: every audit marks the target pending
+            for _, future in group.values():
+                if not future.done():
+                    future.set_exception(ex)
+            return
+        for name, m in zip(names, machines):
+            future = group[name][1]
+            if not future.done():
+                future.set_result(self._section(m, reply, meta, len(names)))
+
+    @staticmethod
+    def _section(m, reply: str, meta: dict, n: int) -> dict:
+        """One audit's share of the fused reply, shaped like its own `_ask` result."""
+        out = {}
+        if meta:
+            out["meta"] = {**meta, "fused": n}
+            for k in ("tokens_in", "tokens_out"):
+                if isinstance(meta.get(k), int):
+                    out["meta"][k] = meta[k] // n  # each audit carries its share of the request
+        if parse_verdict(reply) is Verdict.ERROR:
+            out["notes"] = reply
+            return out
+        whole, errors = parse_structured(reply, {"type": "object"})
+        obj = whole.get(m.audit_name) if whole is not None else None
+        if whole is not None:
+            errors = validate(obj, m.response_schema, f"$.{m.audit_name}") if obj is not None \
+                else [f"$: missing {m.audit_name!r}"]
+        if errors:
+            # An error verdict, so --resume asks again instead of keeping it.
+            out["notes"] = f"[ERROR] reply does not match the {m.audit_name} schema: {errors[0]}"
+            out["schema_errors"] = errors
+            out["raw"] = reply
+        else:
+            out["notes"] = m._render(obj)
+            out["structured"] = obj
+        return out
+
+
+def fusion_for(args, machines: Dict[str, object], log=None) -> Optional[Fusion]:
+    """The Fusion for a run's --fuse, or None when fusion is off or not possible."""
+    spec = getattr(args, "fuse", None)
+    if spec is None or args.dry_run:
+        return None
+    reason = ("--free-text" if getattr(args, "free_text", False) else
+              "--triage-model" if getattr(args, "triage_model", None) else
+              "--pipeline" if getattr(args, "pipeline", None) else None)
+    if reason:
+        if log:
+            log.warning(f"--fuse is ignored with {reason}; every audit sends its own requests")
+        return None
+    names = fused_audits(spec, {n: type(m) for n, m in machines.items()})
+    if len(names) < 2:
+        if log:
+            log.info("--fuse: fewer than two audits to fuse; every audit sends its own requests")
+        return None
+    fusion = Fusion([machines[n] for n in names])
+    for name in names:
+        machines[name].fusion = fusion
+    if log:
+        log.info(f"Fusing {', '.join(names)}: one request per equation")
+    return fusion
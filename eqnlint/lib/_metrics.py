@@ -0,0 +1,278 @@
+# eqnlint/lib/_metrics.py
+import os
+import time
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+# Request and wait durations, in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _labels(names: Sequence[str], values: Tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, registry, name: str, help: str, labels: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self._series: Dict[Tuple, object] = {}
+
+    def _get(self, values: Tuple, factory):
+        series = self._series.get(values)
+        if series is None:
+            with self.registry.lock:  # the exporter thread iterates _series
+                series = self._series.setdefault(values, factory())
+        return series
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        with self.registry.lock:
+            items = list(self._series.items())
+        for values, series in items:
+            yield from self._render_series(values, series)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        if self.registry.enabled:
+            cell = self._get(labels, lambda: [0.0])
+            cell[0] += amount
+
+    def _render_series(self, values, cell):
+        yield f"{self.name}{_labels(self.labelnames, values)} {_num(cell[0])}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels) -> None:
+        if self.registry.enabled:
+            self._get(labels, lambda: [0.0])[0] = value
+
+    def dec(self, *labels, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels) -> None:
+        if not self.registry.enabled or value is None:
+            return
+        cell = self._get(labels, lambda: [[0] * len(self.buckets), 0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                cell[0][i] += 1
+                break
+        cell[1] += value
+        cell[2] += 1
+
+    def _render_series(self, values, cell):
+        counts, total, n = cell
+        running = 0
+        for bound, c in zip(self.buckets, counts):
+            running += c
+            yield f"{self.name}_bucket{_labels(self.labelnames + ('le',), values + (_num(bound),))} {running}"
+        yield f"{self.name}_bucket{_labels(self.labelnames + ('le',), values + ('+Inf',))} {n}"
+        yield f"{self.name}_sum{_labels(self.labelnames, values)} {_num(total)}"
+        yield f"{self.name}_count{_labels(self.labelnames, values)} {n}"
+
+
+class Registry:
+    """
+    Prometheus-style metrics of a run, off unless --metrics-port or
+    --metrics-file asks for them (updates are then a flag check).
+
+    Writers are the event loop (AIClient, the audit state machines, the
+    corpus runner); the only reader is the exporter thread, so a lock is
+    needed only where series are created and listed.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self._metrics = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()) -> Counter:
+        return self._add(Counter(self, name, help, labels))
+
+    def gauge(self, name, help, labels=()) -> Gauge:
+        return self._add(Gauge(self, name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(self, name, help, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = Registry()
+
+requests = metrics.counter("eqnlint_requests_total", "Model requests sent, by outcome (ok, error)",
+                           ("model", "outcome"))
+cache_hits = metrics.counter("eqnlint_cache_hits_total", "Replies served from the response cache", ("model",))
+retries = metrics.counter("eqnlint_retries_total", "HTTP attempts beyond the first within one request", ("model",))
+rate_limited = metrics.counter("eqnlint_rate_limited_total", "HTTP 429 responses received", ("model",))
+tokens = metrics.counter("eqnlint_tokens_total", "Tokens reported by the backend", ("model", "direction"))
+early_stops = metrics.counter("eqnlint_early_stops_total",
+                              "Replies cut off once the verdict (and reason) had arrived", ("model",))
+limiter_wait = metrics.histogram("eqnlint_limiter_wait_seconds",
+                                 "Time a request waited for a concurrency slot and the rate limiter", ("model",))
+request_seconds = metrics.histogram("eqnlint_request_seconds", "Network time per request", ("audit", "model"))
+ttfb_seconds = metrics.histogram("eqnlint_ttfb_seconds", "Time to first response byte", ("model",))
+targets_queued = metrics.gauge("eqnlint_targets_queued", "Targets of the current document not finished yet",
+                               ("audit",))
+targets_done = metrics.counter("eqnlint_targets_completed_total", "Targets finished", ("audit",))
+targets_skipped = metrics.counter("eqnlint_targets_skipped_total",
+                                  "Targets left unsent by --max-calls, --deadline or --fail-fast", ("audit",))
+verdicts = metrics.counter("eqnlint_verdicts_total", "Verdicts by audit", ("audit", "verdict"))
+papers = metrics.counter("eqnlint_papers_total", "Corpus papers finished, by status", ("status",))
+last_progress = metrics.gauge("eqnlint_last_progress_timestamp_seconds",
+                              "Unix time a target last finished (alert when it stops moving)")
+
+
+class _Exporter:
+    def __init__(self):
+        self.server = None
+        self.writer = None
+        self.stop = threading.Event()
+
+
+_exporter = _Exporter()
+
+
+def serve_http(port: int, host: str = "127.0.0.1"):
+    """Serve GET /metrics on host:port from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="eqnlint-metrics", daemon=True).start()
+    return server
+
+
+def write_textfile(path) -> None:
+    """Atomic write for node-exporter's textfile collector."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(metrics.render())
+    os.replace(tmp, path)
+
+
+def _write_every(path, interval: float) -> None:
+    while not _exporter.stop.wait(interval):
+        try:
+            write_textfile(path)
+        except OSError:
+            pass
+
+
+def configure(args) -> None:
+    """Start the exporters asked for with --metrics-port / --metrics-file."""
+    port = getattr(args, "metrics_port", None)
+    path = getattr(args, "metrics_file", None)
+    if port is None and not path:
+        return
+    metrics.enabled = True
+    if port is not None and _exporter.server is None:
+        _exporter.server = serve_http(port)
+    if path and _exporter.writer is None:
+        _exporter.writer = threading.Thread(target=_write_every, args=(path, args.metrics_interval),
+                                            name="eqnlint-metrics-file", daemon=True)
+        _exporter.writer.start()
+
+
+def finish(args) -> None:
+    """Final textfile write and exporter shutdown."""
+    if not metrics.enabled:
+        return
+    _exporter.stop.set()
+    path = getattr(args, "metrics_file", None)
+    if path:
+        write_textfile(path)
+    if _exporter.server is not None:
+        _exporter.server.shutdown()
+        _exporter.server = None
+
+
+def observe_request(model: str, audit: Optional[str], meta: dict, ok: bool, attempts: int = 1,
+                    status_429: int = 0) -> None:
+    """Record one finished AIClient request from its meta dict."""
+    if not metrics.enabled:
+        return
+    if meta.get("cached"):
+        cache_hits.inc(model)
+        return
+    requests.inc(model, "ok" if ok else "error")
+    if attempts > 1:
+        retries.inc(model, amount=attempts - 1)
+    if status_429:
+        rate_limited.inc(model, amount=status_429)
+    if meta.get("stopped_early"):
+        early_stops.inc(model)
+    for direction in ("in", "out"):
+        if meta.get(f"tokens_{direction}"):
+            tokens.inc(model, direction, amount=meta[f"tokens_{direction}"])
+    wait = (meta.get("queue_ms") or 0.0) + (meta.get("limiter_ms") or 0.0)
+    limiter_wait.observe(wait / 1000.0, model)
+    request_seconds.observe((meta.get("latency_ms") or 0.0) / 1000.0, audit or "-", model)
+    if meta.get("ttfb_ms") is not None:
+        ttfb_seconds.observe(meta["ttfb_ms"] / 1000.0, model)
+
+
+def observe_target(audit: str, verdict: Optional[str]) -> None:
+    """One target finished (verdict) or was skipped (None)."""
+    if not metrics.enabled:
+        return
+    targets_queued.dec(audit)
+    if verdict is None:
+        targets_skipped.inc(audit)
+        return
+    targets_done.inc(audit)
+    verdicts.inc(audit, verdict)
+    last_progress.set(time.time())
@@ -0,0 +1,63 @@
+# eqnlint/lib/_pipeline.py
+import asyncio
+from typing import Dict, List, Tuple
+
+_END = object()
+
+
+class Stream:
+    """
+    One-way, in-memory hand-off of per-target results between two pipeline
+    stages. The upstream stage puts (index, findings) as each target
+    finishes; the downstream stage iterates and starts on that target at
+    once, so consecutive stages overlap instead of running end to end.
+
+    `findings` maps audit name -> short summary of that audit's result for
+    the target and accumulates along the chain.
+    """
+
+    def __init__(self):
+        self._queue: "asyncio.Queue" = asyncio.Queue()
+        self.closed = False
+
+    def put(self, index: int, findings: Dict[str, str]) -> None:
+        if not self.closed:
+            self._queue.put_nowait((index, findings))
+
+    def close(self) -> None:
+        """End of stream; safe to call more than once."""
+        if not self.closed:
+            self.closed = True
+            self._queue.put_nowait(_END)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Tuple[int, Dict[str, str]]:
+        item = await self._queue.get()
+        if item is _END:
+            raise StopAsyncIteration
+        return item
+
+
+def pipeline_stages(spec: str, audits: dict) -> List[str]:
+    """
+    Validate a --pipeline value ("symbolic,dimensional,units") against the
+    selected audit classes and return the stage names in order.
+    """
+    names = [n.strip().removesuffix("_audit") for n in spec.split(",") if n.strip()]
+    if len(set(names)) != len(names):
+        raise SystemExit(f"Pipeline lists an audit twice: {spec}")
+    kinds = {audits[n].target_kind for n in names}
+    if len(kinds) > 1:
+        raise SystemExit(f"Pipeline stages must look at the same kind of target; got {', '.join(sorted(kinds))}")
+    if "symbolic" in names and names[0] != "symbolic":
+        # Later stages wait on its symbol table; anywhere else it would wait on them.
+        raise SystemExit("The symbolic audit can only be the first pipeline stage.")
+    return names
+
+
+def link(machines: List) -> None:
+    """Connect consecutive stage machines with Streams."""
+    for up, down in zip(machines, machines[1:]):
+        up.downstream = down.upstream = Stream()
@@ -0,0 +1,219 @@
+# eqnlint/lib/_prose.py
+"""
+Prose extraction and local readability triage for the prose audit.
+
+`extract_paragraphs()` strips LaTeX in a single left-to-right pass and keeps a
+map back to source offsets, so every paragraph knows where it came from.
+`triage()` scores a paragraph with cheap local heuristics; only paragraphs that
+cross a threshold need to be sent to the model.
+"""
+import re
+import bisect
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+# Environments whose whole body is not prose.
+_SKIP_ENVS = (
+    "equation", "align", "alignat", "gather", "multline", "eqnarray", "displaymath", "math",
+    "figure", "table", "tabular", "tabularx", "verbatim", "lstlisting", "thebibliography",
+    "tikzpicture",
+)
+# Commands whose (single) argument is prose worth keeping.
+_TEXT_CMDS = ("emph", "textit", "textbf", "textsl", "textsc", "textrm", "underline", "mbox", "text")
+# Commands dropped together with their argument.
+_DROP_CMDS = (
+    "documentclass", "usepackage", "title", "author", "date", "affiliation", "email",
+    "thanks", "label", "ref", "eqref", "cite[a-zA-Z]*", "bibliography", "bibliographystyle",
+    "includegraphics", "input", "include", "newcommand", "renewcommand", "url", "href",
+)
+# A braced argument allowing one level of nesting, e.g. {2S$_{1/2}$ states}.
+_ARG = r"\{(?:[^{}]|\{[^{}]*\})*\}"
+
+_SCANNER = re.compile(
+    r"(?P<comment>(?<!\\)%[^\n]*)"
+    rf"|(?P<env>\\begin\{{(?P<envname>(?:{'|'.join(_SKIP_ENVS)})\*?)\}}.*?\\end\{{(?P=envname)\}})"
+    r"|(?P<dmath>\\\[.*?\\\]|\$\$.*?\$\$)"
+    r"|(?P<imath>(?<!\\)\$(?:\\\$|[^$])*\$|\\\(.*?\\\))"
+    rf"|(?P<textcmd>\\(?:{'|'.join(_TEXT_CMDS)})\{{(?P<textarg>[^{{}}]*)\}})"
+    rf"|(?P<dropcmd>\\(?:{'|'.join(_DROP_CMDS)})\*?(?:\[[^\]]*\])?(?:{_ARG})*)"
+    rf"|(?P<cmd>\\[a-zA-Z]+\*?(?:\[[^\]]*\])?(?:{_ARG})*)"
+    r"|(?P<tilde>~)",
+    re.DOTALL,
+)
+_BLANK = re.compile(r"\n\s*\n")
+
+
+@dataclass
+class StrippedText:
+    """Prose-only text plus a piecewise map from its offsets to source offsets."""
+    text: str
+    _out: List[int] = field(default_factory=list)
+    _src: List[int] = field(default_factory=list)
+
+    def source_offset(self, pos: int) -> int:
+        i = bisect.bisect_right(self._out, pos) - 1
+        if i < 0:
+            return 0
+        return self._src[i] + (pos - self._out[i])
+
+
+def strip_latex(tex: str) -> StrippedText:
+    """
+    Reduce LaTeX to prose in one pass over the source.
+
+    Only the document body is scanned when `\\begin{document}` is present. Math
+    and float environments become a single space; formatting commands such as
+    `\\emph{...}` keep their argument text; other commands are dropped.
+    """
+    begin = tex.find("\\begin{document}")
+    start = begin + len("\\begin{document}") if begin != -1 else 0
+    end = tex.find("\\end{document}", start)
+    end = len(tex) if end == -1 else end
+
+    parts: List[str] = []
+    out_marks: List[int] = []
+    src_marks: List[int] = []
+    out_len = 0
+
+    def emit(s: str, src_pos: int) -> None:
+        nonlocal out_len
+        if not s:
+            return
+        out_marks.append(out_len)
+        src_marks.append(src_pos)
+        parts.append(s)
+        out_len += len(s)
+
+    pos = start
+    for m in _SCANNER.finditer(tex, start, end):
+        emit(tex[pos:m.start()], pos)
+        kind = m.lastgroup
+        if kind == "textcmd":
+            emit(m.group("textarg"), m.start("textarg"))
+        elif kind != "comment":
+            emit(" ", m.start())
+        pos = m.end()
+    emit(tex[pos:end], pos)
+    return StrippedText("".join(parts), out_marks, src_marks)
+
+
+def extract_paragraphs(tex: str, min_chars: int = 30) -> List[dict]:
+    """
+    Paragraphs of prose with their source span and 1-based start line.
+
+    Keeps the previous heuristics for "real" prose: at least `min_chars`
+    characters, more than one word, and some letters.
+    """
+    stripped = strip_latex(tex)
+    text = stripped.text
+    out = []
+    pos = 0
+    line, counted = 1, 0  # running line number: paragraphs come in source order
+    for m in list(_BLANK.finditer(text)) + [None]:
+        stop = m.start() if m else len(text)
+        chunk = text[pos:stop]
+        para = " ".join(chunk.split())
+        if len(para) >= min_chars and " " in para and re.search(r"[A-Za-z]", para):
+            lead = len(chunk) - len(chunk.lstrip())
+            src_start = stripped.source_offset(pos + lead)
+            src_end = stripped.source_offset(max(stop - 1, pos)) + 1
+            line += tex.count("\n", counted, src_start)
+            counted = src_start
+            out.append({
+                "equation": para,
+                "context": "",
+                "start": src_start,
+                "end": src_end,
+                "line": line,
+            })
+        if m:
+            pos = m.end()
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Local triage
+# ---------------------------------------------------------------------------
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+(?=[A-Z(\[])")
+_WORD = re.compile(r"[A-Za-z][A-Za-z'\-]*")
+_PASSIVE = re.compile(r"\b(?:is|are|was|were|be|been|being)\s+(?:\w+ly\s+)?\w+(?:ed|en)\b", re.IGNORECASE)
+_NOMINAL = re.compile(r"\w{3,}(?:tion|sion|ment|ness|ity|ance|ence|ism)s?$", re.IGNORECASE)
+_DOUBLED = re.compile(r"\b(\w+)\s+\1\b", re.IGNORECASE)
+_FILLERS = re.compile(
+    r"\b(?:actually|basically|very|really|quite|in fact|of course|clearly|obviously|"
+    r"it is (?:well )?known that|it should be noted that|needless to say)\b",
+    re.IGNORECASE,
+)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were "
+    "which with we our these those their there than then can may also not such into".split()
+)
+
+
+def _syllables(word: str) -> int:
+    w = word.lower().strip("'-")
+    groups = re.findall(r"[aeiouy]+", w)
+    n = len(groups)
+    if w.endswith("e") and not w.endswith(("le", "ee")) and n > 1:
+        n -= 1
+    return max(n, 1)
+
+
+@dataclass
+class TriageThresholds:
+    max_sentence_words: int = 35
+    min_reading_ease: float = 0.0
+    max_passive: float = 0.6
+    max_nominal: float = 0.15
+    max_repeats: int = 3
+    max_fillers: int = 0
+    min_words: int = 25  # ratio-based checks are noise on shorter fragments
+
+
+def readability(text: str) -> dict:
+    """Cheap per-paragraph statistics used by `triage()`."""
+    sentences = [s for s in _SENTENCE.split(text) if s.strip()] or [text]
+    words = _WORD.findall(text)
+    n_words = max(len(words), 1)
+    n_sent = len(sentences)
+    syllables = sum(_syllables(w) for w in words)
+    content = Counter(w.lower() for w in words if len(w) > 3 and w.lower() not in _STOPWORDS)
+    return {
+        "sentences": n_sent,
+        "words": len(words),
+        "max_sentence_words": max(len(_WORD.findall(s)) for s in sentences),
+        "reading_ease": round(206.835 - 1.015 * (n_words / n_sent) - 84.6 * (syllables / n_words), 1),
+        "grade": round(0.39 * (n_words / n_sent) + 11.8 * (syllables / n_words) - 15.59, 1),
+        "passive": round(len(_PASSIVE.findall(text)) / n_sent, 2),
+        "nominal": round(sum(1 for w in words if _NOMINAL.match(w)) / n_words, 3),
+        "doubled": len(_DOUBLED.findall(text)),
+        "repeats": max(content.values(), default=0),
+        "fillers": len(_FILLERS.findall(text)),
+    }
+
+
+def triage(text: str, th: TriageThresholds) -> Tuple[dict, List[str]]:
+    """
+    Score a paragraph. Returns (stats, reasons); an empty reasons list means
+    the paragraph is fine locally and need not be sent to the model.
+    """
+    st = readability(text)
+    reasons = []
+    if st["max_sentence_words"] > th.max_sentence_words:
+        reasons.append(f"long sentence ({st['max_sentence_words']} words)")
+    if st["words"] >= th.min_words:
+        if st["reading_ease"] < th.min_reading_ease:
+            reasons.append(f"low reading ease ({st['reading_ease']})")
+        if st["passive"] > th.max_passive:
+            reasons.append(f"passive voice ({st['passive']}/sentence)")
+        if st["nominal"] > th.max_nominal:
+            reasons.append(f"nominalizations ({st['nominal']:.0%} of words)")
+    if st["doubled"]:
+        reasons.append(f"doubled word x{st['doubled']}")
+    if st["repeats"] > th.max_repeats:
+        reasons.append(f"repeated word x{st['repeats']}")
+    if st["fillers"] > th.max_fillers:
+        reasons.append(f"filler/hedging x{st['fillers']}")
+    return st, reasons
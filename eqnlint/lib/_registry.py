@@ -0,0 +1,82 @@
+# eqnlint/lib/_registry.py
+"""
+Declared audit registry.
+
+Built-in audits are listed here, and only here, so listing them, `--version` and
+argument handling never import an audit module; their classes take
+`description` from this table. Third-party audits register under the
+`eqnlint.audits` entry-point group ("name = module:Class") and are only looked
+up when the full set is needed. Classes are imported on first use.
+"""
+import importlib
+
+ENTRY_POINT_GROUP = "eqnlint.audits"
+
+# name -> (module:Class, one-line description)
+BUILTIN_AUDITS = {
+    "citation":    ("eqnlint.bin.citation_audit:CitationAuditStateMachine",
+                    "Audit LaTeX citations for presence, correctness, and plausibility."),
+    "context":     ("eqnlint.bin.context_audit:ContextAuditStateMachine",
+                    "Audit LaTeX citation context for accuracy."),
+    "dimensional": ("eqnlint.bin.dimensional_audit:DimensionalAuditStateMachine",
+                    "Audit LaTeX equations for SI dimensional consistency."),
+    "opacity":     ("eqnlint.bin.opacity_audit:OpacityAuditStateMachine",
+                    "Audit LaTeX equations for undefined/opaque symbols, acronyms, and notation."),
+    "prose":       ("eqnlint.bin.prose_audit:ProseAuditStateMachine",
+                    "Review scientific prose for clarity and concision."),
+    "symbolic":    ("eqnlint.bin.symbolic_audit:SymbolicAuditStateMachine",
+                    "Build symbol dictionaries for LaTeX equations (shared with other audits)."),
+    "units":       ("eqnlint.bin.units_audit:UnitsAuditStateMachine",
+                    "Audit LaTeX equations for unit consistency (SI preferred)."),
+}
+
+_plugins = None
+_loaded = {}
+
+
+def _entry_points():
+    from importlib.metadata import entry_points
+
+    eps = entry_points()
+    if hasattr(eps, "select"):  # Python 3.10+
+        return list(eps.select(group=ENTRY_POINT_GROUP))
+    return list(eps.get(ENTRY_POINT_GROUP, []))  # Python 3.9
+
+
+def plugin_audits() -> dict:
+    """Third-party audits from entry points: name -> (module:Class, description)."""
+    global _plugins
+    if _plugins is None:
+        _plugins = {}
+        try:
+            eps = _entry_points()
+        except Exception:
+            eps = []
+        for ep in eps:
+            if ep.name not in BUILTIN_AUDITS:
+                _plugins[ep.name] = (ep.value, f"(plugin from {ep.value.split(':')[0]})")
+    return _plugins
+
+
+def available(include_plugins: bool = True) -> dict:
+    """name -> (module:Class, description) without importing anything."""
+    audits = dict(BUILTIN_AUDITS)
+    if include_plugins:
+        audits.update(plugin_audits())
+    return audits
+
+
+def description(name: str, default: str = "") -> str:
+    """One-line description of a built-in audit (`default` for anything else)."""
+    return BUILTIN_AUDITS.get(name, (None, default))[1]
+
+
+def load(name: str):
+    """Import and return the AuditStateMachine subclass registered as `name`."""
+    if name not in _loaded:
+        spec = BUILTIN_AUDITS.get(name) or plugin_audits().get(name)
+        if spec is None:
+            raise KeyError(name)
+        module, _, cls = spec[0].partition(":")
+        _loaded[name] = getattr(importlib.import_module(module), cls)
+    return _loaded[name]
@@ -0,0 +1,248 @@
+# eqnlint/lib/_sample.py
+import re
+import math
+import hashlib
+import argparse
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from ._verdict import Verdict, parse_verdict
+
+Z = 1.96  # 95 % intervals
+
+_SECTION = re.compile(r"\\(?:chapter|section)\*?\s*(?:\[[^\]]*\])?\s*\{([^}]*)\}")
+_NUMBERED = re.compile(r"^\\begin\{(equation|align|gather|multline|eqnarray)\}")
+_DISPLAY = re.compile(r"^(\\\[|\$\$|\\begin\{)")
+FRONT = "(front matter)"
+
+
+def parse_sample(value: str):
+    """
+    --sample value (argparse `type=`): '0.1' or '10%' -> fraction of the
+    targets (float), '200' -> number of targets (int).
+    """
+    text = str(value).strip()
+    try:
+        if text.endswith("%"):
+            size = float(text[:-1]) / 100.0
+        elif "." in text:
+            size = float(text)
+        else:
+            size = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid sample size {value!r} (try 0.1, 10% or 200)")
+    if (isinstance(size, float) and not 0 < size <= 1) or (isinstance(size, int) and size < 1):
+        raise argparse.ArgumentTypeError(f"invalid sample size {value!r}: a fraction in (0, 1] or a count >= 1")
+    return size
+
+
+def environment(target: dict) -> str:
+    """Environment type of an equation target: numbered, display or inline."""
+    src = target.get("equation", "").strip()
+    if _NUMBERED.match(src):
+        return "numbered"
+    if _DISPLAY.match(src):
+        return "display"
+    return "inline"
+
+
+def sections(text: str) -> Tuple[List[int], List[str]]:
+    """Start offsets and titles of the \\chapter/\\section headings, in document order."""
+    starts, titles = [], []
+    for m in _SECTION.finditer(text or ""):
+        starts.append(m.start())
+        titles.append(" ".join(m.group(1).split())[:80] or "(untitled)")
+    return starts, titles
+
+
+def wilson(p: float, n: float, z: float = Z) -> Tuple[float, float]:
+    """Wilson score interval for a proportion `p` observed on `n` (possibly effective) trials."""
+    if n <= 0:
+        return 0.0, 1.0
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def _interval(p: float, var: float, n: int, census: bool) -> dict:
+    """Rate, standard error and a Wilson interval on the design's effective sample size."""
+    if census:
+        low = high = p
+    else:
+        # Stratification shrinks the variance; express it as the number of
+        # simple-random draws with the same variance (Kish's effective n).
+        n_eff = p * (1 - p) / var if var > 0 else n
+        low, high = wilson(p, n_eff)
+    return {"rate": round(p, 4), "se": round(math.sqrt(var), 4), "low": round(low, 4), "high": round(high, 4)}
+
+
+def stratified(strata: Dict[tuple, dict]) -> Dict[str, dict]:
+    """
+    Stratified estimate of each verdict's rate. `strata` maps a stratum to
+    {"population": N_h, "verdicts": [verdict, ...]} for its answered targets.
+    Strata without answers are left out and the others reweighted.
+    """
+    seen = {k: s for k, s in strata.items() if s["verdicts"]}
+    total = sum(s["population"] for s in seen.values())
+    if not total:
+        return {}
+    census = all(len(s["verdicts"]) >= s["population"] for s in strata.values())
+    n = sum(len(s["verdicts"]) for s in seen.values())
+    labels = sorted({v for s in seen.values() for v in s["verdicts"]})
+    out = {}
+    for label in labels:
+        p = var = 0.0
+        for s in seen.values():
+            size, hits = len(s["verdicts"]), s["verdicts"].count(label)
+            w, p_h = s["population"] / total, hits / size
+            p += w * p_h
+            if size > 1:
+                fpc = max(0.0, 1 - size / s["population"])
+                var += w * w * fpc * p_h * (1 - p_h) / (size - 1)
+        out[label] = _interval(p, var, n, census)
+    return out
+
+
+def pool(estimates: List[dict]) -> Dict[str, dict]:
+    """
+    Combine per-document estimates ({"population", "rates"} from
+    Sample.estimate) into one: documents are independent strata.
+    """
+    estimates = [e for e in estimates if e and e.get("population")]
+    total = sum(e["population"] for e in estimates)
+    if not total:
+        return {}
+    n = sum(e["sampled"] for e in estimates)
+    census = all(e["sampled"] >= e["population"] for e in estimates)
+    labels = sorted({v for e in estimates for v in e["rates"]})
+    out = {}
+    for label in labels:
+        p = var = 0.0
+        for e in estimates:
+            w = e["population"] / total
+            r = e["rates"].get(label, {"rate": 0.0, "se": 0.0})
+            p += w * r["rate"]
+            var += w * w * r["se"] ** 2
+        out[label] = _interval(p, var, n, census)
+    return out
+
+
+def _allocate(sizes: Dict[tuple, int], n: int) -> Dict[tuple, int]:
+    """Proportional allocation (largest remainder), at least one target per stratum when n allows."""
+    total = sum(sizes.values())
+    exact = {k: n * size / total for k, size in sizes.items()}
+    alloc = {k: int(x) for k, x in exact.items()}
+    for k in sorted(exact, key=lambda k: alloc[k] - exact[k])[:n - sum(alloc.values())]:
+        alloc[k] += 1
+    if n >= len(sizes):
+        for k in alloc:
+            alloc[k] = max(alloc[k], 1)
+    return {k: min(a, sizes[k]) for k, a in alloc.items()}
+
+
+class Sample:
+    """
+    A stratified random sample of one document's targets (--sample).
+
+    Targets are stratified by environment type (numbered, display, inline)
+    and by the \\section they sit in; each stratum gets its proportional
+    share of the sample. Within a stratum the targets with the lowest
+    hash of (--sample-seed, target text) are taken, so the draw is
+    deterministic, identical for every audit of a run, and stable when
+    other parts of the document are edited.
+    """
+
+    def __init__(self, targets: List[dict], text: str, size, seed: int = 0):
+        self.population = targets
+        self.size = size
+        self.seed = seed
+        starts, titles = sections(text)
+        self.section = []
+        for t in targets:
+            at = bisect_right(starts, t.get("start", 0)) - 1
+            self.section.append(titles[at] if at >= 0 else FRONT)
+        self.stratum = [(environment(t), s) for t, s in zip(targets, self.section)]
+        self.index = {id(t): i for i, t in enumerate(targets)}
+
+        members: Dict[tuple, List[int]] = {}
+        for i, key in enumerate(self.stratum):
+            members.setdefault(key, []).append(i)
+        n = min(len(targets), math.ceil(size * len(targets)) if isinstance(size, float) else size)
+        alloc = _allocate({k: len(v) for k, v in members.items()}, n) if targets else {}
+        chosen = []
+        for key, idx in members.items():
+            idx = sorted(idx, key=lambda i: (self._rank(targets[i]), i))
+            chosen += idx[:alloc[key]]
+        self.chosen = sorted(chosen)
+        self.expanded: List[str] = []  # sections audited in full after a high failure estimate (--sample-expand)
+
+    def _rank(self, target: dict) -> str:
+        from ._symbols import target_key  # imported late: lib/_cli.py imports this module
+
+        return hashlib.sha1(f"{self.seed}:{target_key(target)}".encode("utf-8")).hexdigest()
+
+    def targets(self) -> List[dict]:
+        """The sampled targets, in document order."""
+        return [self.population[i] for i in self.chosen]
+
+    def _strata(self, answered: Dict[int, str], section: Optional[str] = None) -> Dict[tuple, dict]:
+        strata: Dict[tuple, dict] = {}
+        for i, key in enumerate(self.stratum):
+            if section is not None and key[1] != section:
+                continue
+            s = strata.setdefault(key, {"population": 0, "verdicts": []})
+            s["population"] += 1
+            if i in answered:
+                s["verdicts"].append(answered[i])
+        return strata
+
+    def answered(self, targets: List[dict], results: List[dict]) -> Dict[int, str]:
+        """Population index -> verdict for the results that are real answers (not pending or errors)."""
+        out = {}
+        for t, r in zip(targets, results):
+            if r is None or r.get("pending"):
+                continue
+            verdict = parse_verdict(r.get("notes", ""))
+            if verdict is not Verdict.ERROR and id(t) in self.index:
+                out[self.index[id(t)]] = verdict.value
+        return out
+
+    def expand(self, answered: Dict[int, str], threshold: float) -> List[int]:
+        """Unsampled targets of every section whose estimated failure rate reaches `threshold`."""
+        hot = set()
+        for section in dict.fromkeys(self.section):
+            rates = stratified(self._strata(answered, section))
+            if rates.get(Verdict.FAIL.value, {}).get("rate", 0.0) >= threshold:
+                hot.add(section)
+        chosen = set(self.chosen)
+        extra = [i for i, s in enumerate(self.section) if s in hot and i not in answered and i not in chosen]
+        self.expanded = [s for s in dict.fromkeys(self.section) if s in hot and s in {self.section[i] for i in extra}]
+        return extra
+
+    def estimate(self, answered: Dict[int, str]) -> dict:
+        """Estimated verdict rates with 95 % intervals, overall and per section."""
+        per_section = {}
+        for section in dict.fromkeys(self.section):
+            strata = self._strata(answered, section)
+            per_section[section] = {"population": sum(s["population"] for s in strata.values()),
+                                    "sampled": sum(len(s["verdicts"]) for s in strata.values()),
+                                    "rates": stratified(strata)}
+        strata = self._strata(answered)
+        return {
+            "size": self.size,
+            "seed": self.seed,
+            "population": len(self.population),
+            "sampled": len(answered),
+            "strata": len(strata),
+            "rates": stratified(strata),
+            "sections": per_section,
+            "expanded": list(self.expanded),
+        }
+
+
+def format_rates(rates: Dict[str, dict]) -> str:
+    """'fail 12.0% [7.9%, 17.8%], pass 88.0% [...]' (worst first)."""
+    order = [v.value for v in (Verdict.FAIL, Verdict.WARN, Verdict.PASS, Verdict.UNKNOWN)]
+    labels = sorted(rates, key=lambda v: order.index(v) if v in order else len(order))
+    return ", ".join(f"{v} {rates[v]['rate']:.1%} [{rates[v]['low']:.1%}, {rates[v]['high']:.1%}]" for v in labels)
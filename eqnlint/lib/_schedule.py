@@ -0,0 +1,86 @@
+# eqnlint/lib/_schedule.py
+import re
+from typing import Dict, List, Optional
+
+# Cheap local features only: nothing here may call a model.
+_NUMBERED = re.compile(r"^\\begin\{(equation|align|gather|multline)\}")
+_DISPLAY = re.compile(r"^(\\\[|\\begin\{\w+\*?\})")
+_LABEL = re.compile(r"\\label\{([^}]*)\}")
+_REF = re.compile(r"\\(?:eqref|ref|autoref|cref|Cref)\{([^}]*)\}")
+_OPERATORS = re.compile(
+    r"=|\\approx|\\sim|\\propto|\\le|\\ge|<|>|\+|-|\^|_|"
+    r"\\frac|\\int|\\oint|\\sum|\\prod|\\partial|\\nabla|\\cdot|\\times|\\otimes|\\sqrt|\\exp|\\log"
+)
+_TOKENS = re.compile(r"\\[A-Za-z]+|[A-Za-z]")
+_SKIP_TOKENS = {"\\begin", "\\end", "\\label", "\\left", "\\right", "\\frac", "\\mathrm", "\\text"}
+_DURATION = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h|d|w)?\s*$")
+
+
+def parse_duration(value: str) -> float:
+    """'120', '120s', '2m', '1.5h', '500ms', '7d', '2w' -> seconds (argparse `type=`)."""
+    m = _DURATION.match(str(value))
+    if not m:
+        import argparse
+        raise argparse.ArgumentTypeError(f"invalid duration {value!r} (try 120s, 2m or 1h)")
+    scale = {"ms": 0.001, "s": 1, None: 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}[m.group(2)]
+    return float(m.group(1)) * scale
+
+
+def referenced_labels(text: str) -> Dict[str, int]:
+    """How often each label is referenced (\\eqref, \\ref, ...) in the document."""
+    refs: Dict[str, int] = {}
+    for m in _REF.finditer(text or ""):
+        for label in m.group(1).split(","):
+            label = label.strip()
+            refs[label] = refs.get(label, 0) + 1
+    return refs
+
+
+def score_target(target: dict, refs: Optional[Dict[str, int]] = None, seen: Optional[set] = None) -> float:
+    """
+    Priority of one target; higher goes first.
+
+    environment   numbered display +3, other display +2, inline 0
+    length        +1 per 40 characters, at most 3
+    operators     +0.3 per relation/operator, at most 3
+    references    +2 for a \\label, +1 per \\eqref to it, at most 3
+    novelty       up to +2 for symbols not seen in higher-priority targets
+
+    `seen` is updated with this target's symbols.
+    """
+    src = target.get("equation", "").strip()
+    body = re.sub(r"\\(?:begin|end)\{[^}]*\}|\\label\{[^}]*\}|^\$|\$$|^\\\[|\\\]$", "", src).strip()
+
+    score = 0.0
+    if _NUMBERED.match(src):
+        score += 3.0
+    elif _DISPLAY.match(src):
+        score += 2.0
+    score += min(len(body) / 40.0, 3.0)
+    score += min(0.3 * len(_OPERATORS.findall(body)), 3.0)
+
+    labels = _LABEL.findall(src)
+    if labels:
+        score += 2.0 + min(sum((refs or {}).get(l, 0) for l in labels), 3)
+
+    if seen is not None:
+        tokens = {t for t in _TOKENS.findall(body) if t not in _SKIP_TOKENS}
+        if tokens:
+            score += 2.0 * len(tokens - seen) / len(tokens)
+            seen |= tokens
+    return round(score, 3)
+
+
+def scores(targets: List[dict], text: str = "") -> List[float]:
+    """
+    Score every target. Novelty is judged against targets earlier in the
+    document, so repeats of an already-seen expression sink.
+    """
+    refs = referenced_labels(text)
+    seen: set = set()
+    return [score_target(t, refs, seen) for t in targets]
+
+
+def prioritize(weights: List[float]) -> List[int]:
+    """Dispatch order: indices by descending score; ties keep document order."""
+    return sorted(range(len(weights)), key=lambda i: (-weights[i], i))
@@ -0,0 +1,199 @@
+# eqnlint/lib/_schema.py
+import re
+import json
+from typing import Dict, List, Optional, Tuple
+
+from ._verdict import parse_verdict
+
+# Leading marker of the human-readable notes, as the free-text prompts produce it.
+MARKS = {"pass": "✅", "fail": "❌", "warn": "⚠️"}
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+_JSON_OBJ = re.compile(r"\{.*\}", re.DOTALL)
+_LEAD = re.compile(r"^\W*?(?:✅|❌|⚠️|⚠)\s*([^:]*):\s*", re.DOTALL)
+
+
+def verdict_schema(labels: Dict[str, str], extra: Optional[Dict[str, dict]] = None) -> dict:
+    """
+    Response schema for a verdict audit: one of `labels` ("pass"/"fail"/"warn"
+    -> the audit's wording), a short reason, and optional extra fields
+    (declared nullable, as strict structured-output modes require every
+    property to be listed).
+    """
+    props = {
+        "verdict": {"type": "string", "enum": list(labels),
+                    "description": "; ".join(f"{k} = {v}" for k, v in labels.items())},
+        "reason": {"type": "string", "description": "One or two sentences, no verdict marker."},
+    }
+    props.update(extra or {})
+    return {"type": "object", "properties": props, "required": list(props), "additionalProperties": False}
+
+
+def triage_schema(labels: Dict[str, str]) -> dict:
+    """Verdict-only reply for the triage tier of a cascade: a verdict and a confidence."""
+    return {
+        "type": "object",
+        "properties": {
+            "verdict": {"type": "string", "enum": list(labels),
+                        "description": "; ".join(f"{k} = {v}" for k, v in labels.items())},
+            "confidence": {"type": "number", "description": "How sure you are of the verdict, 0 to 1"},
+        },
+        "required": ["verdict", "confidence"],
+        "additionalProperties": False,
+    }
+
+
+SYMBOLS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "symbols": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "symbol": {"type": "string", "description": "The symbol as written in LaTeX"},
+                    "meaning": {"type": "string", "description": "Meaning with SI unit, e.g. 'energy (J)'"},
+                },
+                "required": ["symbol", "meaning"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["symbols"],
+    "additionalProperties": False,
+}
+
+_TYPES = {
+    "object": dict, "array": list, "string": str, "boolean": bool,
+    "integer": int, "number": (int, float), "null": type(None),
+}
+
+
+def validate(obj, schema: dict, path: str = "$") -> List[str]:
+    """
+    Check `obj` against the subset of JSON Schema the audit schemas use
+    (type, enum, properties, required, additionalProperties, items).
+    Returns a list of problems; empty means valid.
+    """
+    errors = []
+    types = schema.get("type")
+    if types is not None:
+        types = [types] if isinstance(types, str) else types
+        ok = any(isinstance(obj, _TYPES[t]) and not (t in ("integer", "number") and isinstance(obj, bool))
+                 for t in types)
+        if not ok:
+            return [f"{path}: expected {' or '.join(types)}, got {type(obj).__name__}"]
+    if "enum" in schema and obj not in schema["enum"]:
+        errors.append(f"{path}: {obj!r} is not one of {schema['enum']}")
+    if isinstance(obj, dict):
+        props = schema.get("properties", {})
+        for name in schema.get("required", []):
+            if name not in obj:
+                errors.append(f"{path}: missing {name!r}")
+        for name, value in obj.items():
+            if name in props:
+                errors += validate(value, props[name], f"{path}.{name}")
+            elif schema.get("additionalProperties") is False:
+                errors.append(f"{path}: unexpected {name!r}")
+    if isinstance(obj, list) and "items" in schema:
+        for i, item in enumerate(obj):
+            errors += validate(item, schema["items"], f"{path}[{i}]")
+    return errors
+
+
+def parse_structured(reply: str, schema: dict) -> Tuple[Optional[dict], List[str]]:
+    """
+    Parse and validate a structured reply. Tolerates code fences and prose
+    around the object (JSON mode without a schema, local models).
+    Returns (object, []) or (None, problems).
+    """
+    if not reply:
+        return None, ["empty reply"]
+    text = _FENCE.sub("", reply.strip())
+    errors = ["no JSON object in reply"]
+    for candidate in (text, *(m.group() for m in _JSON_OBJ.finditer(text))):
+        try:
+            obj = json.loads(candidate)
+        except ValueError:
+            continue
+        errors = validate(obj, schema)
+        if not errors:
+            return obj, []
+    return None, errors
+
+
+def render_verdict(obj: dict, labels: Dict[str, str]) -> str:
+    """Notes in the free-text form the rest of eqnlint reads: '❌ INCONSISTENT: reason'."""
+    v = obj["verdict"]
+    head = f"{MARKS.get(v, '')} {labels.get(v, v.upper())}".strip()
+    reason = (obj.get("reason") or "").strip()  # '' when an early stop skipped it (--reason-on-fail)
+    lines = [f"{head}: {reason}" if reason else head]
+    for name, value in obj.items():
+        if name in ("verdict", "reason") or value in (None, "", []):
+            continue
+        shown = ", ".join(map(str, value)) if isinstance(value, list) else str(value)
+        lines.append(f"{name.replace('_', ' ').capitalize()}: {shown}")
+    return "\n".join(lines)
+
+
+def structured_fewshots(few_shots: List[dict], schema: dict) -> List[dict]:
+    """
+    Rewrite free-text examples ('✅ CONSISTENT: ...', optionally followed by
+    'Rewrite: ...' style lines for extra fields) as the JSON objects `schema`
+    asks for, so the examples agree with the reply format. Examples given
+    inline as a user message ending in 'Output:' are split into a user /
+    assistant pair. Examples whose verdict cannot be read are dropped.
+    """
+    out = []
+    for msg in few_shots:
+        role, content = msg.get("role"), msg.get("content", "")
+        if role == "user" and "\nOutput:\n" in content:
+            question, _, answer = content.rpartition("\nOutput:\n")
+            out.append({"role": "user", "content": question.rstrip()})
+            role, content = "assistant", answer
+        if role != "assistant":
+            out.append(msg)
+            continue
+        obj = _example_object(content, schema)
+        if obj is None:
+            if out and out[-1].get("role") == "user":
+                out.pop()  # keep user/assistant pairs together
+            continue
+        out.append({"role": "assistant", "content": json.dumps(obj, ensure_ascii=False)})
+    return out
+
+
+def _example_object(text: str, schema: dict) -> Optional[dict]:
+    props = schema["properties"]
+    verdict = parse_verdict(text).value
+    if verdict not in props["verdict"]["enum"]:
+        return None
+    obj = {name: None for name in props}
+    reason = []
+    for line in _LEAD.sub("", text.strip(), count=1).splitlines():
+        name, sep, value = line.partition(":")
+        field = name.strip().lower().replace(" ", "_")
+        if sep and field in props and field not in ("verdict", "reason"):
+            value = value.strip()
+            obj[field] = [v.strip() for v in value.split(",")] if "array" in props[field]["type"] else value
+        elif line.strip():
+            reason.append(line.strip())
+    obj.update(verdict=verdict, reason=" ".join(reason))
+    return obj
+
+
+def triage_fewshots(few_shots: List[dict], confidence: float = 0.9) -> List[dict]:
+    """Reduce structured few-shot answers to the triage form {verdict, confidence}."""
+    out = []
+    for msg in few_shots:
+        if msg.get("role") == "assistant":
+            verdict = json.loads(msg["content"])["verdict"]
+            msg = {"role": "assistant", "content": json.dumps({"verdict": verdict, "confidence": confidence})}
+        out.append(msg)
+    return out
+
+
+def schema_instructions(schema: dict) -> str:
+    """Prompt text for backends that only have a plain JSON mode."""
+    return ("Reply with a single JSON object (no prose, no code fences) matching this JSON Schema:\n"
+            + json.dumps(schema, ensure_ascii=False))
@@ -0,0 +1,239 @@
+# eqnlint/lib/_store.py
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import pathlib
+from bisect import bisect_right
+from typing import Iterable, List, Optional
+
+from ._checkpoint import checkpoint_key
+from ._verdict import parse_verdict
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    started_at  REAL NOT NULL,
+    finished_at REAL,
+    model       TEXT,
+    max_tokens  INTEGER,
+    audits      TEXT,
+    argv        TEXT
+);
+CREATE TABLE IF NOT EXISTS documents (
+    id   INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    sha  TEXT NOT NULL,
+    UNIQUE (path, sha)
+);
+CREATE TABLE IF NOT EXISTS targets (
+    id          INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents(id),
+    kind        TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    text        TEXT NOT NULL,
+    line        INTEGER,
+    start       INTEGER,
+    "end"       INTEGER,
+    UNIQUE (document_id, kind, key)
+);
+CREATE TABLE IF NOT EXISTS verdicts (
+    id             INTEGER PRIMARY KEY,
+    run_id         INTEGER NOT NULL REFERENCES runs(id),
+    target_id      INTEGER NOT NULL REFERENCES targets(id),
+    audit          TEXT NOT NULL,
+    verdict        TEXT NOT NULL,
+    notes          TEXT,
+    model          TEXT,
+    prompt_version TEXT,
+    latency_ms     REAL,
+    tokens_in      INTEGER,
+    tokens_out     INTEGER,
+    cached         INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started     ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_documents_path   ON documents(path);
+CREATE INDEX IF NOT EXISTS idx_targets_document ON targets(document_id);
+CREATE INDEX IF NOT EXISTS idx_targets_text     ON targets(text);
+CREATE INDEX IF NOT EXISTS idx_verdicts_run     ON verdicts(run_id, audit, verdict);
+CREATE INDEX IF NOT EXISTS idx_verdicts_target  ON verdicts(target_id, audit);
+"""
+
+
+def prompt_version(system_prompt: str, few_shots=None) -> str:
+    """Short hash of an audit's system prompt and few-shots."""
+    blob = json.dumps([system_prompt, few_shots or []], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:12]
+
+
+class ResultStore:
+    """
+    Optional SQLite database of audit results (--db PATH), for queries
+    across runs and papers (`eqnlint query`).
+
+    runs      one row per eqnlint / corpus invocation
+    documents one row per (path, content hash)
+    targets   one row per target of a document (equation, citation, paragraph)
+    verdicts  one row per audited target per run: parsed Verdict, notes,
+              model, prompt version, latency and tokens
+
+    Each document's results are written in one transaction with executemany.
+    """
+
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise RuntimeError(f"{self.path}: results store schema v{version}, expected v{SCHEMA_VERSION}")
+        with self.db:
+            self.db.executescript(_SCHEMA)
+            self.db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        self.db.close()
+
+    # ---- writing ----------------------------------------------------------
+
+    def start_run(self, args, audits: Iterable[str], argv: Optional[List[str]] = None) -> int:
+        with self.db:
+            cur = self.db.execute(
+                "INSERT INTO runs (started_at, model, max_tokens, audits, argv) VALUES (?, ?, ?, ?, ?)",
+                (time.time(), args.model, args.max_tokens, ",".join(audits), json.dumps(argv or [])),
+            )
+        return cur.lastrowid
+
+    def finish_run(self, run_id: int) -> None:
+        with self.db:
+            self.db.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run_id))
+
+    def _document_id(self, path: str, text: str) -> int:
+        sha = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        self.db.execute("INSERT OR IGNORE INTO documents (path, sha) VALUES (?, ?)", (path, sha))
+        return self.db.execute("SELECT id FROM documents WHERE path = ? AND sha = ?", (path, sha)).fetchone()[0]
+
+    def add_results(self, run_id: int, path: str, text: str, machines: dict) -> int:
+        """Store every finished result of one document's audits; returns rows written."""
+        rows = 0
+        newlines = [m.start() for m in re.finditer("\n", text)]
+
+        def line_of(t):
+            if t.get("line") is not None or t.get("start") is None:
+                return t.get("line")
+            return bisect_right(newlines, t["start"] - 1) + 1
+
+        with self.db:
+            doc_id = self._document_id(str(path), text)
+            for name, m in machines.items():
+                pairs = [(t, r) for t, r in zip(m.equations, m.results or []) if r and not r.get("pending")]
+                if not pairs:
+                    continue
+                targets = [(doc_id, m.target_kind, checkpoint_key(t), t.get("equation") or t.get("full_cite") or "",
+                            line_of(t), t.get("start"), t.get("end")) for t, _ in pairs]
+                self.db.executemany(
+                    'INSERT OR IGNORE INTO targets (document_id, kind, key, text, line, start, "end") '
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", targets)
+                ids = dict(self.db.execute(
+                    "SELECT key, id FROM targets WHERE document_id = ? AND kind = ?", (doc_id, m.target_kind)))
+                version = prompt_version(m.system_prompt, m.few_shots)
+                verdicts = []
+                for (t, r), row in zip(pairs, targets):
+                    meta = r.get("meta") or {}
+                    verdicts.append((
+                        run_id, ids[row[2]], name, parse_verdict(r.get("notes", "")).value, r.get("notes"),
+                        meta.get("model") or m.args.model, version, meta.get("latency_ms"), meta.get("tokens_in"),
+                        meta.get("tokens_out"), int(bool(meta.get("cached") or r.get("cached"))),
+                    ))
+                self.db.executemany(
+                    "INSERT INTO verdicts (run_id, target_id, audit, verdict, notes, model, prompt_version, "
+                    "latency_ms, tokens_in, tokens_out, cached) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", verdicts)
+                rows += len(verdicts)
+        return rows
+
+    # ---- reports ----------------------------------------------------------
+
+    def last_run(self) -> Optional[int]:
+        row = self.db.execute("SELECT MAX(id) FROM runs").fetchone()
+        return row[0]
+
+    def runs(self, limit: int = 20) -> List[sqlite3.Row]:
+        return self.db.execute("""
+            SELECT r.id, datetime(r.started_at, 'unixepoch', 'localtime') AS started,
+                   ROUND(r.finished_at - r.started_at, 1) AS seconds, r.model, r.audits,
+                   COUNT(DISTINCT t.document_id) AS documents, COUNT(v.id) AS verdicts,
+                   SUM(v.verdict = 'fail') AS fail, SUM(v.verdict = 'warn') AS warn,
+                   SUM(v.verdict = 'error') AS error
+            FROM runs r LEFT JOIN verdicts v ON v.run_id = r.id LEFT JOIN targets t ON t.id = v.target_id
+            GROUP BY r.id ORDER BY r.id DESC LIMIT ?""", (limit,)).fetchall()
+
+    def summary(self, run_id: int) -> List[sqlite3.Row]:
+        return self.db.execute("""
+            SELECT audit, verdict, COUNT(*) AS n, ROUND(AVG(latency_ms), 1) AS avg_latency_ms,
+                   SUM(tokens_in) AS tokens_in, SUM(tokens_out) AS tokens_out, SUM(cached) AS cached
+            FROM verdicts WHERE run_id = ? GROUP BY audit, verdict ORDER BY audit, verdict""",
+            (run_id,)).fetchall()
+
+    def failing(self, run_id: int, verdicts=("fail",), audit: Optional[str] = None) -> List[sqlite3.Row]:
+        marks = ",".join("?" * len(verdicts))
+        sql = f"""
+            SELECT d.path, t.line, v.audit, v.verdict, t.text, v.notes
+            FROM verdicts v JOIN targets t ON t.id = v.target_id JOIN documents d ON d.id = t.document_id
+            WHERE v.run_id = ? AND v.verdict IN ({marks})"""
+        params = [run_id, *verdicts]
+        if audit:
+            sql += " AND v.audit = ?"
+            params.append(audit)
+        return self.db.execute(sql + " ORDER BY d.path, t.line", params).fetchall()
+
+    def flips(self, since: float, to: str = "fail", audit: Optional[str] = None) -> List[sqlite3.Row]:
+        """
+        Targets (same paper, audit and text) whose latest verdict since
+        `since` is `to` while their latest verdict before it was not.
+        """
+        sql = """
+            WITH v AS (
+                SELECT d.path, v.audit, t.text, t.line, v.verdict, v.run_id, r.started_at >= :since AS recent,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY d.path, v.audit, t.text, r.started_at >= :since
+                           ORDER BY r.started_at DESC, v.id DESC) AS rn
+                FROM verdicts v JOIN runs r ON r.id = v.run_id
+                     JOIN targets t ON t.id = v.target_id JOIN documents d ON d.id = t.document_id
+                WHERE (:audit IS NULL OR v.audit = :audit)
+            )
+            SELECT new.path, new.line, new.audit, old.verdict AS before, new.verdict AS after,
+                   new.run_id, new.text
+            FROM v AS new JOIN v AS old
+                 ON old.path = new.path AND old.audit = new.audit AND old.text = new.text
+            WHERE new.recent = 1 AND new.rn = 1 AND old.recent = 0 AND old.rn = 1
+              AND new.verdict = :to AND old.verdict != :to
+            ORDER BY new.path, new.line"""
+        return self.db.execute(sql, {"since": since, "to": to, "audit": audit}).fetchall()
+
+    def trend(self, path: Optional[str] = None, limit: int = 20) -> List[sqlite3.Row]:
+        return self.db.execute("""
+            SELECT r.id AS run, date(r.started_at, 'unixepoch', 'localtime') AS day, r.model,
+                   COUNT(*) AS verdicts, SUM(v.verdict = 'fail') AS fail, SUM(v.verdict = 'warn') AS warn,
+                   SUM(v.verdict = 'pass') AS pass, ROUND(AVG(v.latency_ms), 1) AS avg_latency_ms
+            FROM verdicts v JOIN runs r ON r.id = v.run_id
+                 JOIN targets t ON t.id = v.target_id JOIN documents d ON d.id = t.document_id
+            WHERE (:path IS NULL OR d.path = :path)
+            GROUP BY r.id ORDER BY r.id DESC LIMIT :limit""", {"path": path, "limit": limit}).fetchall()
+
+    def latency(self, model: str, recent: int = 500) -> Optional[float]:
+        """Median latency (ms) of the last `recent` requests `model` actually answered, or None."""
+        rows = self.db.execute("""
+            SELECT latency_ms FROM verdicts
+            WHERE model = ? AND cached = 0 AND latency_ms IS NOT NULL AND latency_ms > 0
+            ORDER BY id DESC LIMIT ?""", (model, recent)).fetchall()
+        if not rows:
+            return None
+        values = sorted(r[0] for r in rows)
+        return values[len(values) // 2]
@@ -0,0 +1,117 @@
+# eqnlint/lib/_stream.py
+import json
+from typing import Dict, Optional, Sequence
+
+from ._verdict import Verdict, parse_verdict
+
+_DECODER = json.JSONDecoder()
+_SPACE = " \t\r\n"
+
+
+def _skip(text: str, i: int) -> int:
+    while i < len(text) and text[i] in _SPACE:
+        i += 1
+    return i
+
+
+def complete_fields(text: str) -> dict:
+    """
+    Top-level fields of a (possibly unfinished) JSON object whose values
+    have fully arrived: '{"verdict": "fail", "reason": "Mass ti' -> {"verdict": "fail"}.
+    Numbers and literals count only once a ',' or '}' follows them.
+    """
+    out = {}
+    i = text.find("{")
+    if i < 0:
+        return out
+    i += 1
+    n = len(text)
+    while True:
+        i = _skip(text, i)
+        if i >= n or text[i] != '"':
+            return out
+        try:
+            key, i = _DECODER.raw_decode(text, i)
+        except ValueError:
+            return out
+        i = _skip(text, i)
+        if i >= n or text[i] != ":":
+            return out
+        try:
+            value, j = _DECODER.raw_decode(text, _skip(text, i + 1))
+        except ValueError:
+            return out
+        k = _skip(text, j)
+        if not isinstance(value, str) and (k >= n or text[k] not in ",}"):
+            return out  # '0.9' may still become '0.95'
+        out[key] = value
+        if k >= n or text[k] != ",":
+            return out
+        i = k + 1
+
+
+class VerdictStop:
+    """
+    Early-stop rule for one audit's replies, checked on the text streamed so
+    far. Returns the reply to keep once the fields the audit needs have
+    arrived (the rest of the generation is then cancelled), else None.
+
+    Structured replies stop when `fields` are complete (None: every field
+    of the schema, i.e. the whole object); the kept reply is the object
+    with the fields not yet generated set to null ('' for the reason).
+    Free-text replies stop after the verdict line, once it carries a
+    reason. With `reason_on_fail`, a pass stops as soon as the verdict is
+    known; failing and warning verdicts still wait for their reason.
+    """
+
+    def __init__(self, labels: Dict[str, str], schema: Optional[dict] = None,
+                 fields: Optional[Sequence[str]] = ("verdict", "reason"), reason_on_fail: bool = False):
+        self.labels = labels
+        self.schema = schema
+        self.fields = tuple(fields) if fields is not None else None
+        self.reason_on_fail = reason_on_fail
+        # Part of the reply-cache key: replies cut by different rules differ.
+        self.key = f"{'all' if self.fields is None else '+'.join(self.fields)}{'/terse' if reason_on_fail else ''}"
+
+    def __call__(self, text: str) -> Optional[str]:
+        if self.schema is not None:
+            return self._structured(text)
+        return self._free_text(text)
+
+    def _structured(self, text: str) -> Optional[str]:
+        props = self.schema["properties"]
+        fields = complete_fields(text)
+        verdict = fields.get("verdict")
+        if verdict not in props["verdict"].get("enum", ()):
+            return None
+        if self.reason_on_fail and verdict == "pass":
+            need = ("verdict",)
+        else:
+            need = self.fields if self.fields is not None else tuple(props)
+        if any(name not in fields for name in need):
+            return None
+        obj = {name: fields.get(name) for name in props}
+        if obj.get("reason") is None and "reason" in props:
+            obj["reason"] = ""
+        return json.dumps(obj, ensure_ascii=False)
+
+    def _free_text(self, text: str) -> Optional[str]:
+        lines = text.lstrip().split("\n")
+        head = lines[0]
+        verdict = parse_verdict(head)
+        if verdict in (Verdict.UNKNOWN, Verdict.ERROR):
+            return None
+        if self.reason_on_fail and verdict is Verdict.PASS:
+            label = self.labels.get("pass", "")
+            at = head.upper().find(label) if label else -1
+            if at >= 0:
+                return head[:at + len(label)].strip()
+            return head.strip() if len(lines) > 1 else None
+        if self.fields is None or len(lines) < 2:
+            return None  # the line is still arriving, or the audit wants the whole reply
+        reason = head.partition(":")[2].strip()
+        if reason:
+            return head.strip()
+        rest = [l for l in lines[1:-1] if l.strip()]  # a reason on the next (finished) line
+        return f"{head.strip()}\n{rest[0].strip()}" if rest else None
+
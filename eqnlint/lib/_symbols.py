@@ -0,0 +1,160 @@
+# eqnlint/lib/_symbols.py
+import json
+import re
+import asyncio
+import hashlib
+import pathlib
+from typing import Dict, Iterable, Optional
+
+from ._textio import side_file
+
+_JSON_OBJ = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def target_key(target: dict) -> str:
+    """
+    Stable hash of a target's source text (equation + context).
+
+    The key changes whenever the equation or its surrounding paragraph is
+    edited, which is what invalidates a cached symbol entry.
+    """
+    h = hashlib.sha1()
+    h.update(target.get("equation", "").encode("utf-8"))
+    h.update(b"\0")
+    h.update(target.get("context", "").encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def parse_symbol_reply(reply: str) -> Dict[str, str]:
+    """Best-effort parse of a model's symbol dictionary reply; {} on failure."""
+    if not reply:
+        return {}
+    for candidate in (reply, *(m.group() for m in _JSON_OBJ.finditer(reply))):
+        try:
+            obj = json.loads(candidate)
+        except (ValueError, TypeError):
+            continue
+        if isinstance(obj, dict):
+            return {str(k): str(v) for k, v in obj.items() if v is not None}
+    return {}
+
+
+def symbol_table_path(args) -> Optional[pathlib.Path]:
+    """
+    Where the shared table lives for a run: `--symbols` if given, otherwise
+    next to the human log (-o), otherwise in the cache dir.
+    """
+    explicit = getattr(args, "symbols", None)
+    if explicit:
+        return pathlib.Path(explicit)
+    return side_file(args, ".symbols.json")
+
+
+def _mentions(equation: str, symbol: str) -> bool:
+    if len(symbol) == 1 and symbol.isalpha():
+        return re.search(rf"(?<![\\A-Za-z]){re.escape(symbol)}(?![A-Za-z])", equation) is not None
+    return symbol in equation
+
+
+class SymbolTable:
+    """
+    Document-level symbol dictionary shared between audits.
+
+    - The symbolic audit fills it (one entry per target, keyed by `target_key`).
+    - Units, dimensional and opacity audits read it via `compact()` so they do
+      not have to rediscover the same symbols in every prompt.
+    - Entries for targets that no longer exist in the source are dropped by
+      `prune()`, so edits invalidate only the targets they touch.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Optional[pathlib.Path] = None):
+        self.path = pathlib.Path(path) if path else None
+        self.entries: Dict[str, dict] = {}
+        self._merged: Optional[Dict[str, str]] = None
+        self._pending: Dict[str, asyncio.Event] = {}
+
+    @classmethod
+    def load(cls, path: Optional[pathlib.Path]) -> "SymbolTable":
+        table = cls(path)
+        if table.path and table.path.is_file():
+            try:
+                data = json.loads(table.path.read_text(encoding="utf-8"))
+            except ValueError:
+                data = {}
+            if data.get("version") == cls.VERSION:
+                table.entries = dict(data.get("targets", {}))
+        return table
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        data = {"version": self.VERSION, "symbols": self.merged(), "targets": self.entries}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        entry = self.entries.get(key)
+        return entry["symbols"] if entry else None
+
+    def put(self, key: str, equation: str, symbols: Dict[str, str]) -> None:
+        self.entries[key] = {"equation": equation, "symbols": dict(symbols)}
+        self._merged = None
+
+    def prune(self, keys: Iterable[str]) -> int:
+        """Drop entries whose target is no longer in the document. Returns count dropped."""
+        live = set(keys)
+        stale = [k for k in self.entries if k not in live]
+        for k in stale:
+            del self.entries[k]
+        if stale:
+            self._merged = None
+        return len(stale)
+
+    # -------- Producer/consumer coordination (audits running concurrently) --------
+    def expect(self, keys: Iterable[str]) -> None:
+        """Mark targets a producer is about to fill; `ready()` waits for them."""
+        for key in keys:
+            if key not in self.entries:
+                self._pending.setdefault(key, asyncio.Event())
+
+    def resolve(self, key: str) -> None:
+        """Producer is done with `key` (whether or not it yielded symbols)."""
+        event = self._pending.pop(key, None)
+        if event:
+            event.set()
+
+    def resolve_all(self) -> None:
+        for key in list(self._pending):
+            self.resolve(key)
+
+    async def ready(self, key: str) -> None:
+        """Wait until a pending producer has resolved `key`; no-op otherwise."""
+        event = self._pending.get(key)
+        if event:
+            await event.wait()
+
+    def merged(self) -> Dict[str, str]:
+        """One meaning per symbol across the document (first definition wins)."""
+        if self._merged is None:
+            merged: Dict[str, str] = {}
+            for entry in self.entries.values():
+                for sym, meaning in entry["symbols"].items():
+                    merged.setdefault(sym, meaning)
+            self._merged = merged
+        return self._merged
+
+    def compact(self, equation: str, limit: int = 24) -> str:
+        """
+        Render the symbols that appear in `equation` as a single short line,
+        e.g. `E=energy (J); m=mass (kg)`. Empty string if none are known.
+        """
+        parts = [f"{sym}={meaning}" for sym, meaning in self.merged().items() if _mentions(equation, sym)]
+        return "; ".join(parts[:limit])
@@ -1,7 +1,12 @@
 # lib/_texio.py
-import json, pathlib
+import os, json, hashlib, pathlib
 
 def read_text(path):
+    """A .tex file, or the main file of a source archive with its includes inlined."""
+    if str(path).lower().endswith((".tar", ".tgz", ".gz", ".bz2", ".xz", ".zip")):
+        from ._archive import is_archive, read_archive
+        if is_archive(path):
+            return read_archive(path).text
     return pathlib.Path(path).read_text(encoding="utf-8")
 
 def write_text(path, s):
@@ -24,4 +29,25 @@ def write_outputs(human_log, json_obj, output_path, json_path):
     if json_path:
         write_text(json_path, json.dumps(json_obj, indent=2))
     else:
-        print(json.dumps(json_obj, indent=2))
\ No newline at end of file
+        print(json.dumps(json_obj, indent=2))
+def cache_dir():
+    """$EQNLINT_CACHE, else $XDG_CACHE_HOME/eqnlint, else ~/.cache/eqnlint."""
+    explicit = os.environ.get("EQNLINT_CACHE")
+    if explicit:
+        return pathlib.Path(explicit)
+    return pathlib.Path(os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache") / "eqnlint"
+
+def side_file(args, suffix):
+    """
+    Default path of a run's side file (checkpoint, symbol table): next to -o,
+    else in cache_dir() under the input's name, so auditing a paper never
+    writes into its source directory. None without either.
+    """
+    output = getattr(args, "output", None)
+    if output:
+        return pathlib.Path(output).with_suffix(suffix)
+    source = getattr(args, "file", None)
+    if not source:
+        return None
+    digest = hashlib.sha1(str(pathlib.Path(source).resolve()).encode("utf-8")).hexdigest()[:8]
+    return cache_dir() / f"{pathlib.Path(source).stem.removesuffix('.tar')}-{digest}{suffix}"
@@ -0,0 +1,161 @@
+# eqnlint/lib/_trace.py
+import sys
+import json
+import math
+import time
+import contextlib
+import contextvars
+from typing import Dict, List, Optional
+
+# Audit a coroutine is working for; set by AuditStateMachine.run() and
+# inherited by the tasks it starts, so AIClient can label its requests.
+_audit = contextvars.ContextVar("eqnlint_audit", default=None)
+
+# Per-request slot the backends stamp when the first response byte arrives.
+first_byte = contextvars.ContextVar("eqnlint_first_byte", default=None)
+
+_NULL = contextlib.nullcontext()
+
+
+def set_audit(name: Optional[str]) -> None:
+    _audit.set(name)
+
+
+def current_audit() -> Optional[str]:
+    return _audit.get()
+
+
+def mark_first_byte() -> None:
+    """Called by a backend when response data starts arriving (first call wins)."""
+    slot = first_byte.get()
+    if slot is not None and "t" not in slot:
+        slot["t"] = time.perf_counter()
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, math.ceil(q / 100.0 * len(ordered)) - 1))
+    return ordered[k]
+
+
+class Tracer:
+    """
+    Timings of one run, off unless --trace or -v asks for them.
+
+    - Spans (state transitions, request phases) are kept as Chrome trace
+      events and written with --trace PATH; open the file in
+      chrome://tracing or https://ui.perfetto.dev. Each audit gets a track
+      for its states; its concurrent requests are spread over lanes.
+    - Every span and request phase also adds a sample (ms) per audit and
+      metric, summarized as p50/p95/p99 with -v.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[dict] = []
+        self.samples: Dict[tuple, List[float]] = {}
+        self._tids: Dict[str, int] = {}
+        self._lanes: Dict[str, List[float]] = {}  # group -> end time of the last span per lane
+        self._t0 = time.perf_counter()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    # ---- recording --------------------------------------------------------
+
+    def _tid(self, track: str) -> int:
+        tid = self._tids.get(track)
+        if tid is None:
+            tid = self._tids[track] = len(self._tids) + 1
+            self.events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": track}})
+        return tid
+
+    def add(self, name: str, track: str, start: float, end: float, cat: str = "eqnlint", **args) -> None:
+        """A finished span between two perf_counter() readings."""
+        if not self.enabled:
+            return
+        event = {"name": name, "cat": cat, "ph": "X", "pid": 1, "tid": self._tid(track),
+                 "ts": round((start - self._t0) * 1e6, 1), "dur": round((end - start) * 1e6, 1)}
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def span(self, name: str, track: str, cat: str = "eqnlint", **args):
+        """Context manager timing a block (works across awaits) as a span and a sample."""
+        if not self.enabled:
+            return _NULL
+        return self._span(name, track, cat, args)
+
+    @contextlib.contextmanager
+    def _span(self, name, track, cat, args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.add(name, track, start, end, cat, **args)
+            self.sample(track, name, (end - start) * 1000.0)
+
+    def lane(self, group: str, start: float, end: float) -> str:
+        """
+        Track for a span that may overlap others of the same group (concurrent
+        requests): the first lane that is free again by `start`.
+        """
+        ends = self._lanes.setdefault(group, [])
+        for i, last in enumerate(ends):
+            if last <= start:
+                ends[i] = end
+                return f"{group} #{i + 1}"
+        ends.append(end)
+        return f"{group} #{len(ends)}"
+
+    def sample(self, audit: Optional[str], metric: str, ms: Optional[float]) -> None:
+        if self.enabled and ms is not None:
+            self.samples.setdefault((audit or "-", metric), []).append(ms)
+
+    # ---- output -----------------------------------------------------------
+
+    def summary(self) -> List[dict]:
+        rows = []
+        for (audit, metric), values in sorted(self.samples.items()):
+            rows.append({"audit": audit, "metric": metric, "n": len(values),
+                         "p50": round(percentile(values, 50), 1), "p95": round(percentile(values, 95), 1),
+                         "p99": round(percentile(values, 99), 1), "total": round(sum(values), 1)})
+        return rows
+
+    def format_summary(self) -> str:
+        rows = self.summary()
+        if not rows:
+            return "(no timings)"
+        cols = list(rows[0])
+        cells = [[str(r[c]) for c in cols] for r in rows]
+        widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(cols)]
+        lines = ["Timings (ms)", "  ".join(c.ljust(w) for c, w in zip(cols, widths)),
+                 "  ".join("-" * w for w in widths)]
+        lines += ["  ".join(v.ljust(w) for v, w in zip(row, widths)) for row in cells]
+        return "\n".join(lines)
+
+    def write(self, path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+tracer = Tracer()
+
+
+def configure(args) -> None:
+    """Turn timing on for --trace or -v."""
+    if getattr(args, "trace", None) or getattr(args, "verbose", False):
+        tracer.enable()
+
+
+def finish(args) -> None:
+    """Write --trace and, with -v, print the timing summary to stderr."""
+    if not tracer.enabled:
+        return
+    if getattr(args, "trace", None):
+        tracer.write(args.trace)
+        print(f"[INFO] Trace written to {args.trace} ({len(tracer.events)} events)", file=sys.stderr)
+    if getattr(args, "verbose", False):
+        print(tracer.format_summary(), file=sys.stderr)
@@ -0,0 +1,40 @@
+# eqnlint/lib/_verdict.py
+import re
+from enum import Enum
+
+
+class Verdict(str, Enum):
+    """Categorical outcome of one audited target, parsed from the model reply."""
+    PASS = "pass"        # ✅ CONSISTENT, DEFINED, CLEAR, ACCURATE, ...
+    FAIL = "fail"        # ❌ INCONSISTENT, UNDEFINED, UNCLEAR, FABRICATION, ...
+    WARN = "warn"        # ⚠️ MIXED UNITS, NEEDS EDIT, POSSIBLY FABRICATED, ...
+    ERROR = "error"      # the request itself failed
+    UNKNOWN = "unknown"  # no recognizable verdict (e.g. symbol dictionaries)
+
+
+_LEAD = re.compile(r"^\W*?(✅|❌|⚠️|⚠)")
+_WORDS = (
+    (Verdict.FAIL, re.compile(r"\b(INCONSISTENT|UNDEFINED|UNCLEAR|FABRICATION|FABRICATED)\b")),
+    (Verdict.WARN, re.compile(r"\b(MIXED UNITS|NEEDS EDIT|POSSIBLY)\b")),
+    (Verdict.PASS, re.compile(r"\b(CONSISTENT|DEFINED|CLEAR|ACCURATE)\b")),
+)
+
+
+def parse_verdict(reply: str) -> Verdict:
+    """
+    Classify a reply by its leading ✅/❌/⚠️ marker, falling back to the
+    categorical keywords the audit prompts ask for.
+    """
+    if not reply:
+        return Verdict.UNKNOWN
+    text = reply.strip()
+    if text.startswith(("ERROR:", "[ERROR]")):
+        return Verdict.ERROR
+    m = _LEAD.match(text)
+    if m:
+        return {"✅": Verdict.PASS, "❌": Verdict.FAIL}.get(m.group(1), Verdict.WARN)
+    head = text.splitlines()[0].upper()
+    for verdict, pat in _WORDS:
+        if pat.search(head):
+            return verdict
+    return Verdict.UNKNOWN
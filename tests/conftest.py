@@ -0,0 +1,13 @@
+import pytest
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: timing checks that may be skipped with -m 'not slow'")
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Checkpoints and symbol tables of runs without -o land here, not in ~/.cache."""
+    path = tmp_path / "eqnlint-cache"
+    monkeypatch.setenv("EQNLINT_CACHE", str(path))
+    return path
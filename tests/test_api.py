@@ -0,0 +1,58 @@
+import json
+import asyncio
+
+import pytest
+
+import eqnlint
+from eqnlint.lib._ai import AIClient
+
+PAPER = "Energy $E = m c^2$ holds.\n\nMomentum $p = m v^2$ too.\n"
+
+
+class SimClient(AIClient):
+    """Fails any target with v^2 in it, passes the rest; no network."""
+
+    async def _openai(self, system, user, fewshot, meta=None, schema=None, max_tokens=None, stop=None):
+        await asyncio.sleep(0)
+        verdict = "fail" if "v^2" in user.split("Context")[0] else "pass"
+        return json.dumps({"verdict": verdict, "reason": "simulated"})
+
+    _ollama = _openai
+
+
+@pytest.fixture
+def client():
+    c = SimClient("sim", rate=1000, concurrency=4)
+    yield c
+    eqnlint.close_sync(c)
+
+
+def test_audit_sync_report(client, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    report = eqnlint.audit_sync(PAPER, "units", client=client)
+    assert report.path == "<memory>" and not report.errors and report.pending == 0
+    assert report.counts() == {"units": {"pass": 1, "fail": 1}}
+    [failure] = report.failures
+    assert failure.audit == "units" and failure.target == "$p = m v^2$"
+    assert failure.verdict is eqnlint.Verdict.FAIL
+    assert list(tmp_path.iterdir()) == []  # nothing written without checkpoint/symbols options
+
+
+def test_audit_in_an_event_loop():
+    async def both():
+        client = SimClient("sim", rate=1000, concurrency=4)
+        try:
+            return await asyncio.gather(eqnlint.audit(PAPER, ["units"], client=client),
+                                        eqnlint.audit(PAPER, "units_audit", client=client))
+        finally:
+            await client.aclose()
+
+    first, second = asyncio.run(both())
+    assert first.counts() == second.counts() == {"units": {"pass": 1, "fail": 1}}
+
+
+def test_bad_names_raise_value_error(client):
+    with pytest.raises(ValueError, match="Unknown audit"):
+        eqnlint.audit_sync(PAPER, "nope", client=client)
+    with pytest.raises(ValueError, match="Unknown option"):
+        eqnlint.audit_sync(PAPER, "units", client=client, options={"max_cals": 3})
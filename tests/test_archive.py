@@ -0,0 +1,85 @@
+import gzip
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from eqnlint.lib._archive import is_archive, read_archive
+
+MAIN = r"""\documentclass{article}
+\begin{document}
+\input{sections/intro}
+\include{appendix} % \input{missing}
+\import{figs/}{caption}
+\input sections/loop
+\bibliography{refs}
+\end{document}
+"""
+FILES = {
+    "paper/main.tex": MAIN,
+    "paper/sections/intro.tex": "Intro $E = mc^2$.\n",
+    "paper/appendix.tex": "Appendix \\input{sections/intro}\n",
+    "paper/figs/caption.tex": "Caption.\n",
+    "paper/sections/loop.tex": "Loop \\input{sections/loop}\n",
+    "paper/main.bbl": "\\begin{thebibliography}{1}\\end{thebibliography}\n",
+    "paper/old/draft.tex": "% \\documentclass{article}\nDraft.\n",
+}
+
+
+def _tar(path, files, mode="w:gz"):
+    with tarfile.open(path, mode) as tf:
+        for name, text in files.items():
+            data = text.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    return path
+
+
+def test_tarball_is_flattened(tmp_path):
+    doc = read_archive(_tar(tmp_path / "paper.tar.gz", FILES))
+    assert doc.main == "paper/main.tex"
+    assert doc.files == len(FILES)
+    assert doc.text.count("Intro $E = mc^2$.") == 2  # nested include resolves against the main file's directory
+    assert "Caption." in doc.text and "\\import" not in doc.text
+    assert "% \\input{missing}" in doc.text  # comments are left alone
+    assert doc.text.count("Loop") == 1 and "Loop \\input{sections/loop}" in doc.text  # no recursion
+    assert "\\begin{thebibliography}" in doc.text and "\\bibliography{" not in doc.text
+    assert "Draft." not in doc.text
+
+
+def test_zip_matches_tarball(tmp_path):
+    path = tmp_path / "paper.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, text in FILES.items():
+            zf.writestr(name, text)
+    assert read_archive(path).text == read_archive(_tar(tmp_path / "paper.tar", FILES, "w")).text
+
+
+def test_bare_gzipped_tex_and_latin1(tmp_path):
+    path = tmp_path / "1234.5678.gz"
+    with gzip.open(path, "wb") as fh:
+        fh.write("\\documentclass{article}\nCaf\xe9\n".encode("latin-1"))
+    doc = read_archive(path)
+    assert doc.main == "main.tex" and "Café" in doc.text
+
+
+def test_main_file_preference(tmp_path):
+    files = {
+        "a/notes.tex": "\\documentclass{article}\nNotes\n",
+        "ms.tex": "\\documentclass{article}\n\\begin{document}Body\\end{document}\n",
+        "z/paper.tex": "\\documentclass{article}\n\\begin{document}Other\\end{document}\n",
+    }
+    assert read_archive(_tar(tmp_path / "p.tgz", files)).main == "ms.tex"
+
+
+def test_no_main_file(tmp_path):
+    path = _tar(tmp_path / "p.tgz", {"a.tex": "A\n", "b.tex": "B\n"})
+    with pytest.raises(ValueError, match="no main .tex file"):
+        read_archive(path)
+
+
+def test_is_archive():
+    assert is_archive("x.tar.gz") and is_archive("X.ZIP") and is_archive("1234.gz")
+    assert not is_archive("paper.tex")
@@ -0,0 +1,68 @@
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from eqnlint.lib._bench import (HEAVY_MODULES, _SAMPLE_TEX, _imported, _simulated_value, compare,
+                                measure_dispatch, measure_startup, save_baseline, startup_cases,
+                                synthetic_document)
+from eqnlint.lib._extract import extract_equations_with_context
+from eqnlint.lib._schema import verdict_schema
+
+
+def test_synthetic_document():
+    text = synthetic_document(50, seed=3)
+    assert text == synthetic_document(50, seed=3) != synthetic_document(50, seed=4)
+    assert len(extract_equations_with_context(text)) == 50
+    assert "\\begin{equation}" in text and "\\eqref{" in text
+
+
+def test_simulated_value_satisfies_schema():
+    schema = verdict_schema({"pass": "OK", "fail": "BAD"}, {"rewrite": {"type": ["string", "null"]},
+                                                          "terms": {"type": "array"}})
+    assert _simulated_value(schema) == {"verdict": "pass", "reason": "simulated", "rewrite": None, "terms": []}
+
+
+def test_baseline_compare(tmp_path):
+    path = tmp_path / "baseline.json"
+    rows = [{"suite": "extract", "case": "f", "doc": "a.tex", "per_s": 100.0},
+            {"suite": "extract", "case": "g", "doc": "a.tex", "per_s": 50.0}]
+    save_baseline(rows[:1], path)
+    save_baseline(rows[1:], path)
+    baseline = json.loads(path.read_text())
+    assert baseline["cases"] == {"extract/f/a.tex": 100.0, "extract/g/a.tex": 50.0}
+    now = [{**rows[0], "per_s": 85.0}, {**rows[1], "per_s": 30.0}, {**rows[1], "case": "new", "per_s": 1.0}]
+    assert compare(now, baseline, 0.2) == ["extract/g/a.tex: 30.0/s vs baseline 50.0/s (-40%)"]
+
+
+def test_dispatch_against_simulated_backend():
+    rows = measure_dispatch(targets=20, concurrency=(4,), latency_ms=5.0)
+    assert len(rows) == 1 and rows[0]["n"] == 20 and rows[0]["per_s"] > 0
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.mark.parametrize("case", ["version", "list", "dry-run"])
+def test_startup_imports_no_heavy_modules(tmp_path, case):
+    sample = tmp_path / "sample.tex"
+    sample.write_text(_SAMPLE_TEX, encoding="utf-8")
+    argv = startup_cases(str(sample))[case]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-m", "eqnlint.bin.eqnlint", *argv],
+                          capture_output=True, text=True, cwd=ROOT, env=env)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    imported = _imported(proc.stderr)
+    assert "eqnlint" in imported
+    assert not imported & set(HEAVY_MODULES)
+
+
+@pytest.mark.slow
+def test_startup_overhead():
+    res = measure_startup(runs=3)
+    for name, c in res["cases"].items():
+        assert c["returncode"] == 0, name
+        assert c["overhead_ms"] < 500, (name, c)  # loose: `eqnlint bench startup` enforces the real budget
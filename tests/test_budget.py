@@ -0,0 +1,57 @@
+import json
+import asyncio
+
+import pytest
+
+import eqnlint
+from eqnlint.lib._ai import AIClient
+from eqnlint.lib._budget import Budget, BudgetExhausted
+
+PAPER = "\n\n".join(f"Energy ${{E_{i}}} = m c^2$ holds." for i in range(7)) + "\n"
+
+
+class FailingClient(AIClient):
+    """Every structured reply is a failing verdict; no network."""
+
+    async def _openai(self, system, user, fewshot, meta=None, schema=None, max_tokens=None, stop=None):
+        await asyncio.sleep(0)
+        return json.dumps({"verdict": "fail", "reason": "simulated"})
+
+    _ollama = _openai
+
+
+@pytest.fixture
+def client():
+    c = FailingClient("sim", rate=1000, concurrency=1)
+    yield c
+    eqnlint.close_sync(c)
+
+
+def test_fail_fast_halt_does_not_outlive_the_run(client):
+    first = eqnlint.audit_sync(PAPER, "units", client=client, options={"fail_fast": True})
+    assert first.pending and first.counts()["units"].get("fail")
+    second = eqnlint.audit_sync(PAPER, "units", client=client)
+    assert second.pending == 0
+    assert second.counts()["units"] == {"fail": 7}
+
+
+def test_max_calls_is_per_call_on_a_shared_client(client):
+    for _ in range(2):
+        report = eqnlint.audit_sync(PAPER, "units", client=client, options={"max_calls": 3})
+        assert report.pending == 4
+
+
+def test_budget_checks():
+    b = Budget(max_calls=1)
+    b.check()
+    b.calls += 1
+    with pytest.raises(BudgetExhausted):
+        b.check()
+    b = Budget(deadline=0)
+    with pytest.raises(BudgetExhausted):
+        b.check()
+    b = Budget()
+    b.halt("first")
+    b.halt("second")
+    with pytest.raises(BudgetExhausted, match="first"):
+        b.check()
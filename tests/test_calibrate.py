@@ -0,0 +1,39 @@
+import json
+from types import SimpleNamespace
+
+from eqnlint.bin.calibrate import calibration, pairs
+from eqnlint.lib._schema import triage_fewshots, triage_schema, validate
+
+
+def test_pairs_skip_pending_errors_and_untriaged():
+    machine = SimpleNamespace(results=[
+        {"notes": "❌ INCONSISTENT: x", "triage": {"verdict": "pass", "confidence": 0.9}},
+        {"notes": "✅ CONSISTENT", "triage": {"verdict": "error", "confidence": 0.0}},
+        {"notes": "[ERROR] timeout", "triage": {"verdict": "pass", "confidence": 0.9}},
+        {"pending": True},
+        {"notes": "✅ CONSISTENT"},
+        None,
+    ])
+    assert pairs(machine) == [("pass", 0.9, "fail")]
+
+
+def test_calibration():
+    rows = [("pass", 0.95, "pass"), ("pass", 0.7, "fail"), ("fail", 0.9, "fail"), ("pass", 0.99, "pass")]
+    report = calibration(rows, thresholds=(0.6, 0.8))
+    assert report["targets"] == 4 and report["agree"] == 0.75 and report["flagged"] == 2
+    assert report["thresholds"] == [
+        {"threshold": 0.6, "escalated": 0.25, "missed": 1, "missed_share": 0.5},
+        {"threshold": 0.8, "escalated": 0.5, "missed": 0, "missed_share": 0.0},
+    ]
+    assert report["suggested"] == 0.8
+    assert calibration([], thresholds=(0.5,))["suggested"] == 0.5
+
+
+def test_triage_schema_and_fewshots():
+    schema = triage_schema({"pass": "CONSISTENT", "fail": "INCONSISTENT"})
+    assert validate({"verdict": "fail", "confidence": 0.7}, schema) == []
+    assert validate({"verdict": "fail", "confidence": True}, schema) == ["$.confidence: expected number, got bool"]
+    shots = triage_fewshots([{"role": "user", "content": "E = mc^2"},
+                             {"role": "assistant", "content": '{"verdict": "pass", "reason": "Energy."}'}])
+    assert shots[0]["content"] == "E = mc^2"
+    assert json.loads(shots[1]["content"]) == {"verdict": "pass", "confidence": 0.9}
@@ -0,0 +1,66 @@
+import json
+import sys
+import asyncio
+
+import pytest
+
+from eqnlint.bin import eqnlint as suite
+from eqnlint.lib._ai import AIClient
+from eqnlint.lib._checkpoint import Checkpoint, checkpoint_key
+
+PAPER = "\n\n".join(f"Energy ${{E_{i}}} = m c^2$ holds." for i in range(7)) + "\n"
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Count model requests; every reply passes. No network."""
+    seen = []
+
+    async def reply(self, system, user, fewshot, meta=None, schema=None, max_tokens=None, stop=None):
+        await asyncio.sleep(0)
+        seen.append(user)
+        return json.dumps({"verdict": "pass", "reason": "simulated"})
+
+    monkeypatch.setattr(AIClient, "_openai", reply)
+    return seen
+
+
+def run(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["eqnlint", "--audits", "units", "--rate", "1000", *argv])
+    with pytest.raises(SystemExit):
+        suite.main()
+
+
+def test_resume_sends_only_what_is_left(tmp_path, monkeypatch, calls, cache_dir):
+    paper = tmp_path / "paper.tex"
+    paper.write_text(PAPER, encoding="utf-8")
+    out = ["-f", str(paper), "--json", str(tmp_path / "r.json")]
+
+    run(monkeypatch, *out, "--max-calls", "3")
+    assert len(calls) == 3
+    run(monkeypatch, *out, "--resume")
+    assert len(calls) == 7
+    run(monkeypatch, *out, "--resume")
+    assert len(calls) == 7
+    report = json.loads((tmp_path / "r.json").read_text(encoding="utf-8"))
+    assert [r["notes"] for r in report["audits"]["units"]["results"]].count("✅ CONSISTENT: simulated") == 7
+
+    # Without -o the journal lives in the cache, never next to the paper.
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(["paper.tex", "r.json", cache_dir.name])
+    [journal] = cache_dir.glob("paper-*.checkpoint.jsonl")
+
+    run(monkeypatch, *out)  # without --resume the journal starts afresh
+    assert len(calls) == 14
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / "c.jsonl"
+    target = {"equation": "$E = mc^2$", "context": "x", "start": 3}
+    ckpt = Checkpoint(path)
+    ckpt.begin("cfg")
+    ckpt.record("cfg", target, {"notes": "✅ CONSISTENT: ok"})
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write('{"torn": ')
+    again = Checkpoint(path, resume=True)
+    assert again.get("cfg", dict(target, start=99)) == {"notes": "✅ CONSISTENT: ok"}
+    assert checkpoint_key(target) == checkpoint_key(dict(target, start=99, line=4))
@@ -0,0 +1,148 @@
+import json
+import asyncio
+
+import pytest
+
+from eqnlint.bin import corpus
+from eqnlint.lib._ai import AIClient
+
+PAPER = "Energy $E = m c^2$ holds and $p = m v$ too.\n"
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Count model requests; every reply passes. No network."""
+    seen = []
+
+    async def reply(self, system, user, fewshot, meta=None, schema=None, max_tokens=None, stop=None):
+        await asyncio.sleep(0)
+        seen.append(user)
+        return json.dumps({"verdict": "pass", "reason": "simulated"})
+
+    monkeypatch.setattr(AIClient, "_openai", reply)
+    monkeypatch.setattr(AIClient, "_ollama", reply)
+    return seen
+
+
+@pytest.fixture
+def papers(tmp_path):
+    src = tmp_path / "papers"
+    src.mkdir()
+    for name in ("a", "b"):
+        (src / f"{name}.tex").write_text(PAPER.replace("E", name.upper()), encoding="utf-8")
+    return src
+
+
+def run(papers, out, *extra):
+    with pytest.raises(SystemExit) as e:
+        corpus.main([str(papers), "--out-dir", str(out), "--audits", "units", "--workers", "1", "--rate", "1000",
+                     *extra])
+    return e.value.code
+
+
+def manifest(out):
+    path = out / corpus.MANIFEST
+    return json.loads(path.read_text(encoding="utf-8"))["papers"] if path.is_file() else {}
+
+
+def test_resume_skips_unchanged_papers(tmp_path, papers, calls):
+    out = tmp_path / "out"
+    assert run(papers, out) == 0
+    first = len(calls)
+    assert first and all(e["status"] == "done" for e in manifest(out).values())
+
+    assert run(papers, out, "--resume") == 0
+    assert len(calls) == first
+
+    (papers / "a.tex").write_text(PAPER + "And $F = m a$.\n", encoding="utf-8")
+    assert run(papers, out, "--resume") == 0
+    assert first < len(calls) < 2 * first + 2
+
+
+def test_dry_run_is_not_recorded(tmp_path, papers, calls):
+    out = tmp_path / "out"
+    assert run(papers, out, "--dry-run") == 0
+    assert not calls
+    assert manifest(out) == {}
+    assert json.loads((out / "summary.json").read_text(encoding="utf-8"))["done"] == 2
+
+    assert run(papers, out, "--resume") == 0
+    assert calls
+    assert len(manifest(out)) == 2
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    """Run extraction in threads so it can be observed; record each paper prepared."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    seen = []
+    prepare = corpus.prepare
+
+    def counted(path, audit_names, args):
+        seen.append(path)
+        return prepare(path, audit_names, args)
+
+    monkeypatch.setattr(corpus, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(corpus, "prepare", counted)
+    return seen
+
+
+def test_resume_does_not_extract_finished_papers(tmp_path, papers, calls, extractions):
+    out = tmp_path / "out"
+    assert run(papers, out) == 0
+    assert len(extractions) == 2
+    (papers / "b.tex").write_text(PAPER + "And $F = m a$.\n", encoding="utf-8")
+    assert run(papers, out, "--resume") == 0
+    assert extractions[2:] == [str(papers / "b.tex")]
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Papers audited (and so recorded in the manifest), in order; skipped papers are not."""
+    seen = []
+    record = corpus.Manifest.record
+
+    def counted(self, path, entry):
+        seen.append(str(path))
+        return record(self, path, entry)
+
+    monkeypatch.setattr(corpus.Manifest, "record", counted)
+    return seen
+
+
+def test_resume_reruns_papers_after_a_settings_change(tmp_path, papers, calls, recorded):
+    out = tmp_path / "out"
+    assert run(papers, out) == 0
+    keys = {e["config"] for e in manifest(out).values()}
+    for flags in (["--fuse"], ["--few-shots", "1"], ["--all-few-shots"], ["--reason-on-fail"],
+                  ["--no-early-stop"], ["--pipeline", "units"]):
+        before = len(recorded)
+        assert run(papers, out, "--resume", *flags) == 0
+        assert len(recorded) == before + 2, flags  # not reused from a run with other settings
+        key = {e["config"] for e in manifest(out).values()}
+        assert len(key) == 1 and not key & keys, flags
+        keys |= key
+        assert run(papers, out, "--resume", *flags) == 0
+        assert len(recorded) == before + 2, flags
+
+
+def test_extraction_stays_a_bounded_distance_ahead(tmp_path, calls, extractions, monkeypatch):
+    src = tmp_path / "many"
+    src.mkdir()
+    for i in range(12):
+        (src / f"p{i:02d}.tex").write_text(PAPER.replace("E", f"E_{i}"), encoding="utf-8")
+    from eqnlint.bin import eqnlint
+
+    audited, ahead, run_audits = [], [], eqnlint.run_audits
+
+    async def slow(args, audits, **kw):
+        audited.append(args.file)
+        ahead.append(len(extractions) - len(audited))
+        await asyncio.sleep(0.01)
+        return await run_audits(args, audits, **kw)
+
+    monkeypatch.setattr(eqnlint, "run_audits", slow)
+    assert run(src, tmp_path / "out", "--papers-in-flight", "1") == 0
+    assert len(audited) == 12
+    assert max(ahead) <= 1 + 1  # --papers-in-flight + --workers
@@ -0,0 +1,37 @@
+import tarfile
+from pathlib import Path
+
+from eqnlint.bin.create_submission import package_submission, project_files
+
+
+def _project(root: Path) -> Path:
+    files = {"main.tex": "\\documentclass{article}\n", "sec/intro.tex": "Intro.\n", "figures/plot.pdf": "%PDF",
+             ".git/HEAD": "ref", "out/old.tar.gz": "x"}
+    for name, text in files.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text(text)
+    return root
+
+
+def test_project_files(tmp_path):
+    project = _project(tmp_path)
+    assert project_files(project, project / "out") == [Path("main.tex"), Path("figures/plot.pdf"), Path("sec/intro.tex")]
+    assert Path("figures/plot.pdf") not in project_files(project, project / "out", skip_figures=True)
+
+
+def test_package_is_incremental(tmp_path, capsys):
+    project, out = _project(tmp_path), tmp_path / "out"
+    tar = out / "submission.tar.gz"
+    assert package_submission(project, tar, False, out) == (3, 3)
+    with tarfile.open(tar) as tf:
+        assert sorted(tf.getnames()) == ["figures/plot.pdf", "main.tex", "sec/intro.tex"]
+        assert tf.extractfile("sec/intro.tex").read() == b"Intro.\n"
+
+    assert package_submission(project, tar, False, out) == (3, 0)
+    assert "up to date" in capsys.readouterr().out
+
+    (project / "sec/intro.tex").write_text("Intro, revised.\n")
+    assert package_submission(project, tar, False, out) == (3, 1)
+    with tarfile.open(tar) as tf:
+        assert tf.extractfile("sec/intro.tex").read() == b"Intro, revised.\n"
+    assert len(list((out / ".package-cache").iterdir())) == 3  # the stale member is gone
@@ -0,0 +1,44 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from eqnlint.bin import eqnlint as suite
+from eqnlint.lib._estimate import wall_time
+
+PAPER = Path(__file__).resolve().parents[1] / "test" / "test_paper.tex"
+
+
+def dry_run(tmp_path, monkeypatch, *argv):
+    out = tmp_path / "estimate.json"
+    monkeypatch.setattr(sys, "argv", ["eqnlint", "-f", str(PAPER), "--dry-run", "--json", str(out),
+                                      "-o", str(tmp_path / "estimate.log"), *argv])
+    with pytest.raises(SystemExit) as e:
+        suite.main()
+    assert e.value.code == 0
+    return json.loads(out.read_text(encoding="utf-8"))["estimate"], (tmp_path / "estimate.log").read_text("utf-8")
+
+
+def test_estimate_counts_one_request_per_target(tmp_path, monkeypatch):
+    est, human = dry_run(tmp_path, monkeypatch, "--audits", "units,dimensional")
+    rows = {p["audit"]: p for p in est["audits"]}
+    assert set(rows) == {"units", "dimensional"}
+    assert all(p["requests"] == p["targets"] > 0 and p["tokens_in"] > 0 for p in rows.values())
+    assert est["requests"] == sum(p["requests"] for p in rows.values())
+    # Only savings of features that exist.
+    assert set(est["savings"]) == {"resume", "symbol_table", "duplicates", "prefilter", "fusion"}
+    assert "batching" not in human
+    fusion = est["savings"]["fusion"]
+    assert fusion["audits"] == ["units", "dimensional"] and fusion["requests"] == rows["units"]["requests"]
+
+
+def test_single_audit_has_no_fusion_savings(tmp_path, monkeypatch):
+    est, human = dry_run(tmp_path, monkeypatch, "--audits", "units")
+    assert est["savings"]["fusion"]["audits"] == [] and "--fuse" not in human
+
+
+def test_wall_time_is_bound_by_rate_or_concurrency():
+    assert wall_time(0, 1.0, 4, 2.0) == 0.0
+    assert wall_time(10, 1.0, 100, 0.5) == pytest.approx(10.5)  # rate-bound
+    assert wall_time(10, 100.0, 2, 1.0) == pytest.approx(6.0)   # concurrency-bound
@@ -0,0 +1,63 @@
+import sys
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from eqnlint.lib import _fewshot_index
+from eqnlint.lib._fewshot_index import FewShotIndex
+
+TEX = r"""\documentclass{article}
+\begin{document}
+Energy and mass are related by $E = mc^2$.
+\begin{equation}
+F = ma
+\end{equation}
+\end{document}
+"""
+
+
+def shots(n):
+    out = [{"role": "system", "content": "Check units."}]
+    for i in range(n):
+        out += [{"role": "user", "content": f"Equation: $x_{i} = v_{i} t + {i}$"},
+                {"role": "assistant", "content": f"✅ CONSISTENT: example {i}"}]
+    return out
+
+
+def test_small_pool_is_sent_whole_without_indexing():
+    index = FewShotIndex(shots(3), k=3)
+    assert index.select("Equation: $E = mc^2$") is index.few_shots
+    assert not index._built
+
+
+def test_selection_is_shared_and_budgeted():
+    index = FewShotIndex(shots(10), k=2)
+    a = index.select("Equation: $x_7 = v_7 t + 7$")
+    assert a is index.select("Equation: $x_7 = v_7 t + 7$")
+    assert a[0]["role"] == "system" and len(a) == 5
+    assert any("x_7" in m["content"] for m in a[1::2])
+    small = FewShotIndex(shots(10), k=5, budget=1)
+    assert len(small.select("Equation: $x_1$")) == 3  # at least one example, even over budget
+
+
+def test_numpy_and_pure_python_agree(monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(_fewshot_index, "NUMPY_MIN", 1)
+    fast, pure = FewShotIndex(shots(12), k=3), FewShotIndex(shots(12), k=3, pure=True)
+    for text in ("Equation: $x_3 = v_3 t$", "Equation: $E = mc^2$", "$x_11 + 11$"):
+        assert fast.select(text) == pure.select(text)
+    assert fast._np is not None and pure._np is None
+
+
+def test_dry_run_does_not_import_numpy(tmp_path):
+    tex = tmp_path / "paper.tex"
+    tex.write_text(TEX, encoding="utf-8")
+    code = ("import sys, runpy\n"
+            f"sys.argv = ['eqnlint', '-f', {str(tex)!r}, '--dry-run', '--audits', 'units', '--few-shots', '1']\n"
+            "try:\n    runpy.run_module('eqnlint.bin.eqnlint', run_name='__main__')\n"
+            "except SystemExit:\n    pass\n"
+            "print('numpy' in sys.modules)\n")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         cwd=Path(__file__).resolve().parents[1])
+    assert out.stdout.strip().splitlines()[-1] == "False"
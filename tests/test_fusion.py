@@ -0,0 +1,112 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from eqnlint.lib._fusion import Fusion, fused_audits, fusion_for
+from eqnlint.lib._schema import render_verdict, verdict_schema
+
+LABELS = {"pass": "CONSISTENT", "fail": "INCONSISTENT"}
+
+
+class Machine:
+    target_kind = "equations"
+    fused_task = "Check it."
+    uses_symbols = False
+    few_shots = [{"role": "user", "content": "E = mc^2"}, {"role": "assistant", "content": '{"verdict": "pass"}'}]
+    response_schema = verdict_schema(LABELS)
+
+    def __init__(self, name, replies=None):
+        self.audit_name = name
+        self.replies = replies if replies is not None else []
+        self.fusion = None
+
+    def _render(self, obj):
+        return render_verdict(obj, LABELS)
+
+    def _reply_budget(self):
+        return 100
+
+    def _escalation_client(self):
+        return None
+
+    async def _complete(self, client, system, shots, user, schema, budget):
+        self.replies.append((system, user, schema, budget))
+        return json.dumps({
+            "units": {"verdict": "pass", "reason": "SI throughout."},
+            "dimensional": {"verdict": "fail", "reason": "Mass times length."},
+        }), None, None, {"tokens_in": 90, "tokens_out": 31}
+
+
+class Other(Machine):
+    fused_task = None
+
+
+def test_fused_audits():
+    audits = {"units": Machine, "dimensional": Machine, "opacity": Other}
+    assert fused_audits(None, audits) == ["units", "dimensional"]
+    assert fused_audits("units_audit, dimensional", audits) == ["units", "dimensional"]
+    with pytest.raises(SystemExit, match="not selected: symbolic"):
+        fused_audits("units,symbolic", audits)
+    with pytest.raises(SystemExit, match="Cannot fuse opacity"):
+        fused_audits("units,opacity", audits)
+
+
+def test_fusion_for_opts_out():
+    args = SimpleNamespace(fuse="all", dry_run=False, free_text=False, triage_model=None, pipeline=None)
+    machines = {"units": Machine("units"), "opacity": Other("opacity")}
+    assert fusion_for(args, machines) is None  # only one audit can be fused
+    machines["dimensional"] = Machine("dimensional")
+    fusion = fusion_for(args, machines)
+    assert set(fusion.machines) == {"units", "dimensional"} and machines["units"].fusion is fusion
+    assert fusion_for(SimpleNamespace(**{**vars(args), "free_text": True}), dict(machines)) is None
+    assert fusion_for(SimpleNamespace(**{**vars(args), "dry_run": True}), dict(machines)) is None
+
+
+def test_one_request_split_per_audit():
+    sent = []
+    units, dim = Machine("units", sent), Machine("dimensional")
+    eq = {"equation": "E = m c", "context": "Energy."}
+
+    async def go():
+        fusion = Fusion([units, dim])
+        first = asyncio.ensure_future(fusion.ask(units, eq))
+        await asyncio.sleep(0)
+        assert not first.done() and not sent  # still waiting for the dimensional audit
+        return await asyncio.gather(first, fusion.ask(dim, eq))
+
+    u, d = asyncio.run(go())
+    assert len(sent) == 1
+    system, user, schema, budget = sent[0]
+    assert "## units" in system and "## dimensional" in system and budget == 200
+    assert schema["required"] == ["units", "dimensional"] and user.startswith("Equation:\nE = m c")
+    assert u["notes"] == "✅ CONSISTENT: SI throughout." and d["notes"] == "❌ INCONSISTENT: Mass times length."
+    assert u["meta"] == {"tokens_in": 45, "tokens_out": 15, "fused": 2}
+
+
+def test_skipped_or_finished_audits_release_the_request():
+    sent = []
+    units, dim = Machine("units", sent), Machine("dimensional")
+    a, b = {"equation": "a", "context": ""}, {"equation": "b", "context": ""}
+
+    async def go():
+        fusion = Fusion([units, dim])
+        fusion.skip(dim, a)  # dimensional has `a` from its checkpoint
+        first = await asyncio.wait_for(fusion.ask(units, a), 5)
+        second = asyncio.ensure_future(fusion.ask(units, b))
+        await asyncio.sleep(0)
+        assert len(sent) == 1
+        fusion.leave(dim)
+        return first, await asyncio.wait_for(second, 5)
+
+    first, second = asyncio.run(go())
+    assert len(sent) == 2 and all("## dimensional" not in s[0] for s in sent)
+    assert first["meta"]["fused"] == 1 and second["notes"] == "✅ CONSISTENT: SI throughout."
+
+
+def test_section_schema_mismatch_is_an_error():
+    out = Fusion._section(Machine("units"), '{"dimensional": {"verdict": "pass", "reason": ""}}', {}, 2)
+    assert out["notes"].startswith("[ERROR] reply does not match the units schema: $: missing 'units'")
+    bad = Fusion._section(Machine("units"), '{"units": {"verdict": "maybe", "reason": ""}}', {}, 2)
+    assert bad["schema_errors"] == ["$.units.verdict: 'maybe' is not one of ['pass', 'fail']"]
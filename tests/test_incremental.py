@@ -0,0 +1,131 @@
+import time
+import random
+from pathlib import Path
+
+import pytest
+
+from eqnlint.lib._checkpoint import checkpoint_key
+from eqnlint.lib._extract import (IncrementalDocument, extract_citations_with_context,
+                                  extract_equations_with_context)
+from eqnlint.lib._prose import extract_paragraphs
+from eqnlint.lib._textio import read_text
+
+PAPER = Path(__file__).resolve().parents[1] / "test" / "LambShiftGA.tex"
+EXTRACTORS = {"equations": extract_equations_with_context, "citations": extract_citations_with_context}
+SNIPPETS = ["$", "$x$", "\\[", "\\]", "\\\\[1ex]", "\n\n", "\\begin{align}", "\\end{align}",
+            "\\begin{equation}", "\\end{equation}", "\\cite{a}", "word ", ""]
+
+
+@pytest.fixture(scope="module")
+def text():
+    return read_text(str(PAPER))
+
+
+def same_targets(doc, text):
+    return all(doc.targets(kind, ex) == ex(text) for kind, ex in EXTRACTORS.items())
+
+
+def test_blocks_match_whole_text(text):
+    assert same_targets(IncrementalDocument(text), text)
+
+
+def test_display_math_inside_align_is_one_target(text):
+    # `\\[1ex]` in an align opens a `\[` for the extractor; no block may end inside it.
+    eqs = IncrementalDocument(text).targets("equations", extract_equations_with_context)
+    start = text.index("\\\\[1ex]", text.index("817.5")) + 1
+    assert any(t["start"] == start for t in eqs)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_edits_match_whole_text(text, seed):
+    rng = random.Random(seed)
+    doc, current = IncrementalDocument(text), text
+    for _ in range(150):
+        start = rng.randrange(len(current) + 1)
+        end = min(len(current), start + rng.choice([0, 0, 1, 5, 40]))
+        new = rng.choice(SNIPPETS)
+        doc.apply_change(start, end, new)
+        current = current[:start] + new + current[end:]
+        assert doc.text == current
+        assert same_targets(doc, current)
+    # Prose strips LaTeX per block, so it is compared with a fresh split instead.
+    fresh = IncrementalDocument(current)
+    assert doc.targets("paragraphs", extract_paragraphs) == fresh.targets("paragraphs", extract_paragraphs)
+
+
+def test_unclosed_opener_spans_later_blocks():
+    doc = IncrementalDocument("A $x$.\n\nB.\n\nC $y$.\n\n")
+    doc.apply_change(2, 2, "$")  # "A $$x$." leaves one $ open into "C $y$"
+    assert same_targets(doc, doc.text)
+    doc.apply_change(2, 3, "")
+    assert same_targets(doc, doc.text)
+
+
+def test_apply_change_reports_replaced_blocks():
+    doc = IncrementalDocument("A $x$.\n\nB $y$.\n\nC $z$.\n\nD.\n")
+    old = list(doc.blocks)
+    removed, added = doc.apply_change(8, 9, "b")
+    assert removed == [old[1]] and len(added) == 1
+    start = doc.block_start(added[0])
+    assert (start, start + len(added[0].text)) == (8, 16)
+    assert doc.text[8:16] == "b $y$.\n\n"
+    assert [b for b in doc.blocks if b not in old] == added
+
+
+def test_keys_are_hashed_once_per_block():
+    calls = []
+
+    def key(target):
+        calls.append(target["equation"])
+        return checkpoint_key(target)
+
+    def keyed(doc, blocks):
+        return [(k, doc.absolute(b, t)) for b in blocks
+                for k, t in doc.keyed(b, "equations", extract_equations_with_context, key)]
+
+    doc = IncrementalDocument("".join(f"P{i} ${i}x$.\n\n" for i in range(20)))
+    assert len(keyed(doc, doc.blocks)) == len(calls) == 20
+    calls.clear()
+    _, added = doc.apply_change(0, 2, "Q0")
+    assert len(keyed(doc, added)) == 1 and calls == ["$0x$"]
+    whole = doc.targets("equations", extract_equations_with_context)
+    assert keyed(doc, doc.blocks) == [(checkpoint_key(t), (t["start"], t["end"])) for t in whole]
+    assert calls == ["$0x$"]
+
+
+def test_lazy_offsets_follow_edits(text):
+    rng = random.Random(7)
+    doc, current = IncrementalDocument(text), text
+    for _ in range(100):
+        start = rng.randrange(len(current) + 1)
+        end = min(len(current), start + rng.choice([0, 1, 5]))
+        new = rng.choice(SNIPPETS)
+        doc.apply_change(start, end, new)
+        current = current[:start] + new + current[end:]
+        probe = rng.randrange(len(current) + 1)
+        line = current.count("\n", 0, probe)
+        column = probe - (current.rfind("\n", 0, probe) + 1)
+        assert doc.position(probe) == (line, column)  # no astral characters in the paper
+        assert doc.offset(line, column) == probe
+    for b in doc.blocks:
+        assert current[doc.block_start(b):].startswith(b.text)
+
+
+def _edit_cost(n):
+    doc = IncrementalDocument("".join(f"Paragraph {i} with ${i} x = y$ and more.\n\n" for i in range(n)))
+    for b in doc.blocks:
+        doc.keyed(b, "equations", extract_equations_with_context, checkpoint_key)
+    mid = len(doc) // 2
+    t0 = time.perf_counter()
+    for i in range(200):
+        at = mid + i
+        _, added = doc.apply_change(at, at, "x")
+        for b in added:
+            doc.keyed(b, "equations", extract_equations_with_context, checkpoint_key)
+        doc.position(at)
+    return time.perf_counter() - t0
+
+
+def test_edit_cost_does_not_grow_with_the_document():
+    small, large = min(_edit_cost(1000) for _ in range(3)), min(_edit_cost(16000) for _ in range(3))
+    assert large < 4 * small  # per-block bookkeeping on every edit would be ~16x
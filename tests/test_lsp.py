@@ -0,0 +1,95 @@
+import io
+import json
+import random
+import asyncio
+
+from eqnlint.bin import lsp
+from eqnlint.bin.eqnlint import discover_audits
+from eqnlint.lib._checkpoint import checkpoint_key
+from eqnlint.lib._extract import IncrementalDocument
+
+TEXT = "".join(f"Paragraph {i} says $x_{i} = {i}$.\n\n" for i in range(30))
+URI = "file:///paper.tex"
+
+
+def server():
+    audits = discover_audits(["units"])
+    out = io.BytesIO()
+    srv = lsp.Server(lsp.build_parser(audits).parse_args(["--debounce", "0"]), audits, out)
+    asked = []
+
+    async def dispatch(target):
+        asked.append(target["equation"])
+        return {"notes": "❌ INCONSISTENT: simulated" if "x_1 " in target["equation"] else "✅ CONSISTENT"}
+
+    srv.machines["units"]._dispatch = dispatch
+    return srv, out, asked
+
+
+def spans(doc, current):
+    return {key: sorted(doc.absolute(b, t) for b, t in entries) for key, entries in current.items()}
+
+
+def rebuilt(text, machine):
+    doc, out = IncrementalDocument(text), {}
+    for t in doc.targets(machine.target_kind, machine._find_targets):
+        out.setdefault(("units", checkpoint_key(t)), []).append((t["start"], t["end"]))
+    return {k: sorted(v) for k, v in out.items()}
+
+
+def change(srv, doc, start, end, text, version):
+    (sl, sc), (el, ec) = doc.position(start), doc.position(end)
+    srv.on_textDocument_didChange({
+        "textDocument": {"uri": URI, "version": version},
+        "contentChanges": [{"range": {"start": {"line": sl, "character": sc}, "end": {"line": el, "character": ec}},
+                            "text": text}],
+    })
+
+
+def test_current_follows_edits_without_a_rebuild():
+    async def go():
+        srv, out, asked = server()
+        srv.on_textDocument_didOpen({"textDocument": {"uri": URI, "version": 1, "text": TEXT}})
+        state = srv.documents[URI]
+        machine = srv.machines["units"]
+        rng, text = random.Random(1), TEXT
+        for version in range(2, 60):
+            start = rng.randrange(len(text) + 1)
+            end = min(len(text), start + rng.choice([0, 1, 4]))
+            new = rng.choice(["$y$", "\n\n", "z", "", "$"])
+            change(srv, state.doc, start, end, new, version)
+            text = text[:start] + new + text[end:]
+            assert state.doc.text == text
+            assert spans(state.doc, state.current) == rebuilt(text, machine)
+        await asyncio.sleep(0.01)  # debounce 0: refresh, then the audits
+        assert set(state.results) == set(state.current)
+        assert len(asked) == len(state.current)  # each key asked once, however often it was edited
+        srv._cancel(state)
+        await srv.client.aclose()
+
+    asyncio.run(go())
+
+
+def test_edits_ask_only_about_new_targets_and_move_diagnostics():
+    async def go():
+        srv, out, asked = server()
+        srv.on_textDocument_didOpen({"textDocument": {"uri": URI, "version": 1, "text": TEXT}})
+        state = srv.documents[URI]
+        await asyncio.sleep(0.2)
+        assert len(asked) == 30
+        asked.clear()
+        change(srv, state.doc, 0, 0, "Intro.\n\n", 2)  # shifts every target
+        change(srv, state.doc, len(state.doc), len(state.doc), "New $x_1 = 2$.\n", 3)
+        await asyncio.sleep(0.2)
+        assert asked == ["$x_1 = 2$"]
+        srv._publish(state)
+        await srv.client.aclose()
+        return out.getvalue().decode()
+
+    raw = asyncio.run(go())
+    last = json.loads(raw[raw.rindex("\r\n\r\n") + 4:])
+    params = last["params"]
+    assert last["method"] == "textDocument/publishDiagnostics" and params["version"] == 3
+    lines = [d["range"]["start"]["line"] for d in params["diagnostics"]]
+    assert lines == [4, 62]  # "Paragraph 1" moved down two lines; the new flagged equation at the end
+    assert all(d["severity"] == 1 and d["code"] == "units" for d in params["diagnostics"])
@@ -0,0 +1,78 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from eqnlint.lib import _metrics
+from eqnlint.lib._metrics import Registry, serve_http, write_textfile
+
+
+def test_disabled_registry_records_nothing():
+    reg = Registry()
+    calls = reg.counter("c_total", "Calls", ("model",))
+    calls.inc("m")
+    assert reg.render() == "# HELP c_total Calls\n# TYPE c_total counter\n"
+
+
+def test_render():
+    reg = Registry()
+    reg.enabled = True
+    calls = reg.counter("c_total", "Calls", ("model",))
+    queued = reg.gauge("q", "Queued")
+    wait = reg.histogram("w_seconds", "Wait", ("model",), buckets=(0.1, 1.0))
+    calls.inc('gpt "4"')
+    calls.inc('gpt "4"', amount=2)
+    queued.set(5)
+    queued.dec()
+    for value in (0.05, 0.5, 3.0):
+        wait.observe(value, "m")
+    lines = reg.render().splitlines()
+    assert 'c_total{model="gpt \\"4\\""} 3' in lines
+    assert "q 4" in lines
+    assert [l for l in lines if l.startswith("w_seconds")] == [
+        'w_seconds_bucket{model="m",le="0.1"} 1',
+        'w_seconds_bucket{model="m",le="1"} 2',
+        'w_seconds_bucket{model="m",le="+Inf"} 3',
+        'w_seconds_sum{model="m"} 3.55',
+        'w_seconds_count{model="m"} 3',
+    ]
+
+
+def test_observe_request(monkeypatch):
+    reg = Registry()
+    monkeypatch.setattr(_metrics, "metrics", reg)
+    for name in ("requests", "cache_hits", "retries", "tokens", "early_stops"):
+        monkeypatch.setattr(_metrics, name, reg.counter(f"{name}_total", name, getattr(_metrics, name).labelnames))
+    for name in ("limiter_wait", "request_seconds", "ttfb_seconds"):
+        monkeypatch.setattr(_metrics, name, reg.histogram(name, name, getattr(_metrics, name).labelnames))
+    _metrics.observe_request("m", "units", {"latency_ms": 10}, ok=True)  # disabled: nothing
+    reg.enabled = True
+    _metrics.observe_request("m", "units", {"latency_ms": 200, "tokens_in": 30, "stopped_early": True}, True, attempts=3)
+    _metrics.observe_request("m", "units", {"cached": True}, ok=True)
+    lines = reg.render().splitlines()
+    assert 'requests_total{model="m",outcome="ok"} 1' in lines
+    assert 'retries_total{model="m"} 2' in lines
+    assert 'tokens_total{model="m",direction="in"} 30' in lines
+    assert 'cache_hits_total{model="m"} 1' in lines
+    assert 'early_stops_total{model="m"} 1' in lines
+    assert 'request_seconds_count{audit="units",model="m"} 1' in lines
+
+
+def test_exporters(monkeypatch, tmp_path):
+    reg = Registry()
+    reg.enabled = True
+    reg.counter("c_total", "Calls").inc()
+    monkeypatch.setattr(_metrics, "metrics", reg)
+    path = tmp_path / "eqnlint.prom"
+    write_textfile(path)
+    assert path.read_text() == reg.render() and list(tmp_path.iterdir()) == [path]
+
+    server = serve_http(0)
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{base}/metrics", timeout=5) as resp:
+            assert resp.read().decode() == reg.render()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{base}/other", timeout=5)
+    finally:
+        server.shutdown()
@@ -0,0 +1,80 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from eqnlint.lib._ai import OLLAMA_KEEP_ALIVE, AIClient, ollama_options
+from eqnlint.lib._stream import VerdictStop
+
+
+def _client(handler, **kwargs):
+    client = AIClient("ollama:phi", **kwargs)
+    client._ollama_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def _chunks(*parts, done=None):
+    lines = [json.dumps({"message": {"content": p}, "done": False}) for p in parts]
+    lines.append(json.dumps({"message": {"content": ""}, "done": True, **(done or {})}))
+    return "\n".join(lines) + "\n"
+
+
+def test_ollama_options():
+    args = SimpleNamespace(ollama_option=["top_k=20", "stop=[\"\\n\"]", "mirostat=fast"], ollama_num_ctx=8192,
+                           ollama_keep_alive=None)
+    assert ollama_options(args) == {"keep_alive": OLLAMA_KEEP_ALIVE,
+                                    "options": {"top_k": 20, "stop": ["\n"], "mirostat": "fast", "num_ctx": 8192}}
+    assert ollama_options(SimpleNamespace(ollama_keep_alive="-1"))["keep_alive"] == "-1"
+
+
+def test_chat_request_and_streamed_reply():
+    seen = []
+
+    def handler(request):
+        seen.append(json.loads(request.content))
+        return httpx.Response(200, text=_chunks("✅ CONS", "ISTENT", done={"prompt_eval_count": 12, "eval_count": 3}))
+
+    client = _client(handler, ollama={"keep_alive": "1h", "options": {"num_ctx": 4096}})
+    meta = {}
+    shots = [{"role": "user", "content": "q"}, {"role": "assistant", "content": "a", "extra": 1}]
+    reply = asyncio.run(client._ollama("sys", "E = mc^2", shots, meta=meta, max_tokens=40))
+    assert reply == "✅ CONSISTENT" and meta == {"tokens_in": 12, "tokens_out": 3}
+    body = seen[0]
+    assert body["model"] == "phi" and body["stream"] is True and body["keep_alive"] == "1h"
+    assert body["options"] == {"temperature": 0, "num_ctx": 4096, "num_predict": 40}
+    assert body["messages"] == [{"role": "system", "content": "sys"}, {"role": "user", "content": "q"},
+                                {"role": "assistant", "content": "a"}, {"role": "user", "content": "E = mc^2"}]
+
+
+def test_early_stop_and_errors():
+    labels = {"pass": "CONSISTENT", "fail": "INCONSISTENT"}
+    client = _client(lambda request: httpx.Response(200, text=_chunks("❌ INCONSISTENT: bad", ".\n", "More")))
+    meta = {}
+    reply = asyncio.run(client._ollama("sys", "x", None, meta=meta, stop=VerdictStop(labels)))
+    assert reply == "❌ INCONSISTENT: bad." and meta["stopped_early"] is True
+
+    failing = _client(lambda request: httpx.Response(404, text='{"error": "model not found"}'))
+    assert asyncio.run(failing._ollama("sys", "x", None)) == "[ERROR] Failed to get response from Ollama."
+    midway = _client(lambda request: httpx.Response(200, text='{"error": "out of memory"}\n'))
+    assert asyncio.run(midway._ollama("sys", "x", None)).startswith("[ERROR]")
+
+
+def test_warm_up_loads_each_model_once():
+    seen = []
+
+    def handler(request):
+        seen.append(json.loads(request.content))
+        return httpx.Response(200, json={"done": True})
+
+    async def go():
+        client = _client(handler)
+        tasks = client.warm_up()
+        assert client.warm_up() == []
+        await asyncio.gather(*tasks)
+
+    asyncio.run(go())
+    assert seen == [{"model": "phi", "messages": [], "keep_alive": OLLAMA_KEEP_ALIVE, "options": {}}]
+    assert AIClient("gpt-4o").warm_up() == []
@@ -0,0 +1,53 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from eqnlint.lib._pipeline import Stream, link, pipeline_stages
+
+AUDITS = {name: SimpleNamespace(target_kind="equations") for name in ("symbolic", "dimensional", "units")}
+AUDITS["prose"] = SimpleNamespace(target_kind="paragraphs")
+
+
+def test_pipeline_stages():
+    assert pipeline_stages("symbolic_audit, dimensional,units", AUDITS) == ["symbolic", "dimensional", "units"]
+    with pytest.raises(SystemExit, match="twice"):
+        pipeline_stages("units,units", AUDITS)
+    with pytest.raises(SystemExit, match="same kind of target"):
+        pipeline_stages("units,prose", AUDITS)
+    with pytest.raises(SystemExit, match="first pipeline stage"):
+        pipeline_stages("units,symbolic", AUDITS)
+
+
+def test_stream_hands_over_in_order_until_closed():
+    async def go():
+        stream = Stream()
+        got = []
+
+        async def consume():
+            async for item in stream:
+                got.append(item)
+
+        task = asyncio.ensure_future(consume())
+        stream.put(2, {"symbolic": "m: mass"})
+        await asyncio.sleep(0)
+        assert got == [(2, {"symbolic": "m: mass"})]  # downstream starts before upstream finishes
+        stream.put(0, {})
+        stream.close()
+        stream.close()
+        stream.put(1, {})  # after close: dropped
+        await asyncio.wait_for(task, 5)
+        return got
+
+    assert asyncio.run(go()) == [(2, {"symbolic": "m: mass"}), (0, {})]
+
+
+def test_link():
+    async def go():
+        machines = [SimpleNamespace() for _ in range(3)]
+        link(machines)
+        return machines
+
+    a, b, c = asyncio.run(go())
+    assert a.downstream is b.upstream and b.downstream is c.upstream
+    assert not hasattr(a, "upstream") and not hasattr(c, "downstream")
@@ -0,0 +1,46 @@
+import sys
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from eqnlint.lib import _registry
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def cli(*argv):
+    code = ("import sys, runpy\n"
+            f"sys.argv = ['eqnlint', *{list(argv)!r}]\n"
+            "runpy.run_module('eqnlint.bin.eqnlint', run_name='__main__')\n"
+            "print(sorted(m.split('.')[-1] for m in sys.modules if m.endswith('_audit')))\n")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT)
+    assert out.returncode == 0, out.stderr
+    *lines, imported = out.stdout.strip().splitlines()
+    return lines, imported
+
+
+@pytest.mark.parametrize("name", sorted(_registry.BUILTIN_AUDITS))
+def test_classes_take_the_registry_description(name):
+    cls = _registry.load(name)
+    assert cls.audit_name == name
+    assert cls.description == _registry.description(name)
+
+
+def test_builtins_are_not_also_entry_points():
+    tomllib = pytest.importorskip("tomllib")
+    project = tomllib.loads((ROOT / "pyproject.toml").read_text(encoding="utf-8"))["project"]
+    declared = project.get("entry-points", {}).get(_registry.ENTRY_POINT_GROUP, {})
+    assert not set(declared) & set(_registry.BUILTIN_AUDITS)
+
+
+def test_list_imports_no_audit():
+    lines, imported = cli("--list")
+    assert len(lines) == len(_registry.BUILTIN_AUDITS)
+    assert imported == "[]"
+
+
+def test_help_info_describes_the_selected_audits():
+    lines, imported = cli("--help-info", "--audits", "units,opacity")
+    assert lines == [f"{name:12s} {_registry.description(name)}" for name in ("units", "opacity")]
+    assert imported == "['opacity_audit', 'units_audit']"
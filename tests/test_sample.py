@@ -0,0 +1,95 @@
+import argparse
+
+import pytest
+
+from eqnlint.lib._sample import Sample, _allocate, environment, format_rates, parse_sample, pool, stratified, wilson
+
+
+@pytest.mark.parametrize("value, size", [("0.1", 0.1), ("10%", 0.1), ("1.0", 1.0), ("200", 200), ("1", 1)])
+def test_parse_sample(value, size):
+    assert parse_sample(value) == size and type(parse_sample(value)) is type(size)
+
+
+@pytest.mark.parametrize("value", ["0", "0.0", "1.5", "150%", "-3", "some", ""])
+def test_parse_sample_rejects(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_sample(value)
+
+
+def test_allocate_proportional_with_largest_remainder():
+    assert _allocate({"a": 50, "b": 30, "c": 20}, 10) == {"a": 5, "b": 3, "c": 2}
+    alloc = _allocate({"a": 5, "b": 3, "c": 2}, 3)
+    assert sum(alloc.values()) == 3 and alloc == {"a": 1, "b": 1, "c": 1}
+
+
+def test_allocate_keeps_every_stratum_and_caps_at_size():
+    alloc = _allocate({"big": 97, "small": 1, "tiny": 2}, 10)
+    assert alloc["small"] == 1 and alloc["tiny"] >= 1 and alloc["big"] >= 8
+    assert _allocate({"a": 2, "b": 3}, 5) == {"a": 2, "b": 3}
+    assert _allocate({"a": 1, "b": 1, "c": 1}, 2) == {"a": 1, "b": 1, "c": 0}
+
+
+def test_wilson():
+    low, high = wilson(0.5, 100)
+    assert low == pytest.approx(0.4038, abs=1e-4) and high == pytest.approx(0.5962, abs=1e-4)
+    low, high = wilson(0.0, 10)
+    assert low == 0.0 and 0.25 < high < 0.35  # never a zero-width interval at p = 0
+    assert wilson(0.3, 0) == (0.0, 1.0)
+
+
+def test_stratified_reweights_and_census():
+    strata = {
+        "a": {"population": 80, "verdicts": ["pass"] * 6 + ["fail"] * 2},
+        "b": {"population": 20, "verdicts": ["fail"] * 2},
+    }
+    rates = stratified(strata)
+    assert rates["pass"]["rate"] == 0.6 and rates["fail"]["rate"] == 0.4  # 0.8 * 6/8, not the raw 6/10
+    assert rates["pass"]["se"] > 0 and rates["pass"]["low"] < 0.6 < rates["pass"]["high"]
+    census = stratified({"a": {"population": 2, "verdicts": ["pass", "fail"]}})
+    assert census["fail"] == {"rate": 0.5, "se": 0.0, "low": 0.5, "high": 0.5}
+    assert stratified({"a": {"population": 5, "verdicts": []}}) == {}
+
+
+def test_pool_weights_by_population():
+    a = {"population": 90, "sampled": 9, "rates": {"pass": {"rate": 1.0, "se": 0.0}}}
+    b = {"population": 10, "sampled": 1, "rates": {"fail": {"rate": 1.0, "se": 0.0}}}
+    rates = pool([a, b, {}])
+    assert rates["pass"]["rate"] == 0.9 and rates["fail"]["rate"] == 0.1
+    assert format_rates(rates).startswith("fail 10.0%")
+
+
+def _document(n=40):
+    text = "Front.\n\\section{One}\n" + "x" * 1000 + "\n\\section{Two}\n"
+    two = text.index("\\section{Two}")
+    targets = []
+    for i in range(n):
+        eq = f"\\begin{{equation}} a_{i} = b \\end{{equation}}" if i % 4 == 0 else f"$a_{i}$"
+        targets.append({"equation": eq, "start": 30 + i if i < n // 2 else two + 20 + i})
+    return targets, text
+
+
+def test_sample_is_deterministic_and_stratified():
+    targets, text = _document()
+    s = Sample(targets, text, 0.25, seed=1)
+    assert s.chosen == Sample(targets, text, 0.25, seed=1).chosen
+    assert s.chosen != Sample(targets, text, 0.25, seed=2).chosen
+    assert len(s.chosen) == 10 and s.chosen == sorted(s.chosen)
+    picked = {(environment(t), sec) for t, sec in zip(s.targets(), (s.section[i] for i in s.chosen))}
+    assert picked == set(s.stratum)
+    assert Sample(targets, text, 500).chosen == list(range(len(targets)))
+
+
+def test_sample_estimate_and_expand():
+    targets, text = _document()
+    s = Sample(targets, text, 0.25)
+    picked = s.targets()
+    results = [{"notes": "❌ INCONSISTENT" if s.section[s.index[id(t)]] == "Two" else "✅ CONSISTENT"} for t in picked]
+    results[0] = {"pending": True}
+    answered = s.answered(picked, results)
+    assert len(answered) == len(picked) - 1
+    est = s.estimate(answered)
+    assert est["population"] == 40 and est["sampled"] == len(answered)
+    assert est["sections"]["Two"]["rates"]["fail"]["rate"] == 1.0
+    extra = s.expand(answered, 0.5)
+    assert extra and all(s.section[i] == "Two" and i not in s.chosen for i in extra)
+    assert s.expanded == ["Two"]
@@ -0,0 +1,39 @@
+import argparse
+
+import pytest
+
+from eqnlint.lib._schedule import parse_duration, prioritize, referenced_labels, score_target, scores
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("120", 120.0), ("120s", 120.0), ("2m", 120.0), ("1.5h", 5400.0), ("500ms", 0.5),
+    ("7d", 604800.0), ("2w", 1209600.0), (" 30 s ", 30.0), (45, 45.0),
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize("value", ["", "soon", "2 minutes", "-5s", "1y", "1e3"])
+def test_parse_duration_rejects(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_duration(value)
+
+
+def test_labels_and_references_raise_priority():
+    text = r"See \eqref{eq:a} and \ref{eq:a,eq:b}."
+    assert referenced_labels(text) == {"eq:a": 2, "eq:b": 1}
+    plain = {"equation": r"\begin{equation} E = mc^2 \end{equation}"}
+    labelled = {"equation": r"\begin{equation} E = mc^2 \label{eq:a} \end{equation}"}
+    assert score_target(labelled, referenced_labels(text)) == pytest.approx(score_target(plain) + 4.0)
+
+
+def test_displays_first_and_repeats_sink():
+    targets = [{"equation": "$x$"}, {"equation": r"\begin{equation} F = m a \end{equation}"},
+               {"equation": r"\[ p = m v \]"}, {"equation": r"\[ F = m a \]"}]
+    weights = scores(targets)
+    assert prioritize(weights) == [1, 2, 3, 0]
+    assert weights[3] < weights[1]  # same symbols as an earlier target: no novelty bonus
+
+
+def test_prioritize_keeps_document_order_on_ties():
+    assert prioritize([1.0, 2.0, 1.0, 2.0]) == [1, 3, 0, 2]
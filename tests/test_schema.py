@@ -0,0 +1,48 @@
+import json
+
+from eqnlint.lib._schema import (SYMBOLS_SCHEMA, parse_structured, render_verdict, structured_fewshots,
+                                 validate, verdict_schema)
+
+LABELS = {"pass": "CONSISTENT", "fail": "INCONSISTENT"}
+SCHEMA = verdict_schema(LABELS, {"rewrite": {"type": ["string", "null"]}})
+
+
+def test_validate():
+    assert validate({"verdict": "pass", "reason": "ok", "rewrite": None}, SCHEMA) == []
+    errors = validate({"verdict": "maybe", "reason": 3, "extra": 1}, SCHEMA)
+    assert "$: missing 'rewrite'" in errors
+    assert "$.verdict: 'maybe' is not one of ['pass', 'fail']" in errors
+    assert "$.reason: expected string, got int" in errors
+    assert "$: unexpected 'extra'" in errors
+    assert validate({"symbols": [{"symbol": "m"}]}, SYMBOLS_SCHEMA) == ["$.symbols[0]: missing 'meaning'"]
+
+
+def test_parse_structured_tolerates_fences_and_prose():
+    obj = {"verdict": "fail", "reason": "Mass times length.", "rewrite": "E = m c^2"}
+    for reply in (json.dumps(obj), f"```json\n{json.dumps(obj)}\n```", f"Sure! {json.dumps(obj)} Done."):
+        assert parse_structured(reply, SCHEMA) == (obj, [])
+    assert parse_structured("", SCHEMA) == (None, ["empty reply"])
+    assert parse_structured("no object here", SCHEMA) == (None, ["no JSON object in reply"])
+    assert parse_structured('{"verdict": "pass"}', SCHEMA)[0] is None
+
+
+def test_render_verdict():
+    obj = {"verdict": "fail", "reason": "Mass times length.", "rewrite": "E = m c^2"}
+    assert render_verdict(obj, LABELS) == "❌ INCONSISTENT: Mass times length.\nRewrite: E = m c^2"
+    assert render_verdict({"verdict": "pass", "reason": "", "rewrite": None}, LABELS) == "✅ CONSISTENT"
+
+
+def test_structured_fewshots():
+    shots = [
+        {"role": "system", "content": "Check units."},
+        {"role": "user", "content": "E = mc^2\nOutput:\n✅ CONSISTENT: Energy.\n"},
+        {"role": "user", "content": "F = m"},
+        {"role": "assistant", "content": "❌ INCONSISTENT: Force is not mass.\nRewrite: F = m a"},
+        {"role": "user", "content": "x"},
+        {"role": "assistant", "content": "Some symbol list"},
+    ]
+    out = structured_fewshots(shots, SCHEMA)
+    assert [m["role"] for m in out] == ["system", "user", "assistant", "user", "assistant"]
+    assert out[1]["content"] == "E = mc^2"
+    assert json.loads(out[2]["content"]) == {"verdict": "pass", "reason": "Energy.", "rewrite": None}
+    assert json.loads(out[4]["content"]) == {"verdict": "fail", "reason": "Force is not mass.", "rewrite": "F = m a"}
@@ -0,0 +1,78 @@
+import socket
+import argparse
+import threading
+
+import pytest
+
+from eqnlint.bin import serve
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def daemon():
+    import asyncio
+
+    opts = argparse.Namespace(port=_free_port(), socket=None, rate=100.0, concurrency=4, cache_size=100,
+                              max_documents=4, metrics_port=None, metrics_file=None, metrics_interval=15.0,
+                              verbose=False)
+    d = serve.Daemon(opts)
+    t = threading.Thread(target=lambda: asyncio.run(d.serve()), daemon=True)
+    t.start()
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", opts.port)).close()
+            break
+        except OSError:
+            import time
+            time.sleep(0.05)
+    yield opts
+    list(serve.request(opts, {"op": "shutdown"}))
+    t.join(5)
+
+
+def _audit(opts, argv, text="$E = mc^2$\n"):
+    return list(serve.request(opts, {"op": "audit", "argv": argv + ["-f", "paper.tex"], "text": text}))
+
+
+@pytest.mark.parametrize("flags", [["--audits", "bogus"], ["--pipeline", "units,bogus"]])
+def test_bad_audit_names_end_the_request_not_the_daemon(daemon, flags):
+    events = _audit(daemon, flags)
+    assert events[-1]["event"] == "error"
+    assert "bogus" in events[-1]["message"]
+    pong = list(serve.request(daemon, {"op": "ping"}))
+    assert pong[-1]["event"] == "pong"
+
+
+def test_invalid_arguments_are_reported(daemon):
+    events = _audit(daemon, ["--rate", "fast"])
+    assert events == [{"event": "error", "message": "invalid arguments"}]
+
+
+def test_dry_run_completes(daemon):
+    events = _audit(daemon, ["--audits", "units", "--dry-run"])
+    assert [e["event"] for e in events][-2:] == ["result", "done"]
+
+
+def test_submit_exits_2_when_the_daemon_hangs_up(tmp_path, monkeypatch):
+    paper = tmp_path / "paper.tex"
+    paper.write_text("$E = mc^2$\n", encoding="utf-8")
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    def hang_up():
+        conn, _ = server.accept()
+        conn.recv(65536)
+        conn.sendall(b'{"event": "progress", "audit": "units", "done": 0, "total": 1}\n')
+        conn.close()
+
+    threading.Thread(target=hang_up, daemon=True).start()
+    with pytest.raises(SystemExit) as exc:
+        serve.submit_main(["--port", str(server.getsockname()[1]), "-q", "-f", str(paper)])
+    server.close()
+    assert exc.value.code == 2
@@ -0,0 +1,62 @@
+import json
+import sys
+import sqlite3
+import asyncio
+
+import pytest
+
+from eqnlint.bin import eqnlint as suite
+from eqnlint.lib._ai import AIClient
+
+PAPER = "Energy $E = m c^2$ holds.\n\nMomentum $p = m v$ too.\n"
+
+
+def run(tmp_path, monkeypatch, reply, *argv):
+    paper = tmp_path / "paper.tex"
+    paper.write_text(PAPER, encoding="utf-8")
+    db = tmp_path / "runs.db"
+    monkeypatch.setattr(AIClient, "_openai", reply)
+    monkeypatch.setattr(sys, "argv", ["eqnlint", "-f", str(paper), "--audits", "units", "--rate", "1000",
+                                      "--db", str(db), "-o", str(tmp_path / "r.log"), *argv])
+    return db
+
+
+def runs(db):
+    with sqlite3.connect(db) as conn:
+        return conn.execute("SELECT finished_at FROM runs").fetchall()
+
+
+async def passing(self, system, user, fewshot, meta=None, schema=None, max_tokens=None, stop=None):
+    await asyncio.sleep(0)
+    return json.dumps({"verdict": "pass", "reason": "simulated"})
+
+
+def test_results_are_recorded(tmp_path, monkeypatch):
+    db = run(tmp_path, monkeypatch, passing, "--json", str(tmp_path / "r.json"))
+    with pytest.raises(SystemExit) as e:
+        suite.main()
+    assert e.value.code == 0
+    [(finished,)] = runs(db)
+    assert finished is not None
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0] == 2
+
+
+def test_interrupted_run_is_closed(tmp_path, monkeypatch):
+    async def interrupt(self, *a, **kw):
+        raise KeyboardInterrupt
+
+    db = run(tmp_path, monkeypatch, interrupt, "--json", str(tmp_path / "r.json"))
+    with pytest.raises(SystemExit) as e:
+        suite.main()
+    assert e.value.code == 130
+    [(finished,)] = runs(db)
+    assert finished is not None
+
+
+def test_failed_output_still_closes_the_run(tmp_path, monkeypatch):
+    db = run(tmp_path, monkeypatch, passing, "--json", str(tmp_path))  # a directory: writing fails
+    with pytest.raises(IsADirectoryError):
+        suite.main()
+    [(finished,)] = runs(db)
+    assert finished is not None
@@ -0,0 +1,53 @@
+import json
+
+from eqnlint.lib._schema import verdict_schema
+from eqnlint.lib._stream import VerdictStop, complete_fields
+
+LABELS = {"pass": "CONSISTENT", "fail": "INCONSISTENT"}
+
+
+def test_complete_fields():
+    assert complete_fields('{"verdict": "fail", "reason": "Mass ti') == {"verdict": "fail"}
+    assert complete_fields('{"verdict": "pass", "confidence": 0.9') == {"verdict": "pass"}
+    assert complete_fields('{"verdict": "pass", "confidence": 0.95}') == {"verdict": "pass", "confidence": 0.95}
+    assert complete_fields('Here you go: {"a": [1, 2], "b": null,') == {"a": [1, 2], "b": None}
+    assert complete_fields('{"verd') == {} and complete_fields("") == {}
+
+
+def _first_stop(stop, reply):
+    """Feed `reply` a character at a time, as a stream would; the prefix and kept reply at the first stop."""
+    for i in range(1, len(reply) + 1):
+        kept = stop(reply[:i])
+        if kept is not None:
+            return reply[:i], kept
+    return reply, None
+
+
+def test_structured_stop_after_reason():
+    schema = verdict_schema(LABELS, {"rewrite": {"type": ["string", "null"]}})
+    reply = '{"verdict": "fail", "reason": "Mass times length.", "rewrite": "E = m c^2"}'
+    seen, kept = _first_stop(VerdictStop(LABELS, schema), reply)
+    assert seen.endswith('length."') and json.loads(kept) == {"verdict": "fail", "reason": "Mass times length.",
+                                                             "rewrite": None}
+    seen, kept = _first_stop(VerdictStop(LABELS, schema, fields=None), reply)
+    assert seen == reply[:-1] and json.loads(kept)["rewrite"] == "E = m c^2"  # strings end at their quote
+
+
+def test_structured_pass_stops_at_verdict_with_reason_on_fail():
+    schema = verdict_schema(LABELS)
+    stop = VerdictStop(LABELS, schema, reason_on_fail=True)
+    seen, kept = _first_stop(stop, '{"verdict": "pass", "reason": "Energy on both sides."}')
+    assert seen.endswith('"pass"') and json.loads(kept) == {"verdict": "pass", "reason": ""}
+    seen, kept = _first_stop(stop, '{"verdict": "fail", "reason": "Bad."}')
+    assert json.loads(kept) == {"verdict": "fail", "reason": "Bad."}
+    assert stop.key == "verdict+reason/terse" and VerdictStop(LABELS, fields=None).key == "all"
+
+
+def test_free_text_stop():
+    stop = VerdictStop(LABELS)
+    assert _first_stop(stop, "❌ INCONSISTENT: Mass times length.\nMore detail follows.")[1] == \
+        "❌ INCONSISTENT: Mass times length."
+    assert _first_stop(stop, "❌ INCONSISTENT\n\nForce is not mass.\nMore.")[1] == "❌ INCONSISTENT\nForce is not mass."
+    assert _first_stop(stop, "Let me think about it.")[1] is None
+    terse = VerdictStop(LABELS, reason_on_fail=True)
+    assert _first_stop(terse, "✅ CONSISTENT: Energy on both sides.") == ("✅ CONSISTENT", "✅ CONSISTENT")
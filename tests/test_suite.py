@@ -0,0 +1,38 @@
+import asyncio
+from pathlib import Path
+
+from eqnlint.bin.eqnlint import build_parser, run_audits
+from eqnlint.lib import _registry
+from eqnlint.lib._bench import simulated_client
+
+PAPER = Path(__file__).resolve().parents[1] / "test" / "test_paper.tex"
+
+
+def test_suite_runs_concurrently_on_one_client(tmp_path):
+    audits = {name: _registry.load(name) for name in _registry.BUILTIN_AUDITS}
+    args = build_parser(audits).parse_args(["-f", str(PAPER), "--concurrency", "8", "--rate", "100000",
+                                            "--checkpoint", str(tmp_path / "c.jsonl"),
+                                            "--symbols", str(tmp_path / "s.json")])
+    client = simulated_client(latency_ms=5.0, concurrency=8, rate=args.rate)
+    ask, flight = client._openai, {"calls": 0, "now": 0, "peak": 0, "audits": set()}
+
+    async def counted(*a, **kw):
+        from eqnlint.lib._trace import current_audit
+
+        flight["audits"].add(current_audit())
+        flight["calls"] += 1
+        flight["now"] += 1
+        flight["peak"] = max(flight["peak"], flight["now"])
+        try:
+            return await ask(*a, **kw)
+        finally:
+            flight["now"] -= 1
+
+    client._openai = counted
+    machines = asyncio.run(run_audits(args, audits, client=client))
+
+    assert set(machines) == set(audits)
+    assert all(m.error is None and m.report is not None for m in machines.values())
+    assert flight["peak"] > 1 and flight["peak"] <= 8  # one concurrency cap for the whole suite
+    assert {"symbolic", "units", "dimensional"} <= flight["audits"]
+    assert client.meter.calls == flight["calls"]
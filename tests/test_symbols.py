@@ -0,0 +1,28 @@
+import argparse
+
+from eqnlint.lib._symbols import SymbolTable, symbol_table_path
+
+
+def args(**kw):
+    return argparse.Namespace(**{"file": None, "output": None, "symbols": None, **kw})
+
+
+def test_symbols_go_next_to_the_log_or_to_the_cache(tmp_path, cache_dir):
+    paper = tmp_path / "src" / "paper.tex"
+    assert symbol_table_path(args(file=str(paper), symbols="t.json")).name == "t.json"
+    assert symbol_table_path(args(file=str(paper), output=str(tmp_path / "out" / "r.log"))) == \
+        tmp_path / "out" / "r.symbols.json"
+    cached = symbol_table_path(args(file=str(paper)))
+    assert cached.parent == cache_dir and cached.name.startswith("paper-")
+    assert cached != symbol_table_path(args(file=str(tmp_path / "other" / "paper.tex")))
+    assert symbol_table_path(args()) is None
+
+
+def test_table_round_trips_through_the_cache(tmp_path, cache_dir):
+    paper = tmp_path / "paper.tex"
+    path = symbol_table_path(args(file=str(paper)))
+    table = SymbolTable.load(path)
+    table.put("k", "$E = mc^2$", {"E": "energy (J)"})
+    table.save()
+    assert SymbolTable.load(path).get("k") == {"E": "energy (J)"}
+    assert list(tmp_path.iterdir()) == [cache_dir]
@@ -0,0 +1,53 @@
+import json
+
+from eqnlint.lib._trace import Tracer, percentile
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert [percentile(values, q) for q in (50, 95, 99, 100)] == [50.0, 95.0, 99.0, 100.0]
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([3.0, 1.0, 2.0], 0) == 1.0
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    with tracer.span("state", "units"):
+        pass
+    tracer.add("request", "units", 0.0, 1.0)
+    tracer.sample("units", "latency", 5.0)
+    assert tracer.events == [] and tracer.samples == {} and tracer.format_summary() == "(no timings)"
+
+
+def test_lanes_spread_overlapping_spans():
+    tracer = Tracer()
+    assert tracer.lane("req", 0.0, 2.0) == "req #1"
+    assert tracer.lane("req", 1.0, 3.0) == "req #2"
+    assert tracer.lane("req", 2.0, 4.0) == "req #1"  # free again once the first span ended
+    assert tracer.lane("other", 1.0, 2.0) == "other #1"
+
+
+def test_spans_summary_and_chrome_trace(tmp_path):
+    tracer = Tracer()
+    tracer.enable()
+    with tracer.span("prepare", "units", phase=1):
+        pass
+    tracer.add("request", "units #1", tracer._t0 + 0.001, tracer._t0 + 0.003)
+    for ms in (10.0, 20.0, 30.0):
+        tracer.sample("units", "latency", ms)
+    tracer.sample(None, "latency", None)
+
+    rows = {(r["audit"], r["metric"]): r for r in tracer.summary()}
+    assert set(rows) == {("units", "prepare"), ("units", "latency")}
+    assert rows["units", "latency"] == {"audit": "units", "metric": "latency", "n": 3,
+                                        "p50": 20.0, "p95": 30.0, "p99": 30.0, "total": 60.0}
+    assert tracer.format_summary().splitlines()[0] == "Timings (ms)"
+
+    path = tmp_path / "trace.json"
+    tracer.write(path)
+    events = json.loads(path.read_text())["traceEvents"]
+    names = [e["args"]["name"] for e in events if e["ph"] == "M"]
+    assert names == ["units", "units #1"]
+    spans = {e["name"]: e for e in events if e["ph"] == "X"}
+    assert spans["prepare"]["args"] == {"phase": 1}
+    assert spans["request"]["ts"] == 1000.0 and spans["request"]["dur"] == 2000.0